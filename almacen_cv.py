@@ -0,0 +1,158 @@
+"""Almacén de CVs direccionado por contenido.
+
+Cada archivo se guarda como <raiz>/<aa>/<sha256>.<ext>, donde <aa> son los
+dos primeros caracteres del hash: dos postulantes que suben el mismo archivo
+comparten una sola copia y volver a subir un CV no deja copias nuevas.
+
+La subida no pasa por memoria ni se copia dos veces: `ArchivoEntrante` es el
+archivo temporal (dentro de <raiz>/tmp, mismo sistema de archivos) donde el
+parser multipart de Werkzeug escribe el cuerpo a medida que llega. Calcula el
+hash y el tamaño en cada write() y corta con ArchivoDemasiadoGrande apenas se
+pasa de `max_bytes`. `AlmacenCV.confirmar()` lo mueve a su nombre definitivo
+con os.replace (atómico: nunca queda un archivo a medio escribir con nombre
+de hash). Los temporales no confirmados se borran al cerrarse.
+
+`recolectar()` borra los archivos que ya no figuran en postulantes.cv_path.
+"""
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+
+TAMANO_BLOQUE = 64 * 1024
+
+
+class ArchivoDemasiadoGrande(Exception):
+    # no es ValueError: el parser de formularios de Werkzeug los descarta en silencio
+    pass
+
+
+class ArchivoEntrante:
+    """Archivo temporal que calcula sha256 y tamaño mientras se escribe."""
+
+    def __init__(self, directorio, max_bytes):
+        fd, self.ruta = tempfile.mkstemp(dir=directorio, prefix='subida-')
+        self._archivo = os.fdopen(fd, 'w+b')
+        self._hash = hashlib.sha256()
+        self._max_bytes = max_bytes
+        self.tamano = 0
+        self.confirmado = False
+
+    def write(self, datos):
+        self.tamano += len(datos)
+        if self._max_bytes and self.tamano > self._max_bytes:
+            # el parser no cierra una parte que falló a mitad: se borra aquí
+            self.close()
+            raise ArchivoDemasiadoGrande(f'El archivo supera {self._max_bytes // (1024 * 1024)} MB')
+        self._hash.update(datos)
+        return self._archivo.write(datos)
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+    def seek(self, *args):
+        return self._archivo.seek(*args)
+
+    def tell(self):
+        return self._archivo.tell()
+
+    def read(self, *args):
+        return self._archivo.read(*args)
+
+    def flush(self):
+        self._archivo.flush()
+
+    def close(self):
+        if not self._archivo.closed:
+            self._archivo.close()
+        if not self.confirmado:
+            try:
+                os.unlink(self.ruta)
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AlmacenCV:
+    def __init__(self, raiz, base, max_bytes, extensiones):
+        """`base`: directorio contra el que se expresan las rutas guardadas en
+        postulantes.cv_path (el de la app, como hasta ahora)."""
+        self.raiz = Path(raiz).resolve()
+        self.base = Path(base).resolve()
+        self.max_bytes = max_bytes
+        self.extensiones = set(extensiones)
+        self.temporales = self.raiz / 'tmp'
+        self.temporales.mkdir(parents=True, exist_ok=True)
+        self.deduplicados = 0
+
+    def extension(self, nombre):
+        ext = nombre.rsplit('.', 1)[1].lower() if '.' in nombre else ''
+        return ext if ext in self.extensiones else None
+
+    def nuevo_entrante(self):
+        return ArchivoEntrante(self.temporales, self.max_bytes)
+
+    def confirmar(self, entrante, extension):
+        """Mueve la subida a su ruta por hash y devuelve el valor para cv_path."""
+        entrante.flush()
+        os.fsync(entrante._archivo.fileno())
+        digest = entrante.hexdigest()
+        destino = self.raiz / digest[:2] / f'{digest}.{extension}'
+        if destino.exists():
+            # mismo contenido ya guardado: se descarta la copia nueva y se
+            # renueva la fecha para que recolectar() no lo borre antes del UPDATE
+            self.deduplicados += 1
+            entrante.close()
+            os.utime(destino)
+        else:
+            destino.parent.mkdir(exist_ok=True)
+            os.replace(entrante.ruta, destino)
+            entrante.confirmado = True
+            entrante.close()
+        return destino.relative_to(self.base).as_posix()
+
+    def guardar(self, flujo, extension):
+        """Guarda desde un flujo binario por bloques (p. ej. fuera de un request)."""
+        with self.nuevo_entrante() as entrante:
+            while True:
+                bloque = flujo.read(TAMANO_BLOQUE)
+                if not bloque:
+                    break
+                entrante.write(bloque)
+            return self.confirmar(entrante, extension)
+
+    def ruta(self, cv_path):
+        """Ruta absoluta de un cv_path; None si no existe o está fuera del almacén."""
+        if not cv_path:
+            return None
+        ruta = (self.base / cv_path).resolve()
+        if not ruta.is_relative_to(self.raiz) or ruta.is_relative_to(self.temporales) or not ruta.is_file():
+            return None
+        return ruta
+
+    def recolectar(self, referenciados, gracia=3600, simular=False):
+        """Borra archivos del almacén que no están en `referenciados` (valores
+        de cv_path) y tienen más de `gracia` segundos, para no tocar una subida
+        cuyo UPDATE todavía no terminó. Devuelve (archivos, bytes)."""
+        referenciados = {r for r in (self.ruta(c) for c in referenciados) if r is not None}
+        limite = time.time() - gracia
+        archivos = liberados = 0
+        for ruta in list(self.raiz.rglob('*')):
+            if not ruta.is_file() or ruta in referenciados:
+                continue
+            estado = ruta.stat()
+            if estado.st_mtime > limite:
+                continue
+            archivos += 1
+            liberados += estado.st_size
+            if not simular:
+                ruta.unlink(missing_ok=True)
+                if ruta.parent != self.temporales and not any(ruta.parent.iterdir()):
+                    ruta.parent.rmdir()
+        return archivos, liberados
@@ -0,0 +1,427 @@
+"""API JSON de solo lectura sobre asyncio (aiohttp + aiomysql).
+
+Para los widgets del portal y las integraciones que consultan seguido el
+listado de vacantes, el detalle, el ranking y los reportes. En la app Flask
+cada request espera su viaje a la BD ocupando un hilo; aquí miles de
+conexiones abiertas esperan en un solo hilo y las consultas salen por un
+pool de conexiones asíncrono.
+
+- Mismas lecturas que la app: los procedimientos y la paginación de
+  lecturas.py y el índice de búsqueda de indice_vacantes.py, con las mismas
+  rutas y el mismo JSON que /api/vacantes, /api/ranking/<id> y
+  /api/report/<nombre>, más /api/vacante/<id>.
+- Requests iguales en curso se combinan: si 500 clientes piden el mismo
+  ranking a la vez, se hace una sola lectura y todos reciben el resultado.
+  La respuesta ya serializada queda ASYNC_CACHE_SEGUNDOS en memoria, con su
+  ETag (If-None-Match responde 304).
+- Cada endpoint tiene un máximo de lecturas a la BD simultáneas
+  (ASYNC_CONCURRENCIA_<ENDPOINT>); las que esperan más de ASYNC_ESPERA_MAX
+  segundos reciben 503, así un endpoint lento no toma todo el pool.
+- No escribe: puede apuntar a una réplica (ASYNC_DB_HOST; por defecto la
+  primera de DB_REPLICAS, o el primario). El ranking se relee cada
+  ASYNC_RANKING_TTL segundos (hasta ASYNC_RANKINGS_MAX vacantes en memoria,
+  LRU) y el índice de búsqueda cada ASYNC_INDICE_SEGUNDOS; los cambios
+  hechos en la app Flask se ven con ese retraso.
+
+Uso:
+    python api_async.py --puerto 8081
+    gunicorn 'api_async:crear_app()' --worker-class aiohttp.GunicornWebWorker -w 2 -b :8081
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import date
+from decimal import Decimal
+
+import aiomysql
+from aiohttp import web
+from dotenv import load_dotenv
+from werkzeug.http import http_date
+
+from cache import CacheLocal
+from indice_vacantes import IndiceVacantes
+from lecturas import (
+    GENERAR_RANKING, LISTAR_VACANTES, RANKING_POR_PAGINA, RANKING_POR_PAGINA_MAX, REPORTES, VACANTE_DETALLE,
+    VACANTES_INDICE, VACANTES_POR_PAGINA, VACANTES_POR_PAGINA_MAX, decodificar_json, leer_limite, leer_offset,
+    offset_busqueda, pagina_vacantes, parametros_vacantes, siguiente_busqueda,
+)
+from metricas import RegistroMetricas
+from ranking_memoria import RankingVacante
+
+load_dotenv()
+log = logging.getLogger('reclutamiento.async')
+
+DB_USER = os.getenv('DB_USER', 'admin_rrhh')
+DB_PASS = os.getenv('DB_PASS', 'AdminPass!2026')
+DB_NAME = os.getenv('DB_NAME', 'reclutamiento')
+_REPLICAS = [h.strip() for h in os.getenv('DB_REPLICAS', '').split(',') if h.strip()]
+if os.getenv('ASYNC_DB_HOST'):
+    ASYNC_DB_HOST = os.getenv('ASYNC_DB_HOST')
+    ASYNC_DB_USER, ASYNC_DB_PASS = DB_USER, DB_PASS
+elif _REPLICAS:
+    ASYNC_DB_HOST = _REPLICAS[0]
+    ASYNC_DB_USER = os.getenv('DB_REPLICA_USER', DB_USER)
+    ASYNC_DB_PASS = os.getenv('DB_REPLICA_PASS', DB_PASS)
+else:
+    ASYNC_DB_HOST = os.getenv('DB_HOST', '127.0.0.1')
+    ASYNC_DB_USER, ASYNC_DB_PASS = DB_USER, DB_PASS
+ASYNC_POOL_MIN = int(os.getenv('ASYNC_POOL_MIN', '2'))
+ASYNC_POOL_MAX = int(os.getenv('ASYNC_POOL_MAX', '20'))
+ASYNC_CACHE_SEGUNDOS = float(os.getenv('ASYNC_CACHE_SEGUNDOS', '1'))
+ASYNC_ESPERA_MAX = float(os.getenv('ASYNC_ESPERA_MAX', '5'))
+ASYNC_RANKING_TTL = float(os.getenv('ASYNC_RANKING_TTL', '10'))
+# rankings completos en memoria (LRU): acota la memoria aunque se consulten muchas vacantes
+ASYNC_RANKINGS_MAX = int(os.getenv('ASYNC_RANKINGS_MAX', '200'))
+ASYNC_INDICE_SEGUNDOS = float(os.getenv('ASYNC_INDICE_SEGUNDOS', '60'))
+REPORTES_MAX_AGE = int(os.getenv('REPORTES_MAX_AGE', '60'))
+
+# lecturas a la BD simultáneas por endpoint (la suma puede pasar el pool:
+# las que no consiguen conexión esperan en aiomysql)
+CONCURRENCIA = {
+    'vacantes': 16,
+    'vacante': 16,
+    'ranking': 8,
+    'reportes': 4,
+    'indice': 1,
+}
+CONCURRENCIA = {nombre: int(os.getenv(f'ASYNC_CONCURRENCIA_{nombre.upper()}', maximo))
+                for nombre, maximo in CONCURRENCIA.items()}
+
+
+def _json_por_defecto(valor):
+    # mismo formato que el JSON de Flask
+    if isinstance(valor, date):
+        return http_date(valor)
+    if isinstance(valor, Decimal):
+        return str(valor)
+    raise TypeError(f'{type(valor).__name__} no es serializable')
+
+
+class Ocupado(Exception):
+    pass
+
+
+class Limite:
+    """Semáforo por endpoint: a lo sumo `maximo` lecturas a la vez y
+    `espera` segundos en la fila."""
+
+    def __init__(self, maximo, espera):
+        self._semaforo = asyncio.Semaphore(maximo)
+        self._espera = espera
+        self.maximo = maximo
+        self.activas = 0
+        self.rechazadas = 0
+
+    async def __aenter__(self):
+        try:
+            await asyncio.wait_for(self._semaforo.acquire(), self._espera)
+        except asyncio.TimeoutError:
+            self.rechazadas += 1
+            raise Ocupado('Demasiadas consultas en curso, reintentar en unos segundos') from None
+        self.activas += 1
+
+    async def __aexit__(self, *exc):
+        self.activas -= 1
+        self._semaforo.release()
+
+
+class EnCurso:
+    """Combina lecturas iguales en curso: la primera ejecuta `cargar()` y
+    las que llegan mientras tanto esperan el mismo resultado (o error)."""
+
+    def __init__(self):
+        self._tareas = {}
+        self.ejecutadas = 0
+        self.combinadas = 0
+
+    async def leer(self, clave, cargar):
+        tarea = self._tareas.get(clave)
+        if tarea is None:
+            tarea = asyncio.ensure_future(cargar())
+            self._tareas[clave] = tarea
+            tarea.add_done_callback(lambda t: self._terminar(clave, t))
+            self.ejecutadas += 1
+        else:
+            self.combinadas += 1
+        # un cliente que corta no cancela la lectura de los demás
+        return await asyncio.shield(tarea)
+
+    def _terminar(self, clave, tarea):
+        self._tareas.pop(clave, None)
+        if not tarea.cancelled():
+            tarea.exception()  # marca el error como leído si nadie esperaba
+
+    def __len__(self):
+        return len(self._tareas)
+
+
+class LectorAsync:
+    def __init__(self, pool):
+        self.pool = pool
+        self.metricas = RegistroMetricas(umbral_lento=float(os.getenv('SLOW_QUERY_MS', '200')) / 1000)
+        self.en_curso = EnCurso()
+        self.respuestas = CacheLocal(int(os.getenv('ASYNC_CACHE_MAX', '10000')))
+        self.limites = {nombre: Limite(maximo, ASYNC_ESPERA_MAX) for nombre, maximo in CONCURRENCIA.items()}
+        self.estadisticas_cache = {'acierto': 0, 'fallo': 0}
+        self.rankings = CacheLocal(ASYNC_RANKINGS_MAX)  # vacante_id -> RankingVacante
+        self.indice = IndiceVacantes()
+        self.indice_cargado_en = None
+        self._registrar_metricas()
+
+    def _registrar_metricas(self):
+        m = self.metricas
+        m.registrar_contador('reclutamiento_async_lecturas_total', 'Lecturas ejecutadas o combinadas con otra en curso.',
+                             lambda: {'resultado="ejecutada"': self.en_curso.ejecutadas,
+                                      'resultado="combinada"': self.en_curso.combinadas})
+        m.registrar_contador('reclutamiento_async_cache_total', 'Respuestas servidas desde memoria.',
+                             lambda: {f'resultado="{k}"': v for k, v in self.estadisticas_cache.items()})
+        m.registrar_contador('reclutamiento_async_rechazadas_total', 'Requests rechazados con 503 por endpoint.',
+                             lambda: {f'endpoint="{n}"': lim.rechazadas for n, lim in self.limites.items()})
+        m.registrar_medidor('reclutamiento_async_activas', 'Lecturas a la BD en curso por endpoint.',
+                            lambda: {f'endpoint="{n}"': lim.activas for n, lim in self.limites.items()})
+        m.registrar_medidor('reclutamiento_async_pool_en_uso', 'Conexiones del pool asíncrono en uso.',
+                            lambda: self.pool.size - self.pool.freesize)
+
+    async def call_proc(self, endpoint, nombre, params=()):
+        """Filas de un procedimiento, dentro del límite de `endpoint`."""
+        async with self.limites[endpoint]:
+            return await self._call_proc(nombre, params)
+
+    async def _call_proc(self, nombre, params):
+        inicio = time.perf_counter()
+        filas, error = [], False
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.cursor(aiomysql.DictCursor) as cur:
+                    await cur.execute(f"CALL {nombre}({', '.join(['%s'] * len(params))})", params)
+                    filas = list(await cur.fetchall())
+                    # el CALL deja un result set extra con el estado
+                    while await cur.nextset():
+                        pass
+            return filas
+        except Exception:
+            error = True
+            raise
+        finally:
+            self.metricas.observar_db('proc', nombre, time.perf_counter() - inicio, len(filas), error)
+
+    async def respuesta(self, clave, cargar):
+        """(cuerpo, etag) de la respuesta: de memoria, de una lectura igual
+        en curso o de `cargar()`."""
+        encontrado, valor = self.respuestas.obtener(clave)
+        if encontrado:
+            self.estadisticas_cache['acierto'] += 1
+            return valor
+        self.estadisticas_cache['fallo'] += 1
+
+        async def leer():
+            datos = await cargar()
+            cuerpo = json.dumps(datos, default=_json_por_defecto, ensure_ascii=False).encode()
+            valor = (cuerpo, hashlib.sha1(cuerpo).hexdigest())
+            self.respuestas.guardar(clave, valor, ASYNC_CACHE_SEGUNDOS)
+            return valor
+
+        return await self.en_curso.leer(clave, leer)
+
+    async def ranking(self, vacante_id):
+        encontrado, ranking = self.rankings.obtener(vacante_id)
+        if encontrado:
+            return ranking
+
+        async def cargar():
+            vacante = await self.call_proc('ranking', VACANTE_DETALLE, (vacante_id,))
+            filas = await self.call_proc('ranking', GENERAR_RANKING, (vacante_id,)) if vacante else []
+            if not vacante:
+                self.rankings.borrar([vacante_id])
+                return None
+            decodificar_json(vacante, 'requerimientos')
+            decodificar_json(filas, 'criterios')
+            # armar la skip list es CPU: fuera del loop
+            ranking = await asyncio.get_running_loop().run_in_executor(None, RankingVacante, vacante[0], filas)
+            self.rankings.guardar(vacante_id, ranking, ASYNC_RANKING_TTL)
+            return ranking
+
+        return await self.en_curso.leer(('ranking', vacante_id), cargar)
+
+    async def reconstruir_indice(self):
+        async def cargar():
+            filas = await self.call_proc('indice', VACANTES_INDICE)
+            await asyncio.get_running_loop().run_in_executor(None, self.indice.reconstruir, filas)
+            self.indice_cargado_en = time.monotonic()
+
+        await self.en_curso.leer(('indice',), cargar)
+
+    async def mantener_indice(self):
+        while True:
+            try:
+                await self.reconstruir_indice()
+            except Exception:
+                log.exception('Error reconstruyendo el índice de vacantes')
+            await asyncio.sleep(ASYNC_INDICE_SEGUNDOS)
+
+
+LECTOR = web.AppKey('lector', LectorAsync)
+
+
+def responder_json(request, cuerpo, etag, max_age=0):
+    etag = f'"{etag}"'
+    cabeceras = {'ETag': etag, 'Cache-Control': f'private, max-age={max_age}' if max_age else 'no-cache'}
+    if etag in request.headers.get('If-None-Match', ''):
+        return web.Response(status=304, headers=cabeceras)
+    return web.Response(body=cuerpo, content_type='application/json', headers=cabeceras)
+
+
+def error_json(mensaje, estado):
+    return web.json_response({'error': mensaje}, status=estado)
+
+
+def medir(endpoint):
+    """Registra latencia y estado por endpoint y traduce los errores al
+    mismo JSON que la app Flask."""
+    def decorador(manejador):
+        async def envoltura(request):
+            inicio = time.perf_counter()
+            try:
+                response = await manejador(request)
+            except Ocupado as e:
+                response = error_json(str(e), 503)
+            except Exception as e:
+                log.exception('Error en %s', request.path)
+                response = error_json(str(e), 500)
+            request.app[LECTOR].metricas.observar_http(endpoint, response.status, time.perf_counter() - inicio)
+            return response
+        return envoltura
+    return decorador
+
+
+@medir('vacantes')
+async def api_vacantes(request):
+    lector = request.app[LECTOR]
+    args = request.query
+    try:
+        departamento_id = int(args['departamento_id']) if args.get('departamento_id') else None
+    except ValueError:
+        departamento_id = None
+    buscar = args.get('buscar', '').strip()
+    cursor = args.get('cursor')
+    limite = leer_limite(args.get('limite'), VACANTES_POR_PAGINA, VACANTES_POR_PAGINA_MAX)
+
+    async def cargar():
+        if buscar:
+            if lector.indice_cargado_en is None:
+                await lector.reconstruir_indice()
+            offset = offset_busqueda(cursor)
+            rows, total = lector.indice.buscar(buscar, departamento_id, limite, offset)
+            return {'vacantes': rows, 'siguiente': siguiente_busqueda(offset, limite, total)}
+        rows = await lector.call_proc('vacantes', LISTAR_VACANTES, parametros_vacantes(departamento_id, cursor, limite))
+        rows, siguiente = pagina_vacantes(rows, limite)
+        return {'vacantes': rows, 'siguiente': siguiente}
+
+    cuerpo, etag = await lector.respuesta(('vacantes', departamento_id, buscar, cursor, limite), cargar)
+    return responder_json(request, cuerpo, etag)
+
+
+@medir('vacante')
+async def api_vacante(request):
+    lector = request.app[LECTOR]
+    vacante_id = int(request.match_info['vacante_id'])
+
+    async def cargar():
+        rows = decodificar_json(await lector.call_proc('vacante', VACANTE_DETALLE, (vacante_id,)), 'requerimientos')
+        return rows[0] if rows else None
+
+    cuerpo, etag = await lector.respuesta(('vacante', vacante_id), cargar)
+    if cuerpo == b'null':
+        return error_json('Vacante no encontrada', 404)
+    return responder_json(request, cuerpo, etag)
+
+
+@medir('ranking')
+async def api_ranking(request):
+    lector = request.app[LECTOR]
+    vacante_id = int(request.match_info['vacante_id'])
+    offset = leer_offset(request.query.get('offset'))
+    limite = leer_limite(request.query.get('limite'), RANKING_POR_PAGINA, RANKING_POR_PAGINA_MAX)
+
+    async def cargar():
+        ranking = await lector.ranking(vacante_id)
+        if ranking is None:
+            return None
+        return {'vacante_id': vacante_id, 'titulo': ranking.vacante.get('titulo'), 'total': len(ranking),
+                'offset': offset, 'ranking': ranking.pagina(offset, limite)}
+
+    cuerpo, etag = await lector.respuesta(('ranking', vacante_id, offset, limite), cargar)
+    if cuerpo == b'null':
+        return error_json('Vacante no encontrada', 404)
+    return responder_json(request, cuerpo, etag)
+
+
+@medir('reportes')
+async def api_reporte(request):
+    lector = request.app[LECTOR]
+    nombre = request.match_info['nombre']
+    proc = REPORTES.get(nombre)
+    if proc is None:
+        return error_json('reporte no encontrado', 404)
+    cuerpo, etag = await lector.respuesta(('reporte', nombre), lambda: lector.call_proc('reportes', proc))
+    return responder_json(request, cuerpo, etag, REPORTES_MAX_AGE)
+
+
+async def api_estado(request):
+    lector = request.app[LECTOR]
+    return web.json_response({
+        'pool': {'tamano': lector.pool.size, 'libres': lector.pool.freesize, 'maximo': lector.pool.maxsize},
+        'en_curso': len(lector.en_curso),
+        'lecturas': {'ejecutadas': lector.en_curso.ejecutadas, 'combinadas': lector.en_curso.combinadas},
+        'cache': dict(lector.estadisticas_cache, entradas=len(lector.respuestas)),
+        'limites': {n: {'maximo': lim.maximo, 'activas': lim.activas, 'rechazadas': lim.rechazadas}
+                    for n, lim in lector.limites.items()},
+        'rankings': len(lector.rankings),
+        'indice': len(lector.indice),
+    })
+
+
+async def metrics(request):
+    return web.Response(body=request.app[LECTOR].metricas.exportar().encode(),
+                        headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'})
+
+
+async def _ciclo_de_vida(app):
+    host, _, puerto = ASYNC_DB_HOST.partition(':')
+    pool = await aiomysql.create_pool(
+        host=host, port=int(puerto or 3306), user=ASYNC_DB_USER, password=ASYNC_DB_PASS, db=DB_NAME,
+        minsize=ASYNC_POOL_MIN, maxsize=ASYNC_POOL_MAX, autocommit=True, charset='utf8mb4',
+        pool_recycle=int(os.getenv('DB_POOL_RECYCLE', '3600')),
+    )
+    app[LECTOR] = LectorAsync(pool)
+    indice = asyncio.ensure_future(app[LECTOR].mantener_indice())
+    yield
+    indice.cancel()
+    pool.close()
+    await pool.wait_closed()
+
+
+def crear_app():
+    app = web.Application()
+    app.cleanup_ctx.append(_ciclo_de_vida)
+    app.router.add_get('/api/vacantes', api_vacantes)
+    app.router.add_get('/api/vacante/{vacante_id:\\d+}', api_vacante)
+    app.router.add_get('/api/ranking/{vacante_id:\\d+}', api_ranking)
+    app.router.add_get('/api/report/{nombre}', api_reporte)
+    app.router.add_get('/api/estado', api_estado)
+    app.router.add_get('/metrics', metrics)
+    return app
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='API de solo lectura asíncrona')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--puerto', type=int, default=int(os.getenv('ASYNC_PUERTO', '8081')))
+    args = parser.parse_args()
+    logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'))
+    # backlog alto: miles de clientes conectan a la vez
+    web.run_app(crear_app(), host=args.host, port=args.puerto, backlog=4096, access_log=None)
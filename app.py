@@ -1,15 +1,54 @@
 from flask import Flask, request, jsonify
-from sqlalchemy import create_engine
-from flask import render_template, redirect, url_for, flash, session
+from sqlalchemy import create_engine, event
+from flask import render_template, redirect, url_for, flash, session, g, has_app_context, has_request_context
+from flask import before_render_template, template_rendered, Response, stream_with_context
+from flask import Request, send_file, stream_template, get_flashed_messages
 import os
-from werkzeug.utils import secure_filename
+import json
+import re
+import time
+import threading
+import queue
+import hashlib
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import chain, count, islice
+from pymysql.constants import CLIENT
+from pymysql.cursors import SSCursor
+from werkzeug.exceptions import RequestEntityTooLarge
 from pathlib import Path
 from dotenv import load_dotenv
+from indice_vacantes import IndiceVacantes
+from candidatos import IndiceCandidatos
+from ranking_memoria import AlmacenRankings
+from evaluacion import MotorEvaluacion, TAMANO_LOTE, leer_lista_json
+from cola_evaluacion import ColaEvaluacion
+from consultas import CONSULTAS
+from lecturas import (
+    GENERAR_RANKING, LISTAR_VACANTES, RANKING_POR_PAGINA, RANKING_POR_PAGINA_MAX, REPORTES, VACANTE_DETALLE,
+    VACANTES_INDICE, VACANTES_POR_PAGINA, VACANTES_POR_PAGINA_MAX, codificar_cursor, decodificar_cursor,
+    decodificar_json, leer_limite, leer_offset, offset_busqueda, pagina_vacantes, parametros_vacantes,
+    siguiente_busqueda,
+)
+from metricas import RegistroMetricas
+from registro_auditoria import BufferAuditoria, SQL_INSERTAR as SQL_INSERTAR_AUDITORIA
+from exportacion import FORMATOS
+from cache import CacheLocal, crear_cache
+from almacen_cv import AlmacenCV, ArchivoDemasiadoGrande
+from extraccion_cv import ExtraccionDemorada, ExtraccionNoDisponible, LectorCV, VocabularioCV, hash_de
+from importacion import ImportadorMasivo, RegistroInvalido, leer_registros
+from replicas import Replicas
+from migrador import ErrorMigracion, Migrador
+import planes
+from notificaciones import CanalCambios, DemasiadosSuscriptores
+import atexit
+import logging
+import click
 
 # Cargar variables desde .env (si existe)
 load_dotenv()
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import text
+from sqlalchemy.pool import NullPool
 
 app = Flask(__name__)
 app.secret_key = os.getenv('FLASK_SECRET', 'dev-secret')
@@ -19,6 +58,27 @@ Path(UPLOAD_FOLDER).mkdir(parents=True, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 ALLOWED_EXT = {'pdf', 'doc', 'docx'}
 
+# CVs guardados por hash de contenido (ver almacen_cv.py). Las partes de
+# archivo de los formularios de subida de CV se escriben directo en el almacén
+# mientras llegan; el resto de los formularios usa el archivo temporal de Werkzeug.
+CV_MAX_BYTES = int(float(os.getenv('CV_MAX_MB', '5')) * 1024 * 1024)
+almacen_cv = AlmacenCV(UPLOAD_FOLDER, os.path.dirname(__file__), CV_MAX_BYTES, ALLOWED_EXT)
+# 1: el servidor web (nginx/Apache) entrega el archivo con X-Sendfile
+app.config['USE_X_SENDFILE'] = os.getenv('CV_X_SENDFILE', '0') == '1'
+
+
+ENDPOINTS_CV = {'postulante_editar'}
+
+
+class RequestConAlmacen(Request):
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self.endpoint in ENDPOINTS_CV:
+            return almacen_cv.nuevo_entrante()
+        return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+
+
+app.request_class = RequestConAlmacen
+
 # Configuración desde variables de entorno (usar credenciales seguras en producción)
 DB_USER = os.getenv('DB_USER', 'admin_rrhh')
 DB_PASS = os.getenv('DB_PASS', 'AdminPass!2026')
@@ -26,10 +86,236 @@ DB_HOST = os.getenv('DB_HOST', '127.0.0.1')
 DB_NAME = os.getenv('DB_NAME', 'reclutamiento')
 
 DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}/{DB_NAME}"
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+
+# Pool de conexiones
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '3600'))
+DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', '30'))
+# 1: todas las llamadas de un request comparten una conexión del pool; 0: una por llamada
+DB_CONEXION_POR_REQUEST = os.getenv('DB_CONEXION_POR_REQUEST', '1') == '1'
+
+# Réplicas de lectura (ver replicas.py): lista host[:puerto] separada por
+# comas, con el mismo usuario y base que el primario salvo DB_REPLICA_USER/PASS
+DB_REPLICAS = [h.strip() for h in os.getenv('DB_REPLICAS', '').split(',') if h.strip()]
+DB_REPLICA_USER = os.getenv('DB_REPLICA_USER', DB_USER)
+DB_REPLICA_PASS = os.getenv('DB_REPLICA_PASS', DB_PASS)
+DB_REPLICA_CHEQUEO = float(os.getenv('DB_REPLICA_CHEQUEO', '5'))
+DB_REPLICA_MAX_RETRASO = int(os.getenv('DB_REPLICA_MAX_RETRASO', '30'))
+# después de escribir, las lecturas de esa sesión van al primario durante estos segundos
+DB_LEER_PRIMARIO_SEGUNDOS = float(os.getenv('DB_LEER_PRIMARIO_SEGUNDOS', '5'))
+
+# Usuario con permisos de DDL para `flask migrar` y `flask verificar-planes`
+# (el de la app solo lee y escribe datos)
+DB_MIGRACION_USER = os.getenv('DB_MIGRACION_USER', 'root')
+DB_MIGRACION_PASS = os.getenv('DB_MIGRACION_PASS', '')
+
+
+def crear_motor(url, **connect_args):
+    return create_engine(
+        url,
+        pool_pre_ping=True,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_timeout=DB_POOL_TIMEOUT,
+        # varias sentencias por viaje para call_procs
+        connect_args=dict(connect_args, client_flag=CLIENT.MULTI_STATEMENTS),
+    )
+
+
+engine = crear_motor(DATABASE_URL)
+# una réplica caída no debe demorar el request más que esto antes de ir al primario
+replicas_bd = Replicas(
+    {host: crear_motor(f"mysql+pymysql://{DB_REPLICA_USER}:{DB_REPLICA_PASS}@{host}/{DB_NAME}", connect_timeout=2)
+     for host in DB_REPLICAS},
+    intervalo=DB_REPLICA_CHEQUEO,
+    max_retraso=DB_REPLICA_MAX_RETRASO,
+)
+
+# viajes a la BD y conexiones tomadas del pool (ver benchmarks/bench_conexiones.py)
+CONTADORES_DB = {'viajes': 0, 'checkouts': 0}
+LECTURAS_DB = {'primario': 0, 'replica': 0}
+
+
+def _contar_checkout(dbapi_conn, conn_record, conn_proxy):
+    CONTADORES_DB['checkouts'] += 1
+
+
+for _motor in chain([engine], (r.engine for r in replicas_bd)):
+    event.listen(_motor, 'checkout', _contar_checkout)
+
+# Procedimientos que solo leen: pueden ir a una réplica. Las consultas con
+# nombre se clasifican por su primera palabra (SELECT).
+PROCS_LECTURA = {
+    'sp_generar_ranking', 'sp_ranking_fila', 'sp_vacante_detalle', 'sp_listar_vacantes',
+    'sp_listar_vacantes_pagina', 'sp_listar_postulantes_por_vacante', 'sp_get_postulante',
+    'sp_postulacion_timeline', 'sp_listar_logs', 'sp_listar_logs_dummy', 'sp_buscar_logs',
+    'sp_listar_usuarios', 'sp_report_vacantes_por_mes', 'sp_report_postulantes_por_vacante',
+    'sp_report_promedio_score_por_departamento',
+}
+CONSULTAS_LECTURA = {n for n, sql in CONSULTAS.items() if sql.lstrip().upper().startswith('SELECT')}
+_enrutamiento = threading.local()
+
+
+@contextmanager
+def en_primario():
+    """Las lecturas dentro del bloque van al primario (en este hilo)."""
+    _enrutamiento.primario = getattr(_enrutamiento, 'primario', 0) + 1
+    try:
+        yield
+    finally:
+        _enrutamiento.primario -= 1
+
+
+def de_primario(cargar):
+    """Lo que se guarda en memoria compartida (cache, rankings, índices) se
+    carga del primario: una réplica atrasada lo dejaría viejo hasta el TTL."""
+    def cargar_de_primario(*args):
+        with en_primario():
+            return cargar(*args)
+    return cargar_de_primario
+
+
+def replica_para_lectura():
+    """Réplica para las lecturas de este request, o None para usar el primario.
+    Solo se leen de réplicas los requests HTTP sin escrituras recientes de la
+    sesión; hilos de fondo y comandos leen lo que acaban de escribir."""
+    if not len(replicas_bd) or not has_request_context() or getattr(_enrutamiento, 'primario', 0):
+        return None
+    if g.get('escribio') or session.get('primario_hasta', 0) > time.time():
+        return None
+    if 'replica' not in g:
+        # la misma réplica para todo el request: páginas y cursores consistentes
+        g.replica = replicas_bd.elegir()
+    return g.replica
+
+
+def marcar_escritura():
+    if len(replicas_bd) and has_request_context():
+        g.escribio = True
+        session['primario_hasta'] = time.time() + DB_LEER_PRIMARIO_SEGUNDOS
+
+
+def conexion_replica(replica):
+    """Conexión nueva a la réplica; si no conecta se marca caída y se devuelve None."""
+    try:
+        return replica.engine.raw_connection()
+    except Exception as e:
+        replicas_bd.marcar_caida(replica, e)
+        return None
+
+
+@contextmanager
+def conexion(lectura=False):
+    """Conexión del pool: la del request (o contexto de app) actual si existe;
+    si no, una propia que se devuelve al pool al salir. Con `lectura`, de una
+    réplica si corresponde (ver replica_para_lectura)."""
+    replica = replica_para_lectura() if lectura else None
+    clave = 'db_conn_replica' if replica is not None else 'db_conn'
+    if DB_CONEXION_POR_REQUEST and has_app_context():
+        conn = g.get(clave)
+        if conn is None and replica is not None:
+            conn = g.db_conn_replica = conexion_replica(replica)
+            if conn is None:
+                g.replica = None
+        if conn is None:
+            conn = g.db_conn = g.get('db_conn') or engine.raw_connection()
+            replica = None
+        if lectura:
+            LECTURAS_DB['replica' if replica is not None else 'primario'] += 1
+        yield conn
+        return
+    conn = conexion_replica(replica) if replica is not None else None
+    if lectura:
+        LECTURAS_DB['replica' if conn is not None else 'primario'] += 1
+    if conn is None:
+        conn = engine.raw_connection()
+    try:
+        yield conn
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+@app.teardown_appcontext
+def cerrar_conexion(exc):
+    for clave in ('db_conn', 'db_conn_replica'):
+        conn = g.pop(clave, None)
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+# Instrumentación: métricas por procedimiento/consulta/endpoint, log de
+# llamadas lentas y cabecera Server-Timing (ver metricas.py)
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '200'))
+metricas = RegistroMetricas(umbral_lento=SLOW_QUERY_MS / 1000)
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'))
+metricas.registrar_contador('reclutamiento_db_checkouts_total', 'Conexiones tomadas del pool.',
+                            lambda: CONTADORES_DB['checkouts'])
+metricas.registrar_medidor('reclutamiento_db_pool_en_uso', 'Conexiones del pool en uso.',
+                           lambda: engine.pool.checkedout())
+metricas.registrar_contador('reclutamiento_db_lecturas_total', 'Lecturas por destino (primario o réplica).',
+                            lambda: {f'destino="{k}"': v for k, v in LECTURAS_DB.items()})
+metricas.registrar_medidor('reclutamiento_db_replica_sana', 'Réplicas en servicio (1) o fuera (0).',
+                           lambda: {f'replica="{r.nombre}"': int(r.sana) for r in replicas_bd})
+atexit.register(replicas_bd.detener)
+
+
+@app.before_request
+def iniciar_medicion():
+    g.inicio_request = time.perf_counter()
+    g.tiempo_db = 0.0
+    g.tiempo_render = 0.0
+
+
+@before_render_template.connect_via(app)
+def _inicio_render(sender, template, context, **extra):
+    g.inicio_render = time.perf_counter()
+
+
+@template_rendered.connect_via(app)
+def _fin_render(sender, template, context, **extra):
+    inicio = g.pop('inicio_render', None)
+    if inicio is not None:
+        g.tiempo_render = g.get('tiempo_render', 0.0) + time.perf_counter() - inicio
+
+
+@app.after_request
+def registrar_medicion(response):
+    inicio = g.get('inicio_request')
+    if inicio is None:
+        return response
+    total = time.perf_counter() - inicio
+    replica = g.get('replica')
+    response.headers['Server-Timing'] = (
+        f"db;desc=\"BD{' ' + replica.nombre if replica else ''}\";dur={g.get('tiempo_db', 0.0) * 1000:.1f}, "
+        f"render;desc=\"Plantilla\";dur={g.get('tiempo_render', 0.0) * 1000:.1f}, "
+        f"total;dur={total * 1000:.1f}"
+    )
+    metricas.observar_http(request.endpoint or 'desconocido', response.status_code, total)
+    return response
+
+
+@app.route('/metrics')
+def metrics():
+    return Response(metricas.exportar(), mimetype='text/plain; version=0.0.4')
+
+
+_RE_IDENTIFICADOR = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
 
 # Filtros Jinja2
-from datetime import datetime
+from datetime import datetime, timedelta
+
+@lru_cache(maxsize=4096)
+def fecha_de_texto(valor):
+    # las mismas fechas se repiten en cada fila y en cada render
+    return datetime.fromisoformat(valor.replace('Z', '+00:00'))
+
 
 @app.template_filter('strftime')
 def format_datetime(value, fmt='%d/%m/%Y %H:%M'):
@@ -37,57 +323,384 @@ def format_datetime(value, fmt='%d/%m/%Y %H:%M'):
         return ''
     if isinstance(value, str):
         try:
-            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
-        except:
+            value = fecha_de_texto(value)
+        except ValueError:
             return value
     return value.strftime(fmt)
 
 @app.template_filter('from_json')
 def from_json_filter(value):
-    import json
+    # las columnas JSON ya llegan decodificadas (decodificar_json); queda por texto suelto
     if isinstance(value, str):
         try:
             return json.loads(value)
-        except:
+        except ValueError:
             return []
     return value or []
 
 
-def call_proc(proc_name, params):
-    conn = engine.raw_connection()
-    cursor = None
-    try:
-        cursor = conn.cursor()
-        cursor.callproc(proc_name, params)
-        # recoger resultados si los hay
-        results = []
-        # Para pymysql, los resultados están en el primer cursor
-        cols = [d[0] for d in cursor.description] if cursor.description else []
-        for row in cursor.fetchall():
-            results.append(dict(zip(cols, row)))
-        # Avanzar a otros result sets si existen (para procedimientos con múltiples SELECT)
-        while cursor.nextset():
-            cols = [d[0] for d in cursor.description] if cursor.description else []
-            for row in cursor.fetchall():
-                results.append(dict(zip(cols, row)))
-        conn.commit()
-        return results
-    except Exception as e:
+def sentencia_call(conn, proc_name, params):
+    """CALL proc(...) con los parámetros escapados por el driver.
+
+    Un CALL directo evita el SET @_proc_arg previo que hace cursor.callproc
+    (un viaje menos a la BD por llamada)."""
+    if not _RE_IDENTIFICADOR.match(proc_name):
+        raise ValueError(f'Nombre de procedimiento inválido: {proc_name}')
+    return f"CALL {proc_name}({', '.join(conn.escape(p) for p in params)})"
+
+
+def leer_result_sets(cursor):
+    """Agrupa los result sets por sentencia: cada CALL termina con un
+    resultado sin columnas (el OK del procedimiento)."""
+    grupos, actual = [], []
+    while True:
+        if cursor.description:
+            cols = [d[0] for d in cursor.description]
+            actual.extend(dict(zip(cols, row)) for row in cursor.fetchall())
+        else:
+            grupos.append(actual)
+            actual = []
+        if not cursor.nextset():
+            break
+    if actual:
+        grupos.append(actual)
+    return grupos
+
+
+def ejecutar_sql(armar_sql, params=None, etiqueta=('sql', '-'), lectura=False):
+    """Ejecuta en la conexión actual y confirma. Devuelve (grupos, lastrowid).
+    `etiqueta` = (tipo, nombre) con que se registran las métricas; `lectura`
+    permite usar una réplica."""
+    inicio = time.perf_counter()
+    filas = 0
+    error = False
+    if not lectura:
+        marcar_escritura()
+    with conexion(lectura) as conn:
+        cursor = None
         try:
-            conn.rollback()
+            cursor = conn.cursor()
+            cursor.execute(armar_sql(conn), params)
+            grupos = leer_result_sets(cursor)
+            filas = sum(len(grupo) for grupo in grupos)
+            conn.commit()
+            CONTADORES_DB['viajes'] += 2
+            return grupos, cursor.lastrowid
         except Exception:
-            pass
-        raise
-    finally:
-        if cursor is not None:
+            error = True
             try:
-                cursor.close()
+                conn.rollback()
             except Exception:
                 pass
-        try:
+            raise
+        finally:
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+            duracion = time.perf_counter() - inicio
+            metricas.observar_db(etiqueta[0], etiqueta[1], duracion, filas, error)
+            if has_request_context():
+                g.tiempo_db = g.get('tiempo_db', 0.0) + duracion
+
+
+def call_proc(proc_name, params):
+    grupos, _ = ejecutar_sql(lambda conn: sentencia_call(conn, proc_name, params), etiqueta=('proc', proc_name),
+                             lectura=proc_name in PROCS_LECTURA)
+    # varios SELECT en un procedimiento se devuelven concatenados
+    return [fila for grupo in grupos for fila in grupo]
+
+
+def call_procs(llamadas):
+    """Ejecuta varios procedimientos en un solo viaje (CALL a(..); CALL b(..))
+    y devuelve una lista de filas por llamada, en el mismo orden."""
+    grupos, _ = ejecutar_sql(lambda conn: '; '.join(sentencia_call(conn, n, p) for n, p in llamadas),
+                             etiqueta=('lote', '+'.join(n for n, _ in llamadas)),
+                             lectura=all(n in PROCS_LECTURA for n, _ in llamadas))
+    if len(grupos) != len(llamadas):
+        raise RuntimeError(f'Se esperaban {len(llamadas)} resultados y llegaron {len(grupos)}')
+    return grupos
+
+
+def query(nombre, params=None):
+    """Consulta con nombre de consultas.CONSULTAS; devuelve lista de dicts."""
+    grupos, _ = ejecutar_sql(lambda conn: CONSULTAS[nombre], params, etiqueta=('consulta', nombre),
+                             lectura=nombre in CONSULTAS_LECTURA)
+    return [fila for grupo in grupos for fila in grupo]
+
+
+def insertar(nombre, params=None):
+    """Sentencia INSERT con nombre; devuelve el id generado."""
+    _, lastrowid = ejecutar_sql(lambda conn: CONSULTAS[nombre], params, etiqueta=('consulta', nombre))
+    return lastrowid
+
+
+# Exportaciones: filas leídas de a bloques con un cursor sin buffer
+EXPORTAR_FILAS_POR_LECTURA = 1000
+
+
+def stream_sql(armar_sql, params=None, etiqueta=('sql', '-')):
+    """Generador de filas (dicts) leídas con SSCursor en una conexión propia,
+    sin cargar el resultado completo en memoria. Si el consumidor abandona la
+    lectura (descarga cortada), la conexión se descarta en lugar de leer el
+    resto del resultado para devolverla al pool."""
+    inicio = time.perf_counter()
+    filas = 0
+    completo = False
+    replica = replica_para_lectura()
+    conn = conexion_replica(replica) if replica is not None else None
+    LECTURAS_DB['replica' if conn is not None else 'primario'] += 1
+    if conn is None:
+        conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor(SSCursor)
+        cursor.execute(armar_sql(conn), params)
+        if cursor.description:
+            cols = [d[0] for d in cursor.description]
+            while True:
+                lote = cursor.fetchmany(EXPORTAR_FILAS_POR_LECTURA)
+                if not lote:
+                    break
+                filas += len(lote)
+                for row in lote:
+                    yield dict(zip(cols, row))
+        while cursor.nextset():
+            pass
+        cursor.close()
+        completo = True
+    finally:
+        if completo:
             conn.close()
+        else:
+            conn.invalidate()
+        metricas.observar_db(etiqueta[0], etiqueta[1], time.perf_counter() - inicio, filas, not completo)
+
+
+def stream_proc(proc_name, params, tipo='export'):
+    return stream_sql(lambda conn: sentencia_call(conn, proc_name, params), etiqueta=(tipo, proc_name))
+
+
+def stream_query(nombre, params=None):
+    return stream_sql(lambda conn: CONSULTAS[nombre], params, etiqueta=('export', nombre))
+
+
+def respuesta_exportacion(filas, cursor_de, nombre_archivo):
+    """Response en streaming (CSV o NDJSON según ?formato=). La primera fila se
+    lee antes de responder para que un error de la consulta llegue como 500."""
+    formato = request.args.get('formato', 'csv')
+    if formato not in FORMATOS:
+        return jsonify({'error': f"formato inválido: {formato} (csv o ndjson)"}), 400
+    filas = iter(filas)
+    try:
+        primera = next(filas, None)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    mimetype, generar = FORMATOS[formato]
+    cuerpo = generar(chain([primera] if primera is not None else [], filas), cursor_de)
+    return Response(stream_with_context(cuerpo), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename="{nombre_archivo}.{formato}"',
+        'X-Accel-Buffering': 'no',
+    })
+
+
+# Cache de lecturas que cambian poco (ver cache.py). Cada escritura de la app
+# invalida sus claves; CACHE_TTL acota la desactualización entre procesos
+# cuando el backend es local (sin CACHE_URL).
+cache = crear_cache(os.getenv('CACHE_URL'), ttl=int(os.getenv('CACHE_TTL', '60')),
+                    max_entradas=int(os.getenv('CACHE_MAX_ENTRADAS', '10000')))
+metricas.registrar_contador('reclutamiento_cache_total', 'Lecturas de la cache por resultado.',
+                            lambda: {'resultado="acierto"': cache.aciertos, 'resultado="fallo"': cache.fallos})
+
+
+def leer_departamentos():
+    return cache.leer(('departamentos',), de_primario(lambda: query('departamentos')))
+
+
+def leer_departamentos_detalle():
+    return cache.leer(('departamentos_detalle',), de_primario(lambda: query('departamentos_detalle')))
+
+
+def leer_vacante(vacante_id):
+    rows = cache.leer(('vacante', vacante_id), de_primario(
+        lambda: decodificar_json(call_proc(VACANTE_DETALLE, (vacante_id,)), 'requerimientos')))
+    return rows[0] if rows else None
+
+
+def leer_postulante(postulante_id):
+    rows = cache.leer(('postulante', postulante_id),
+                      de_primario(lambda: decodificar_json(call_proc('sp_get_postulante', (postulante_id,)),
+                                                           'habilidades', 'habilidades_cv')))
+    return rows[0] if rows else None
+
+
+# ETags de páginas: la fila (id, actualizado_en) más el usuario de la sesión,
+# porque el HTML cambia según el rol. ETAG_SEMILLA cambia en cada despliegue:
+# por defecto es el hash del código y las plantillas, igual en todos los
+# procesos del servidor (con un valor por proceso los 304 casi nunca coinciden).
+def semilla_etag():
+    base = Path(__file__).resolve().parent
+    h = hashlib.sha1()
+    for ruta in sorted([*base.glob('*.py'), *base.glob('templates/*.html')]):
+        h.update(ruta.name.encode())
+        h.update(ruta.read_bytes())
+    return h.hexdigest()[:16]
+
+
+ETAG_SEMILLA = os.getenv('ETAG_SEMILLA') or semilla_etag()
+
+
+def etag_para(*partes):
+    crudo = '|'.join(str(p) for p in (ETAG_SEMILLA, session.get('user_id'), session.get('rol_app')) + partes)
+    return hashlib.sha1(crudo.encode()).hexdigest()
+
+
+def respuesta_condicional(etag, generar):
+    """304 si el cliente ya tiene `etag`; si no, la respuesta de generar().
+    Con mensajes flash pendientes siempre se genera la página."""
+    if etag in request.if_none_match and '_flashes' not in session:
+        response = Response(status=304)
+    else:
+        response = app.make_response(generar())
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+@app.route('/api/cache')
+def api_cache():
+    return jsonify(cache.estadisticas())
+
+
+@app.route('/api/db/replicas')
+def api_db_replicas():
+    if session.get('rol_app') != 'admin':
+        return jsonify({'error': 'no autorizado'}), 403
+    return jsonify({'replicas': replicas_bd.estado(), 'lecturas': LECTURAS_DB,
+                    'leer_primario_segundos': DB_LEER_PRIMARIO_SEGUNDOS})
+
+
+# Ranking por vacante en memoria (ver ranking_memoria.py). Se carga con
+# sp_generar_ranking la primera vez y luego se mantiene con las filas que
+# devuelven sp_crear_postulacion y sp_recalcular_score.
+RANKING_TTL = int(os.getenv('RANKING_TTL', '300'))
+RANKINGS_MAX = int(os.getenv('RANKINGS_MAX', '500'))
+DASHBOARD_TOP_K = int(os.getenv('DASHBOARD_TOP_K', '5'))
+
+
+def cargar_ranking(vacante_id):
+    vac, rows = call_procs([(VACANTE_DETALLE, (vacante_id,)), (GENERAR_RANKING, (vacante_id,))])
+    if not vac:
+        return None, []
+    return decodificar_json(vac, 'requerimientos')[0], decodificar_json(rows, 'criterios')
+
+
+def cargar_top(vacante_ids, k):
+    """Top-k de las vacantes indicadas en una sola consulta (top_por_vacante)."""
+    por_vacante = {}
+    for fila in decodificar_json(query('top_por_vacante', {'ids': tuple(vacante_ids), 'k': k}), 'criterios'):
+        por_vacante.setdefault(fila.pop('vacante_id'), []).append(fila)
+    return por_vacante
+
+
+almacen_rankings = AlmacenRankings(de_primario(cargar_ranking), ttl=RANKING_TTL, cargador_top=cargar_top,
+                                   max_rankings=RANKINGS_MAX)
+
+
+def aplicar_filas_ranking(rows):
+    """Actualiza el ranking en memoria con filas de sp_ranking_fila y avisa
+    a las páginas abiertas (ver canal_cambios)."""
+    for fila in decodificar_json(rows, 'criterios'):
+        if 'postulacion_id' in fila and 'vacante_id' in fila:
+            anterior = almacen_rankings.actualizar(fila['vacante_id'], fila)
+            canal_cambios.publicar(('ranking', fila['vacante_id']), fila['postulacion_id'],
+                                   {'anterior': anterior, 'fila': fila})
+            if fila.get('score') is not None:
+                canal_cambios.publicar(('timeline', fila['postulacion_id']), 'evaluacion',
+                                       {'estado': 'evaluacion', 'fecha': datetime.now(), 'usuario': None})
+
+
+# Auditoría de eventos de la app (login, exportaciones, evaluación asíncrona):
+# se acumulan en memoria y se escriben en lotes (ver registro_auditoria.py)
+def escribir_auditoria(filas):
+    inicio = time.perf_counter()
+    error = False
+    with conexion() as conn:
+        cur = conn.cursor()
+        try:
+            cur.executemany(SQL_INSERTAR_AUDITORIA, filas)
+            conn.commit()
         except Exception:
-            pass
+            error = True
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+            metricas.observar_db('lote', 'logs_auditoria', time.perf_counter() - inicio, len(filas), error)
+
+
+buffer_auditoria = BufferAuditoria(
+    escribir_auditoria,
+    tamano_lote=int(os.getenv('AUDITORIA_LOTE', '200')),
+    intervalo=float(os.getenv('AUDITORIA_INTERVALO', '2')),
+    capacidad=int(os.getenv('AUDITORIA_MAX', '50000')),
+)
+atexit.register(buffer_auditoria.detener)
+metricas.registrar_medidor('reclutamiento_auditoria_pendientes', 'Eventos de auditoría en memoria.',
+                           lambda: len(buffer_auditoria))
+metricas.registrar_contador('reclutamiento_auditoria_eventos_total', 'Eventos de auditoría por resultado.',
+                            lambda: {'resultado="escrito"': buffer_auditoria.escritos,
+                                     'resultado="descartado"': buffer_auditoria.descartados})
+
+
+def auditar(tabla, fila_id, descripcion, usuario=None):
+    """Evento de la app (accion APP) con el usuario de la sesión."""
+    if usuario is None:
+        usuario = session.get('username') if has_request_context() else None
+    buffer_auditoria.registrar(usuario or DB_USER, 'APP', tabla, fila_id, descripcion)
+
+
+# Evaluación asíncrona: con EVALUACION_ASINCRONA=1 la postulación solo se
+# registra (sp_registrar_postulacion) y el score lo calcula la cola en
+# segundo plano; si no, sp_crear_postulacion evalúa en la misma llamada.
+EVALUACION_ASINCRONA = os.getenv('EVALUACION_ASINCRONA', '0') == '1'
+motor_evaluacion = MotorEvaluacion(engine, auditoria=buffer_auditoria)
+
+
+def evaluar_lote(postulacion_ids):
+    aplicar_filas_ranking(motor_evaluacion.evaluar_postulaciones(postulacion_ids))
+
+
+cola_evaluacion = ColaEvaluacion(
+    evaluar_lote,
+    hilos=int(os.getenv('EVALUACION_HILOS', '2')),
+    capacidad=int(os.getenv('EVALUACION_COLA_MAX', '10000')),
+    tamano_lote=int(os.getenv('EVALUACION_LOTE', '100')),
+)
+metricas.registrar_medidor('reclutamiento_evaluacion_cola', 'Evaluaciones en cola.',
+                           cola_evaluacion.profundidad)
+metricas.registrar_contador('reclutamiento_evaluacion_total', 'Evaluaciones asíncronas por resultado.',
+                            lambda: {'resultado="ok"': cola_evaluacion.procesadas,
+                                     'resultado="fallida"': cola_evaluacion.fallidas})
+
+
+def registrar_postulacion(postulante_id, vacante_id, usuario):
+    """Devuelve (postulacion_id, pendiente)."""
+    if not EVALUACION_ASINCRONA:
+        rows = call_proc('sp_crear_postulacion', (postulante_id, vacante_id, usuario))
+        aplicar_filas_ranking(rows)
+        return (rows[0]['postulacion_id'] if rows else None), False
+    rows = call_proc('sp_registrar_postulacion', (postulante_id, vacante_id, usuario))
+    aplicar_filas_ranking(rows)
+    if not rows:
+        return None, False
+    postulacion_id = rows[0]['postulacion_id']
+    if cola_evaluacion.encolar(postulacion_id):
+        return postulacion_id, True
+    # cola llena: evaluar en línea antes que dejarla sin score
+    evaluar_lote([postulacion_id])
+    return postulacion_id, False
 
 
 @app.route('/postular', methods=['POST'])
@@ -99,45 +712,492 @@ def crear_postulacion():
     if not postulante_id or not vacante_id:
         return jsonify({'error': 'postulante_id y vacante_id requeridos'}), 400
     try:
-        call_proc('sp_crear_postulacion', (postulante_id, vacante_id, usuario))
-        return jsonify({'ok': True}), 201
+        postulacion_id, pendiente = registrar_postulacion(postulante_id, vacante_id, usuario)
+        return jsonify({'ok': True, 'postulacion_id': postulacion_id,
+                        'evaluacion': 'pendiente' if pendiente else 'completa'}), 201
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/evaluacion/cola')
+def api_cola_evaluacion():
+    return jsonify(dict(cola_evaluacion.estadisticas(), asincrona=EVALUACION_ASINCRONA))
+
+
+# Páginas grandes (ranking y auditoría) en streaming: el HTML se envía a
+# medida que se renderiza y las filas de la auditoría se leen del cursor sin
+# buffer mientras tanto. El HTML de cada fila se guarda por su contenido
+# (CLAVES_FRAGMENTO), así una fila que no cambió no se vuelve a renderizar.
+FRAGMENTOS_MAX = int(os.getenv('FRAGMENTOS_MAX', '20000'))
+fragmentos_html = CacheLocal(FRAGMENTOS_MAX)
+ESTADISTICAS_FRAGMENTOS = {'acierto': 0, 'fallo': 0}
+CLAVES_FRAGMENTO = {
+    'fila_ranking': lambda r: (r['postulacion_id'], r.get('score'), r.get('postulante_nombre'),
+                               r.get('email'), r.get('fecha_postulacion')),
+    # los eventos de auditoría no se modifican
+    'fila_log': lambda l: (l['id'],),
+}
+metricas.registrar_contador('reclutamiento_fragmentos_total', 'Filas HTML servidas desde cache o renderizadas.',
+                            lambda: {f'resultado="{k}"': v for k, v in ESTADISTICAS_FRAGMENTOS.items()})
+
+
+@app.template_global()
+def fragmento(macro, fila):
+    """HTML de una fila con el macro de templates/_filas.html, cacheado."""
+    clave = (macro,) + CLAVES_FRAGMENTO[macro](fila)
+    encontrado, html = fragmentos_html.obtener(clave)
+    if encontrado:
+        ESTADISTICAS_FRAGMENTOS['acierto'] += 1
+        return html
+    ESTADISTICAS_FRAGMENTOS['fallo'] += 1
+    html = getattr(app.jinja_env.get_template('_filas.html').module, macro)(fila)
+    fragmentos_html.guardar(clave, html, 3600)
+    return html
+
+
+def respuesta_en_streaming(plantilla, **contexto):
+    # los mensajes flash se leen antes de responder: la cookie de sesión que
+    # los descarta sale con las cabeceras, antes que el HTML
+    get_flashed_messages(with_categories=True)
+    return Response(stream_template(plantilla, **contexto), headers={'X-Accel-Buffering': 'no'})
+
+
+class PaginaPerezosa:
+    """Filas de una página que se leen a medida que la plantilla las recorre.
+    Se piden `limite` + 1 filas para saber si hay página siguiente:
+    `siguiente` (cursor de la última fila mostrada) queda listo al terminar
+    el recorrido. La primera fila se lee al crearla, para que un error de la
+    consulta llegue antes de empezar a responder."""
+
+    def __init__(self, filas, limite, cursor_de):
+        self._filas = iter(filas)
+        self._limite = limite
+        self._cursor_de = cursor_de
+        self._primera = next(self._filas, None)
+        self.siguiente = None
+
+    def __iter__(self):
+        if self._primera is None:
+            return
+        ultima = None
+        for i, fila in enumerate(chain([self._primera], self._filas)):
+            if i >= self._limite:
+                # se termina de leer el resultado para devolver la conexión al pool
+                self.siguiente = self._cursor_de(ultima)
+                continue
+            ultima = fila
+            yield fila
+
+
+def leer_pagina_ranking():
+    offset = leer_offset(request.args.get('offset'))
+    return offset, leer_limite(request.args.get('limite'), RANKING_POR_PAGINA, RANKING_POR_PAGINA_MAX)
+
+
 @app.route('/ranking/<int:vacante_id>', methods=['GET'])
 def ranking(vacante_id):
     try:
-        rows = call_proc('sp_generar_ranking', (vacante_id,))
-        # obtener info de vacante para encabezado
-        vac = call_proc('sp_vacante_detalle', (vacante_id,))
-        vacante = vac[0] if vac else {'titulo': 'Vacante'}
-        return render_template('ranking.html', ranking=rows, vacante=vacante)
+        offset, limite = leer_pagina_ranking()
+        vacante, rows, total = almacen_rankings.pagina(vacante_id, offset, limite)
+        if vacante is None:
+            vacante = {'titulo': 'Vacante'}
+        return respuesta_en_streaming('ranking.html', ranking=rows, vacante=vacante, vacante_id=vacante_id,
+                                      offset=offset, limite=limite, total=total)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/ranking/<int:vacante_id>')
+def api_ranking(vacante_id):
+    try:
+        offset, limite = leer_pagina_ranking()
+        vacante, rows, total = almacen_rankings.pagina(vacante_id, offset, limite)
+        if vacante is None:
+            return jsonify({'error': 'Vacante no encontrada'}), 404
+        return jsonify({'vacante_id': vacante_id, 'titulo': vacante.get('titulo'), 'total': total,
+                        'offset': offset, 'ranking': rows})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/ranking/<int:vacante_id>/posicion/<int:postulacion_id>')
+def api_ranking_posicion(vacante_id, postulacion_id):
+    try:
+        posicion = almacen_rankings.posicion(vacante_id, postulacion_id)
+        if posicion is None:
+            return jsonify({'error': 'Postulación no encontrada en el ranking'}), 404
+        return jsonify({'vacante_id': vacante_id, 'postulacion_id': postulacion_id, 'posicion': posicion})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+# Cambios en vivo por Server-Sent Events (ver notificaciones.py). Las
+# escrituras de la app publican en canal_cambios lo que ya tienen en la mano
+# (la fila de sp_ranking_fila, el cierre de la vacante); cada ventana de
+# SSE_VENTANA segundos el evento de cada tema se arma una vez, desde el
+# ranking en memoria, y se copia a todas las páginas suscritas. Las páginas
+# abiertas no consultan la BD.
+SSE_VENTANA = float(os.getenv('SSE_VENTANA', '0.5'))
+SSE_LATIDO = float(os.getenv('SSE_LATIDO', '15'))
+SSE_MAX_CONEXIONES = int(os.getenv('SSE_MAX_CONEXIONES', '1000'))
+
+
+def armar_evento(tema, cambios):
+    """Eventos de un tema: ('ranking', vacante_id) con las postulaciones que
+    cambiaron; ('timeline', postulacion_id) y ('vacante', vacante_id) con los
+    eventos nuevos de la línea de tiempo, ya en HTML."""
+    tipo, id_tema = tema
+    with app.app_context():
+        if tipo == 'ranking':
+            if 'cerrada' in cambios:
+                return [('cerrada', {})]
+            modificados = []
+            for postulacion_id, (primero, ultimo) in cambios.items():
+                modificados.append({
+                    'postulacion_id': postulacion_id,
+                    'anterior': primero['anterior'],
+                    'posicion': almacen_rankings.posicion(id_tema, postulacion_id),
+                    'html': str(fragmento('fila_ranking', ultimo['fila'])),
+                })
+            return [('ranking', {'total': almacen_rankings.total(id_tema), 'cambios': modificados})]
+        macros = app.jinja_env.get_template('_filas.html').module
+        eventos = [{'estado': t['estado'], 'html': str(macros.item_timeline(t))}
+                   for _, t in cambios.values()]
+        return [('timeline', {'eventos': eventos})]
+
+
+canal_cambios = CanalCambios(armar_evento, ventana=SSE_VENTANA, max_suscriptores=SSE_MAX_CONEXIONES)
+atexit.register(canal_cambios.detener)
+metricas.registrar_medidor('reclutamiento_sse_suscriptores', 'Páginas conectadas por SSE.',
+                           canal_cambios.suscriptores)
+metricas.registrar_contador('reclutamiento_sse_eventos_total', 'Eventos SSE entregados y colas desbordadas.',
+                            lambda: {'resultado="enviado"': canal_cambios.enviados,
+                                     'resultado="desborde"': canal_cambios.desbordes})
+
+
+def respuesta_sse(*temas):
+    try:
+        suscripcion = canal_cambios.suscribir(*temas)
+    except DemasiadosSuscriptores as e:
+        return jsonify({'error': str(e)}), 503
+
+    def generar():
+        try:
+            yield f'retry: {int(SSE_LATIDO * 1000)}\n\n'
+            while True:
+                try:
+                    tipo, datos = suscripcion.cola.get(timeout=SSE_LATIDO)
+                except queue.Empty:
+                    # comentario SSE: mantiene viva la conexión en proxies
+                    yield ': latido\n\n'
+                    continue
+                yield f'event: {tipo}\ndata: {app.json.dumps(datos)}\n\n'
+        finally:
+            # también al cortarse la conexión (GeneratorExit)
+            suscripcion.cerrar()
+
+    return Response(generar(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/ranking/<int:vacante_id>/eventos')
+def ranking_eventos(vacante_id):
+    return respuesta_sse(('ranking', vacante_id))
+
+
+@app.route('/ranking/<int:vacante_id>/filas')
+def ranking_filas(vacante_id):
+    """Filas <tr> de una página del ranking, para que la página en vivo se
+    rearme cuando entran o salen postulaciones de ella."""
+    try:
+        offset, limite = leer_pagina_ranking()
+        _, rows, _ = almacen_rankings.pagina(vacante_id, offset, limite)
+        macros = app.jinja_env.get_template('_filas.html').module
+        return str(macros.filas_ranking(rows, offset))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/postulacion/<int:postulacion_id>/timeline/eventos')
+def timeline_eventos(postulacion_id):
+    try:
+        rows = call_proc('sp_ranking_fila', (postulacion_id,))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    if not rows:
+        return jsonify({'error': 'Postulación no encontrada'}), 404
+    return respuesta_sse(('timeline', postulacion_id), ('vacante', rows[0]['vacante_id']))
+
+
+@app.route('/api/sse')
+def api_sse():
+    return jsonify(canal_cambios.estadisticas())
+
+
+# Paginación del listado de vacantes (keyset sobre creado_en, id; ver lecturas.py)
+def listar_vacantes_pagina(departamento_id=None, buscar=None, cursor=None, limite=VACANTES_POR_PAGINA):
+    if buscar:
+        return buscar_vacantes(buscar, departamento_id, cursor, limite)
+    rows = call_proc(LISTAR_VACANTES, parametros_vacantes(departamento_id, cursor, limite))
+    return pagina_vacantes(rows, limite)
+
+
+# Búsqueda de texto: índice invertido en memoria (ver indice_vacantes.py)
+indice_vacantes = IndiceVacantes()
+metricas.registrar_medidor('reclutamiento_indice_vacantes', 'Vacantes en el índice de búsqueda.',
+                           lambda: len(indice_vacantes))
+
+
+@de_primario
+def reconstruir_indice_vacantes():
+    indice_vacantes.reconstruir(call_proc(VACANTES_INDICE, ()))
+    return len(indice_vacantes)
+
+
+def reindexar_vacante(vacante_id):
+    vacante = leer_vacante(vacante_id)
+    if vacante:
+        indice_vacantes.actualizar(vacante)
+    else:
+        indice_vacantes.eliminar(vacante_id)
+
+
+def buscar_vacantes(buscar, departamento_id=None, cursor=None, limite=VACANTES_POR_PAGINA):
+    if not indice_vacantes.construido:
+        reconstruir_indice_vacantes()
+    offset = offset_busqueda(cursor)
+    rows, total = indice_vacantes.buscar(buscar, departamento_id, limite, offset)
+    return rows, siguiente_busqueda(offset, limite, total)
+
+
+# Búsqueda inversa: postulantes existentes que mejor encajan en una vacante
+# (ver candidatos.py). Se construye en el primer uso y se mantiene al editar
+# o registrar postulantes desde la app.
+CANDIDATOS_K = 20
+CANDIDATOS_K_MAX = 200
+indice_candidatos = IndiceCandidatos()
+metricas.registrar_medidor('reclutamiento_indice_candidatos', 'Postulantes en el índice de búsqueda inversa.',
+                           lambda: len(indice_candidatos))
+
+
+@de_primario
+def reconstruir_indice_candidatos():
+    # lectura sin buffer: no se arma la lista completa de postulantes
+    indice_candidatos.reconstruir(stream_query('postulantes_habilidades'))
+    return len(indice_candidatos)
+
+
+def mejores_candidatos(vacante, k=CANDIDATOS_K):
+    if not indice_candidatos.construido:
+        reconstruir_indice_candidatos()
+    top = indice_candidatos.mejores(leer_lista_json(vacante.get('requerimientos')), k)
+    if top:
+        ids = tuple(c['postulante_id'] for c in top)
+        resumen = {r['id']: r for r in query('postulantes_resumen', {'ids': ids})}
+        for c in top:
+            fila = resumen.get(c['postulante_id'], {})
+            c['nombre'] = fila.get('nombre')
+            c['email'] = fila.get('email')
+    return top
+
+
+@app.route('/api/vacante/<int:vacante_id>/candidatos')
+def api_candidatos_vacante(vacante_id):
+    if session.get('rol_app') not in ('admin', 'reclutador'):
+        return jsonify({'error': 'no autorizado'}), 403
+    try:
+        vacante = leer_vacante(vacante_id)
+        if not vacante:
+            return jsonify({'error': 'Vacante no encontrada'}), 404
+        k = leer_limite(request.args.get('k'), CANDIDATOS_K, CANDIDATOS_K_MAX)
+        inicio = time.perf_counter()
+        candidatos = mejores_candidatos(vacante, k)
+        return jsonify({'vacante_id': vacante_id, 'candidatos': candidatos,
+                        'ms': round((time.perf_counter() - inicio) * 1000, 2)})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# Habilidades extraídas de los CVs (ver extraccion_cv.py). Una cola con
+# hilos procesa los CVs subidos; el texto se guarda por hash en
+# cv_extracciones y las habilidades encontradas van a
+# postulantes.habilidades_cv, que suma al score como las declaradas.
+lector_cv = LectorCV(int(os.getenv('EXTRACCION_PROCESOS', '2')))
+ESTADISTICAS_EXTRACCION = {'extraido': 0, 'cache': 0, 'error': 0, 'no_disponible': 0, 'demorada': 0}
+SEGUNDOS_EXTRACCION = {'total': 0.0}
+
+
+def vocabulario_cv():
+    def cargar():
+        habilidades = []
+        for fila in query('vacantes_requerimientos'):
+            habilidades.extend(leer_lista_json(fila['requerimientos']))
+        return VocabularioCV(habilidades)
+    return cache.leer(('vocabulario_cv',), de_primario(cargar))
+
+
+def texto_cv(ruta):
+    """Texto del CV desde cv_extracciones o leyendo el archivo; None si el
+    formato necesita una dependencia que no está instalada o si la lectura
+    pasó el timeout (queda sin extraer para `flask extraer-cvs`)."""
+    digest = hash_de(ruta)
+    filas = query('cv_extraccion', {'hash': digest})
+    if filas:
+        ESTADISTICAS_EXTRACCION['cache'] += 1
+        return filas[0]['texto'] or ''
+    inicio = time.perf_counter()
+    texto, error = '', None
+    try:
+        texto = lector_cv.leer(ruta)
+    except ExtraccionNoDisponible as e:
+        ESTADISTICAS_EXTRACCION['no_disponible'] += 1
+        app.logger.warning('%s (%s)', e, ruta.name)
+        return None
+    except ExtraccionDemorada as e:
+        ESTADISTICAS_EXTRACCION['demorada'] += 1
+        app.logger.warning('%s', e)
+        return None
+    except Exception as e:
+        # archivo dañado o ilegible: se guarda el error para no reintentarlo
+        error = str(e)[:255]
+    duracion = time.perf_counter() - inicio
+    SEGUNDOS_EXTRACCION['total'] += duracion
+    ESTADISTICAS_EXTRACCION['error' if error else 'extraido'] += 1
+    query('guardar_cv_extraccion', {'hash': digest, 'texto': texto, 'caracteres': len(texto),
+                                    'error': error, 'segundos': round(duracion, 3)})
+    return texto
+
+
+def aplicar_habilidades_cv(cv_path, habilidades):
+    """Guarda las habilidades en todos los postulantes con ese CV y re-evalúa sus postulaciones."""
+    query('aplicar_habilidades_cv', {'cv_path': cv_path, 'habilidades': json.dumps(habilidades, ensure_ascii=False)})
+    postulantes = query('postulantes_por_cv', {'cv_path': cv_path})
+    if not postulantes:
+        return
+    ids = tuple(p['id'] for p in postulantes)
+    cache.invalidar(*(('postulante', i) for i in ids))
+    if indice_candidatos.construido:
+        for p in postulantes:
+            indice_candidatos.actualizar(p['id'], p['anos_experiencia'],
+                                         leer_lista_json(p['habilidades']) + leer_lista_json(p['habilidades_cv']))
+    postulaciones = [r['id'] for r in query('postulaciones_de_postulantes', {'ids': ids})]
+    if postulaciones:
+        aplicar_filas_ranking(motor_evaluacion.evaluar_postulaciones(postulaciones, metodo='cv'))
+
+
+def procesar_cvs(cv_paths):
+    vocabulario = vocabulario_cv()
+    for cv_path in cv_paths:
+        ruta = almacen_cv.ruta(cv_path)
+        if ruta is None:
+            continue
+        texto = texto_cv(ruta)
+        if texto is not None:
+            aplicar_habilidades_cv(cv_path, vocabulario.buscar(texto))
+
+
+cola_cv = ColaEvaluacion(
+    procesar_cvs,
+    hilos=int(os.getenv('EXTRACCION_HILOS', '1')),
+    capacidad=int(os.getenv('EXTRACCION_COLA_MAX', '5000')),
+    tamano_lote=10,
+    nombre='extraccion_cv',
+)
+atexit.register(lector_cv.detener)
+metricas.registrar_medidor('reclutamiento_cv_extraccion_cola', 'CVs esperando extracción.', cola_cv.profundidad)
+metricas.registrar_contador('reclutamiento_cv_extraccion_total', 'CVs procesados por resultado.',
+                            lambda: {f'resultado="{k}"': v for k, v in ESTADISTICAS_EXTRACCION.items()})
+metricas.registrar_contador('reclutamiento_cv_extraccion_segundos_total', 'Tiempo leyendo CVs (sin cache).',
+                            lambda: SEGUNDOS_EXTRACCION['total'])
+
+
+@app.route('/api/cv/extraccion')
+def api_cv_extraccion():
+    return jsonify(dict(cola_cv.estadisticas(), resultados=ESTADISTICAS_EXTRACCION,
+                        segundos=round(SEGUNDOS_EXTRACCION['total'], 3)))
+
+
+# Importación masiva de postulantes y postulaciones (ver importacion.py)
+IMPORTAR_LOTE = int(os.getenv('IMPORTAR_LOTE', '1000'))
+FORMATOS_IMPORTACION = {'application/json': 'json', 'application/x-ndjson': 'jsonl',
+                        'application/jsonl': 'jsonl', 'text/csv': 'csv'}
+
+
+def al_importar(tipo, filas):
+    """Mantiene caches, índice de candidatos y rankings después de cada bloque."""
+    if tipo == 'postulantes':
+        # un perfil pedido antes de existir pudo quedar en cache como vacío
+        cache.invalidar(*(('postulante', f['id']) for f in filas))
+        if indice_candidatos.construido:
+            for f in filas:
+                indice_candidatos.actualizar(f['id'], f['anos_experiencia'], f['habilidades'])
+        return
+    try:
+        # un SELECT y un upsert por bloque; las que fallen quedan para evaluar-pendientes
+        evaluar_lote([f['id'] for f in filas if f['id']])
+    except Exception:
+        app.logger.exception('No se pudieron evaluar %d postulaciones importadas', len(filas))
+
+
+def crear_importador(tamano_bloque=IMPORTAR_LOTE, max_errores=1000):
+    return ImportadorMasivo(engine, tamano_bloque, auditoria=buffer_auditoria, al_insertar=al_importar,
+                            max_errores=max_errores)
+
+
+@app.route('/api/importar/<tipo>', methods=['POST'])
+def api_importar(tipo):
+    if session.get('rol_app') not in ('admin', 'reclutador'):
+        return jsonify({'error': 'no autorizado'}), 403
+    if tipo not in ('postulantes', 'postulaciones'):
+        return jsonify({'error': 'tipo debe ser postulantes o postulaciones'}), 404
+    formato = request.args.get('formato') or FORMATOS_IMPORTACION.get(request.mimetype)
+    if formato not in ('json', 'jsonl', 'csv'):
+        return jsonify({'error': 'formato debe ser json, jsonl o csv'}), 400
+    try:
+        # el cuerpo se lee del flujo a medida que se procesa (salvo JSON)
+        registros = leer_registros(request.stream, formato)
+        importar = getattr(crear_importador(), 'importar_' + tipo)
+        # el importador escribe con su propia conexión al primario
+        marcar_escritura()
+        resultado = importar(registros, session.get('username', DB_USER))
+        return jsonify(resultado.resumen())
+    except RegistroInvalido as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+def leer_filtros_vacantes():
+    departamento_id = request.args.get('departamento_id')
+    try:
+        departamento_id = int(departamento_id) if departamento_id else None
+    except ValueError:
+        departamento_id = None
+    buscar = request.args.get('buscar', '').strip()
+    limite = leer_limite(request.args.get('limite'), VACANTES_POR_PAGINA, VACANTES_POR_PAGINA_MAX)
+    return departamento_id, buscar, request.args.get('cursor'), limite
+
+
 @app.route('/')
 def index():
     try:
-        vacantes = call_proc('sp_listar_vacantes', ())
-        
-        # Filtrar por departamento si se solicita
-        departamento_id = request.args.get('departamento_id')
-        if departamento_id:
-            vacantes = [v for v in vacantes if v.get('departamento_id') == int(departamento_id)]
-        
-        # Filtrar por búsqueda si se solicita
-        buscar = request.args.get('buscar', '').lower()
-        if buscar:
-            vacantes = [v for v in vacantes if buscar in v.get('titulo', '').lower() or buscar in v.get('descripcion', '').lower()]
+        departamento_id, buscar, cursor, limite = leer_filtros_vacantes()
+        vacantes, siguiente = listar_vacantes_pagina(departamento_id, buscar, cursor, limite)
         
         # Obtener lista de departamentos para el filtro
-        with engine.connect() as conn:
-            deps = conn.execute(text('SELECT id, nombre FROM departamentos ORDER BY nombre')).fetchall()
-        departamentos = [dict(row._mapping) for row in deps]
+        departamentos = leer_departamentos()
         
-        return render_template('index.html', vacantes=vacantes, departamentos=departamentos)
+        return render_template('index.html', vacantes=vacantes, departamentos=departamentos, siguiente=siguiente)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/vacantes')
+def api_vacantes():
+    try:
+        departamento_id, buscar, cursor, limite = leer_filtros_vacantes()
+        vacantes, siguiente = listar_vacantes_pagina(departamento_id, buscar, cursor, limite)
+        return jsonify({'vacantes': vacantes, 'siguiente': siguiente})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -147,18 +1207,21 @@ def dashboard():
     rol = session.get('rol_app')
     try:
         if rol == 'admin':
-            stats = call_proc('vista_reporte_general', ())
-            # vista_reporte_general devuelve una fila con totales
+            # vista_reporte_general devuelve una fila con totales (es una vista, no un SP)
+            stats = query('reporte_general')
             stats_row = stats[0] if stats else {'total_vacantes': 0, 'total_postulantes': 0, 'promedio_score': 0}
-            with engine.connect() as conn:
-                recent = conn.execute(text('SELECT pt.nombre, v.titulo, po.fecha_postulacion FROM postulaciones po JOIN postulantes pt ON pt.id = po.postulante_id JOIN vacantes v ON v.id = po.vacante_id ORDER BY po.fecha_postulacion DESC LIMIT 10')).fetchall()
-            # convertir rows a dict simple
-            recent_list = [{'nombre': r[0], 'titulo': r[1], 'fecha_postulacion': r[2]} for r in recent]
+            recent_list = query('postulaciones_recientes')
             return render_template('dash_admin.html', stats=stats_row, recent=recent_list)
         elif rol == 'reclutador':
-            vacantes = call_proc('sp_listar_vacantes', ())
-            top = call_proc('sp_generar_ranking', (1,))[:5] if vacantes else []
-            return render_template('dash_reclutador.html', vacantes=vacantes, top=top)
+            # top-k de cada vacante abierta (de los rankings en memoria o con
+            # una consulta acotada) y top-k general mezclando esas listas
+            # (ver AlmacenRankings.top)
+            vacantes = query('vacantes_abiertas')
+            por_vacante, general = almacen_rankings.top([v['id'] for v in vacantes], DASHBOARD_TOP_K)
+            titulos = {v['id']: v['titulo'] for v in vacantes}
+            top = [dict(fila, vacante_id=vacante_id, vacante_titulo=titulos[vacante_id])
+                   for vacante_id, fila in general]
+            return render_template('dash_reclutador.html', vacantes=vacantes, top=top, por_vacante=por_vacante)
         elif rol == 'postulante':
             vacantes = call_proc('sp_listar_vacantes', ())
             return render_template('dash_postulante.html', vacantes=vacantes)
@@ -176,19 +1239,15 @@ def dashboard():
 @app.route('/vacante/<int:vacante_id>')
 def vacante_detalle(vacante_id):
     try:
-        rows = call_proc('sp_vacante_detalle', (vacante_id,))
-        if not rows:
+        vacante = leer_vacante(vacante_id)
+        if not vacante:
             return "Vacante no encontrada", 404
-        vacante = rows[0]
-        return render_template('vacante.html', vacante=vacante)
+        return respuesta_condicional(etag_para('vacante', vacante_id, vacante.get('actualizado_en')),
+                                     lambda: render_template('vacante.html', vacante=vacante))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
-def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXT
-
-
 @app.route('/mi-perfil')
 def mi_perfil():
     """Ruta conveniente para que el postulante vea su propio perfil"""
@@ -207,58 +1266,82 @@ def mi_perfil():
 @app.route('/postulante/<int:postulante_id>')
 def postulante_perfil(postulante_id):
     try:
-        rows = call_proc('sp_get_postulante', (postulante_id,))
-        if not rows:
+        p = leer_postulante(postulante_id)
+        if not p:
             return "Postulante no encontrado", 404
-        p = rows[0]
         
-        # Obtener postulaciones del postulante
-        with engine.connect() as conn:
-            postulaciones = conn.execute(text('''
-                SELECT po.id AS postulacion_id, po.fecha_postulacion, po.estado,
-                       v.id AS vacante_id, v.titulo, d.nombre AS departamento,
-                       e.score
-                FROM postulaciones po
-                JOIN vacantes v ON v.id = po.vacante_id
-                LEFT JOIN departamentos d ON d.id = v.departamento_id
-                LEFT JOIN evaluacion_ia e ON e.postulacion_id = po.id
-                WHERE po.postulante_id = :postulante_id
-                ORDER BY po.fecha_postulacion DESC
-            '''), {'postulante_id': postulante_id}).fetchall()
-        
-        postulaciones_list = [dict(row._mapping) for row in postulaciones]
-        
-        return render_template('postulante_perfil.html', postulante=p, postulaciones=postulaciones_list)
+        # Obtener postulaciones del postulante (no se cachean: cambian con cada postulación y evaluación)
+        postulaciones_list = query('postulaciones_postulante', {'postulante_id': postulante_id})
+        estado = [(r['postulacion_id'], r['estado'], r['score']) for r in postulaciones_list]
+        return respuesta_condicional(
+            etag_para('postulante', postulante_id, p.get('actualizado_en'), estado),
+            lambda: render_template('postulante_perfil.html', postulante=p, postulaciones=postulaciones_list))
     except Exception as e:
         flash(str(e))
         return redirect(url_for('index'))
 
 
+@app.route('/cv/<int:postulante_id>')
+def descargar_cv(postulante_id):
+    rol = session.get('rol_app')
+    if rol not in ('admin', 'reclutador') and not (rol == 'postulante' and session.get('user_id') == postulante_id):
+        return jsonify({'error': 'no autorizado'}), 403
+    try:
+        postulante = leer_postulante(postulante_id)
+        ruta = almacen_cv.ruta(postulante.get('cv_path')) if postulante else None
+        if ruta is None:
+            return jsonify({'error': 'CV no encontrado'}), 404
+        # conditional: ETag (el hash), 304 y rangos (206). El archivo se
+        # entrega con wsgi.file_wrapper (sendfile en gunicorn) o X-Sendfile
+        response = send_file(ruta, conditional=True, etag=ruta.stem,
+                             download_name=f'cv_{postulante_id}{ruta.suffix}')
+        response.cache_control.private = True
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/postulante/editar/<int:postulante_id>', methods=['GET', 'POST'])
 def postulante_editar(postulante_id):
     if request.method == 'GET':
-        rows = call_proc('sp_get_postulante', (postulante_id,))
-        if not rows:
+        postulante = leer_postulante(postulante_id)
+        if not postulante:
             flash('Postulante no encontrado')
             return redirect(url_for('index'))
-        return render_template('postulante_editar.html', postulante=rows[0])
-    # POST: procesar edición y posible CV upload
-    nombre = request.form.get('nombre')
-    email = request.form.get('email')
-    anos = int(request.form.get('anos_experiencia') or 0)
-    habilidades = request.form.get('habilidades') or '[]'
-    cv_path = None
-    file = request.files.get('cv')
+        return render_template('postulante_editar.html', postulante=postulante)
+    # POST: procesar edición y posible CV upload. Con Content-Length declarado
+    # el límite se aplica antes de leer el cuerpo; si no, al pasar CV_MAX_BYTES
+    request.max_content_length = CV_MAX_BYTES + 64 * 1024
+    try:
+        form = request.form
+        file = request.files.get('cv')
+    except (ArchivoDemasiadoGrande, RequestEntityTooLarge):
+        flash(f'El CV supera el tamaño máximo ({CV_MAX_BYTES // (1024 * 1024)} MB)')
+        return redirect(url_for('postulante_editar', postulante_id=postulante_id))
+    nombre = form.get('nombre')
+    email = form.get('email')
+    anos = int(form.get('anos_experiencia') or 0)
+    habilidades = form.get('habilidades') or '[]'
+    # sin archivo nuevo se conserva el CV actual
+    actual = leer_postulante(postulante_id)
+    cv_path = actual.get('cv_path') if actual else None
     if file and file.filename:
-        if not allowed_file(file.filename):
+        extension = almacen_cv.extension(file.filename)
+        if extension is None:
             flash('Extensión de archivo no permitida')
             return redirect(url_for('postulante_editar', postulante_id=postulante_id))
-        filename = secure_filename(f"postulante_{postulante_id}_cv_{file.filename}")
-        fullpath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(fullpath)
-        cv_path = os.path.relpath(fullpath, start=os.path.dirname(__file__))
+        cv_path = almacen_cv.confirmar(file.stream, extension)
     try:
         call_proc('sp_update_postulante', (postulante_id, nombre, email, anos, habilidades, cv_path))
+        cache.invalidar(('postulante', postulante_id))
+        cv_nuevo = cv_path != (actual.get('cv_path') if actual else None)
+        if indice_candidatos.construido:
+            # con CV nuevo sp_update_postulante vacía habilidades_cv hasta la extracción
+            habilidades_cv = [] if cv_nuevo or not actual else leer_lista_json(actual.get('habilidades_cv'))
+            indice_candidatos.actualizar(postulante_id, anos, leer_lista_json(habilidades) + habilidades_cv)
+        if cv_nuevo and cv_path:
+            # si la cola está llena lo recupera `flask extraer-cvs`
+            cola_cv.encolar(cv_path)
         flash('Perfil actualizado')
         return redirect(url_for('postulante_perfil', postulante_id=postulante_id))
     except Exception as e:
@@ -270,8 +1353,7 @@ def postulante_editar(postulante_id):
 def vacante_crear():
     if request.method == 'GET':
         # traer departamentos
-        with engine.connect() as conn:
-            deps = conn.execute(text('SELECT id, nombre FROM departamentos')).fetchall()
+        deps = leer_departamentos()
         return render_template('vacante_form.html', deps=deps, vacante=None)
     titulo = request.form.get('titulo')
     descripcion = request.form.get('descripcion')
@@ -282,7 +1364,10 @@ def vacante_crear():
         flash('Departamento es requerido')
         return redirect(url_for('vacante_crear'))
     try:
-        call_proc('sp_create_vacante', (titulo, descripcion, int(departamento_id), requerimientos, usuario))
+        rows = call_proc('sp_create_vacante', (titulo, descripcion, int(departamento_id), requerimientos, usuario))
+        cache.invalidar(('vocabulario_cv',))
+        if rows and indice_vacantes.construido:
+            reindexar_vacante(rows[0]['id'])
         flash('Vacante creada')
         return redirect(url_for('index'))
     except Exception as e:
@@ -293,13 +1378,13 @@ def vacante_crear():
 @app.route('/vacante/editar/<int:vacante_id>', methods=['GET', 'POST'])
 def vacante_editar(vacante_id):
     if request.method == 'GET':
-        with engine.connect() as conn:
-            deps = conn.execute(text('SELECT id, nombre FROM departamentos')).fetchall()
-        rows = call_proc('sp_vacante_detalle', (vacante_id,))
-        if not rows:
+        deps = leer_departamentos()
+        vacante = leer_vacante(vacante_id)
+        if not vacante:
             flash('Vacante no encontrada')
             return redirect(url_for('index'))
-        vacante = rows[0]
+        # el formulario edita los requerimientos como texto JSON
+        vacante = dict(vacante, requerimientos=json.dumps(vacante.get('requerimientos') or [], ensure_ascii=False))
         return render_template('vacante_form.html', deps=deps, vacante=vacante)
     # POST
     titulo = request.form.get('titulo')
@@ -314,6 +1399,9 @@ def vacante_editar(vacante_id):
     usuario = session.get('username', DB_USER)
     try:
         call_proc('sp_update_vacante', (vacante_id, titulo, descripcion, departamento_id, requerimientos, estado, usuario))
+        cache.invalidar(('vacante', vacante_id), ('vocabulario_cv',))
+        if indice_vacantes.construido:
+            reindexar_vacante(vacante_id)
         flash('Vacante actualizada')
         return redirect(url_for('vacante_detalle', vacante_id=vacante_id))
     except Exception as e:
@@ -325,7 +1413,10 @@ def vacante_editar(vacante_id):
 def postulacion_timeline(postulacion_id):
     try:
         rows = call_proc('sp_postulacion_timeline', (postulacion_id,))
-        return render_template('postulacion_timeline.html', timeline=rows, postulacion_id=postulacion_id)
+        # sin fila 'evaluacion' el score aún no se calculó (modo asíncrono)
+        pendiente = bool(rows) and not any(r.get('estado') == 'evaluacion' for r in rows)
+        return render_template('postulacion_timeline.html', timeline=rows, postulacion_id=postulacion_id,
+                               evaluacion_pendiente=pendiente)
     except Exception as e:
         flash(str(e))
         return redirect(url_for('index'))
@@ -334,7 +1425,7 @@ def postulacion_timeline(postulacion_id):
 @app.route('/postulacion/<int:postulacion_id>/recalcular', methods=['POST'])
 def postulacion_recalcular(postulacion_id):
     try:
-        call_proc('sp_recalcular_score', (postulacion_id,))
+        aplicar_filas_ranking(call_proc('sp_recalcular_score', (postulacion_id,)))
         flash('Score recalculado')
         # intentar volver a la pagina anterior
         return redirect(request.referrer or url_for('index'))
@@ -348,11 +1439,23 @@ def reportes():
     return render_template('reportes.html')
 
 
+# Los reportes leen los acumulados rep_* (ver sp_reconstruir_reportes). El
+# ETag es el hash del JSON: una recarga del gráfico sin cambios recibe 304.
+REPORTES_MAX_AGE = int(os.getenv('REPORTES_MAX_AGE', '60'))
+
+
+def respuesta_reporte(rows):
+    response = jsonify(rows)
+    response.cache_control.private = True
+    response.cache_control.max_age = REPORTES_MAX_AGE
+    response.add_etag()
+    return response.make_conditional(request)
+
+
 @app.route('/api/report/vacantes_mes')
 def api_vacantes_mes():
     try:
-        rows = call_proc('sp_report_vacantes_por_mes', ())
-        return jsonify(rows)
+        return respuesta_reporte(call_proc(REPORTES['vacantes_mes'], ()))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -360,42 +1463,169 @@ def api_vacantes_mes():
 @app.route('/api/report/postulantes_vacante')
 def api_postulantes_vacante():
     try:
-        rows = call_proc('sp_report_postulantes_por_vacante', ())
-        return jsonify(rows)
+        return respuesta_reporte(call_proc(REPORTES['postulantes_vacante'], ()))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/report/promedio_departamento')
+def api_promedio_departamento():
+    try:
+        return respuesta_reporte(call_proc(REPORTES['promedio_departamento'], ()))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+# Auditoría: filtros y paginación en la BD (keyset sobre fecha, id)
+LOGS_POR_PAGINA = 100
+LOGS_POR_PAGINA_MAX = 1000
+ACCIONES_AUDITORIA = ('INSERT', 'UPDATE', 'DELETE', 'SP', 'APP')
+
+
+def leer_fecha(valor):
+    """'YYYY-MM-DD' (o ISO con hora) a datetime; None si falta. ValueError si es inválida."""
+    if not valor:
+        return None
+    return datetime.fromisoformat(valor)
+
+
+def leer_filtros_logs():
+    """Filtros de /auditoria y /api/auditoria. `to` es inclusivo si viene sin hora."""
+    args = request.args
+    accion = (args.get('accion') or '').strip().upper() or None
+    if accion and accion not in ACCIONES_AUDITORIA:
+        raise ValueError(f'acción inválida: {accion}')
+    hasta = leer_fecha(args.get('to'))
+    if hasta is not None and len(args.get('to')) == 10:
+        hasta += timedelta(days=1)
+    return {
+        'usuario': (args.get('user') or '').strip() or None,
+        'accion': accion,
+        'tabla': (args.get('tabla') or '').strip() or None,
+        'fila_id': (args.get('fila_id') or '').strip() or None,
+        'desde': leer_fecha(args.get('from')),
+        'hasta': hasta,
+    }
+
+
+def parametros_logs(filtros, cursor, limite):
+    """Parámetros de sp_buscar_logs; pide una fila de más para saber si hay otra página."""
+    partes = decodificar_cursor(cursor)
+    try:
+        cursor_fecha, cursor_id = datetime.fromisoformat(partes[0]), int(partes[1])
+    except (TypeError, ValueError, IndexError):
+        cursor_fecha, cursor_id = None, None
+    return (filtros['usuario'], filtros['accion'], filtros['tabla'], filtros['fila_id'],
+            filtros['desde'], filtros['hasta'], cursor_fecha, cursor_id, limite + 1)
+
+
+def cursor_log(fila):
+    return codificar_cursor(fila['fecha'], fila['id'])
+
+
+def buscar_logs(filtros, cursor=None, limite=LOGS_POR_PAGINA):
+    rows = call_proc('sp_buscar_logs', parametros_logs(filtros, cursor, limite))
+    siguiente = None
+    if len(rows) > limite:
+        rows = rows[:limite]
+        siguiente = cursor_log(rows[-1])
+    return rows, siguiente
+
+
 @app.route('/auditoria')
 def auditoria():
-    user = request.args.get('user')
-    accion = request.args.get('accion')
-    fecha_from = request.args.get('from')
-    fecha_to = request.args.get('to')
-    # simplificación: usar sp_listar_logs y filtrar en Python
-    try:
-        logs = call_proc('sp_listar_logs', ())
-        # aplicar filtros simples
-        def within(row):
-            ok = True
-            if user and user.lower() not in (row.get('usuario_mysql') or '').lower():
-                ok = False
-            if accion and accion.lower() not in (row.get('accion') or '').lower():
-                ok = False
-            # fechas omitidas para simplicidad
-            return ok
-        logs_f = [r for r in logs if within(r)]
-        return render_template('auditoria.html', logs=logs_f)
+    try:
+        filtros = leer_filtros_logs()
+        limite = leer_limite(request.args.get('limite'), LOGS_POR_PAGINA, LOGS_POR_PAGINA_MAX)
+        filas = stream_proc('sp_buscar_logs', parametros_logs(filtros, request.args.get('cursor'), limite), 'proc')
+        return respuesta_en_streaming('auditoria.html', logs=PaginaPerezosa(filas, limite, cursor_log))
     except Exception as e:
         flash(str(e))
         return redirect(url_for('index'))
 
 
+@app.route('/api/auditoria')
+def api_auditoria():
+    if session.get('rol_app') not in ('admin', 'auditor'):
+        return jsonify({'error': 'no autorizado'}), 403
+    try:
+        filtros = leer_filtros_logs()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        limite = leer_limite(request.args.get('limite'), LOGS_POR_PAGINA, LOGS_POR_PAGINA_MAX)
+        logs, siguiente = buscar_logs(filtros, request.args.get('cursor'), limite)
+        return jsonify({'logs': logs, 'siguiente': siguiente})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# Exportaciones en streaming (CSV/NDJSON). Cada fila trae su `cursor`;
+# pasarlo como ?cursor= retoma la exportación después de esa fila.
+
+
+def cursor_ranking(fila):
+    score = fila.get('score')
+    return codificar_cursor(-1 if score is None else score, fila['fecha_postulacion'], fila['postulacion_id'])
+
+
+@app.route('/exportar/ranking/<int:vacante_id>')
+def exportar_ranking(vacante_id):
+    if session.get('rol_app') not in ('admin', 'reclutador'):
+        return jsonify({'error': 'no autorizado'}), 403
+    params = {'vacante_id': vacante_id, 'score': 1000, 'fecha': datetime.min, 'id': 0}
+    partes = decodificar_cursor(request.args.get('cursor'))
+    if partes:
+        try:
+            params.update(score=float(partes[0]), fecha=datetime.fromisoformat(partes[1]), id=int(partes[2]))
+        except (ValueError, IndexError):
+            return jsonify({'error': 'cursor inválido'}), 400
+    auditar('vacantes', vacante_id, 'exportación del ranking')
+    return respuesta_exportacion(stream_query('exportar_ranking', params), cursor_ranking,
+                                 f'ranking_vacante_{vacante_id}')
+
+
+@app.route('/exportar/auditoria')
+def exportar_auditoria():
+    if session.get('rol_app') not in ('admin', 'auditor'):
+        return jsonify({'error': 'no autorizado'}), 403
+    try:
+        filtros = leer_filtros_logs()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    partes = decodificar_cursor(request.args.get('cursor'))
+    try:
+        cursor_fecha, cursor_id = datetime.fromisoformat(partes[0]), int(partes[1])
+    except (TypeError, ValueError, IndexError):
+        cursor_fecha, cursor_id = None, None
+    filas = stream_proc('sp_buscar_logs', (
+        filtros['usuario'], filtros['accion'], filtros['tabla'], filtros['fila_id'],
+        filtros['desde'], filtros['hasta'], cursor_fecha, cursor_id, None,
+    ))
+    auditar('logs_auditoria', None, 'exportación: ' + request.query_string.decode(errors='replace')[:500])
+    return respuesta_exportacion(filas, lambda f: codificar_cursor(f['fecha'], f['id']), 'auditoria')
+
+
+@app.route('/exportar/reporte/<nombre>')
+def exportar_reporte(nombre):
+    proc = REPORTES.get(nombre)
+    if proc is None:
+        return jsonify({'error': 'reporte no encontrado'}), 404
+    # los reportes son agregados sin clave única: el cursor es el número de fila
+    partes = decodificar_cursor(request.args.get('cursor'))
+    try:
+        desde = max(0, int(partes[0]))
+    except (TypeError, ValueError, IndexError):
+        desde = 0
+    numero = count(desde + 1)
+    return respuesta_exportacion(islice(stream_proc(proc, ()), desde, None),
+                                 lambda fila: codificar_cursor(next(numero)), f'reporte_{nombre}')
+
+
 @app.route('/config/departamentos')
 def config_departamentos():
     try:
-        with engine.connect() as conn:
-            deps = conn.execute(text('SELECT id, nombre, descripcion FROM departamentos ORDER BY nombre')).fetchall()
+        deps = leer_departamentos_detalle()
         return render_template('config_departamentos.html', deps=deps)
     except Exception as e:
         flash(str(e))
@@ -410,6 +1640,7 @@ def config_departamento_crear():
     descripcion = request.form.get('descripcion')
     try:
         call_proc('sp_create_departamento', (nombre, descripcion))
+        cache.invalidar(('departamentos',), ('departamentos_detalle',))
         flash('Departamento creado')
         return redirect(url_for('config_departamentos'))
     except Exception as e:
@@ -446,19 +1677,13 @@ def postular_ui():
         return redirect(request.referrer or url_for('index'))
     
     try:
-        call_proc('sp_crear_postulacion', (postulante_id, vacante_id, usuario))
-        flash('✓ ¡Postulación enviada correctamente! Tu perfil será evaluado por nuestro sistema de IA.')
-        
-        # Obtener el ID de la postulación para redirigir al timeline
-        with engine.connect() as conn:
-            result = conn.execute(text('''
-                SELECT id FROM postulaciones 
-                WHERE postulante_id = :postulante_id AND vacante_id = :vacante_id 
-                ORDER BY fecha_postulacion DESC LIMIT 1
-            '''), {'postulante_id': postulante_id, 'vacante_id': vacante_id}).fetchone()
+        postulacion_id, pendiente = registrar_postulacion(postulante_id, vacante_id, usuario)
+        if pendiente:
+            flash('✓ ¡Postulación enviada correctamente! Tu perfil se está evaluando; el resultado aparecerá en breve.')
+        else:
+            flash('✓ ¡Postulación enviada correctamente! Tu perfil será evaluado por nuestro sistema de IA.')
         
-        if result:
-            postulacion_id = result[0]
+        if postulacion_id:
             return redirect(url_for('postulacion_timeline', postulacion_id=postulacion_id))
         
         return redirect(url_for('vacante_detalle', vacante_id=vacante_id))
@@ -483,11 +1708,16 @@ def login():
             session['user_id'] = user.get('id')
             session['username'] = user.get('username')
             session['rol_app'] = user.get('rol_app')
+            auditar('usuarios', user.get('id'), 'inicio de sesión')
             flash('Bienvenido ' + session['username'])
             return redirect(url_for('index'))
+        auditar('usuarios', None, 'inicio de sesión fallido', usuario=username)
         flash('Error de autenticación')
         return redirect(url_for('login'))
     except Exception as e:
+        # sp_authenticate_user rechaza con SIGNAL (usuario inexistente o
+        # bloqueado, contraseña incorrecta): la mayoría de los fallos llegan aquí
+        auditar('usuarios', None, f'inicio de sesión fallido: {str(e)[:200]}', usuario=username)
         flash(str(e))
         return redirect(url_for('login'))
 
@@ -513,23 +1743,9 @@ def register():
     try:
         # Crear postulante y usuario: insert postulante y crear usuario (rol postulante)
         # Insert postulante
-        conn = engine.raw_connection()
-        cur = None
-        try:
-            cur = conn.cursor()
-            cur.execute('INSERT INTO postulantes (nombre, email) VALUES (%s, %s)', (nombre, email))
-            postulante_id = cur.lastrowid
-            conn.commit()
-        finally:
-            if cur is not None:
-                try:
-                    cur.close()
-                except Exception:
-                    pass
-            try:
-                conn.close()
-            except Exception:
-                pass
+        postulante_id = insertar('insertar_postulante', {'nombre': nombre, 'email': email})
+        if indice_candidatos.construido:
+            indice_candidatos.actualizar(postulante_id, 0, [])
         # Crear usuario interno
         call_proc('sp_crear_usuario_ex', (username, password, nombre, email, 'postulante'))
         flash('Cuenta creada. Puedes iniciar sesión')
@@ -587,10 +1803,203 @@ def cerrar_vacante():
         return jsonify({'error': 'vacante_id requerido'}), 400
     try:
         call_proc('sp_cerrar_vacante', (vacante_id, usuario))
+        cache.invalidar(('vacante', int(vacante_id)))
+        indice_vacantes.eliminar(int(vacante_id))
+        canal_cambios.publicar(('ranking', int(vacante_id)), 'cerrada', True)
+        canal_cambios.publicar(('vacante', int(vacante_id)), 'cerrada',
+                               {'estado': 'cerrada', 'fecha': datetime.now(), 'usuario': usuario})
         return jsonify({'ok': True}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/indice/reconstruir', methods=['POST'])
+def api_reconstruir_indice():
+    if session.get('rol_app') != 'admin':
+        return jsonify({'error': 'no autorizado'}), 403
+    try:
+        return jsonify({'ok': True, 'vacantes': reconstruir_indice_vacantes()})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.cli.command('reindexar-vacantes')
+def cli_reindexar_vacantes():
+    """Reconstruye el índice de búsqueda de vacantes desde la BD."""
+    print(f'Vacantes indexadas: {reconstruir_indice_vacantes()}')
+
+
+@app.cli.command('reindexar-candidatos')
+def cli_reindexar_candidatos():
+    """Construye el índice de búsqueda inversa de postulantes y muestra el tiempo."""
+    inicio = time.perf_counter()
+    total = reconstruir_indice_candidatos()
+    print(f'Postulantes indexados: {total} en {time.perf_counter() - inicio:.1f}s')
+
+
+@app.cli.command('importar')
+@click.argument('tipo', type=click.Choice(['postulantes', 'postulaciones']))
+@click.argument('archivo', type=click.Path(exists=True, dir_okay=False))
+@click.option('--formato', type=click.Choice(['json', 'jsonl', 'csv']), default=None,
+              help='Por defecto, según la extensión del archivo.')
+@click.option('--lote', type=int, default=IMPORTAR_LOTE, show_default=True, help='Filas por transacción.')
+@click.option('--usuario', default=DB_USER, show_default=True, help='Usuario que queda como creador y en la auditoría.')
+@click.option('--errores', 'archivo_errores', type=click.Path(dir_okay=False), default=None,
+              help='Escribe los errores por fila en este archivo (JSONL).')
+def cli_importar(tipo, archivo, formato, lote, usuario, archivo_errores):
+    """Importa postulantes o postulaciones desde JSON, JSONL o CSV."""
+    formato = formato or {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}.get(Path(archivo).suffix.lower(), 'json')
+    importador = crear_importador(lote, max_errores=None if archivo_errores else 20)
+    with open(archivo, 'rb') as flujo:
+        resultado = getattr(importador, 'importar_' + tipo)(leer_registros(flujo, formato), usuario)
+    resumen = resultado.resumen()
+    print(f"{resumen['insertadas']} de {resumen['filas']} filas insertadas, {resumen['fallidas']} con error "
+          f"en {resumen['segundos']:.1f}s ({resumen['filas_por_segundo'] or 0:,} filas/s)")
+    if archivo_errores:
+        with open(archivo_errores, 'w', encoding='utf-8') as salida:
+            for error in resumen['errores']:
+                salida.write(json.dumps(error, ensure_ascii=False) + '\n')
+    else:
+        for error in resumen['errores']:
+            print(f"  fila {error['fila']}: {error['error']}")
+
+
+@app.cli.command('limpiar-cvs')
+@click.option('--gracia', type=int, default=3600, show_default=True,
+              help='Segundos de antigüedad mínima (protege subidas en curso).')
+@click.option('--simular', is_flag=True, help='Solo informa qué se borraría.')
+def cli_limpiar_cvs(gracia, simular):
+    """Borra del almacén los CVs que ya no referencia ningún postulante."""
+    referenciados = [r['cv_path'] for r in stream_query('cv_paths')]
+    archivos, liberados = almacen_cv.recolectar(referenciados, gracia, simular)
+    accion = 'Se borrarían' if simular else 'Borrados'
+    print(f'{accion} {archivos} archivos ({liberados / (1024 * 1024):.1f} MB)')
+
+
+@app.cli.command('extraer-cvs')
+@click.option('--todos', is_flag=True,
+              help='También los ya extraídos (usa el texto cacheado con el vocabulario actual).')
+def cli_extraer_cvs(todos):
+    """Extrae habilidades de los CVs pendientes (p. ej. los que no entraron en la cola)."""
+    cv_paths = [r['cv_path'] for r in query('cv_paths' if todos else 'cvs_sin_extraer')]
+    inicio = time.perf_counter()
+    procesar_cvs(cv_paths)
+    duracion = time.perf_counter() - inicio
+    print(f'CVs procesados: {len(cv_paths)} en {duracion:.1f}s '
+          f'({len(cv_paths) / duracion if duracion > 0 else 0:,.1f} CVs/s) {ESTADISTICAS_EXTRACCION}')
+
+
+@app.cli.command('recalcular-scores')
+@click.option('--vacante', 'vacante_id', type=int, default=None, help='Solo esta vacante (por defecto, todas).')
+@click.option('--lote', type=int, default=TAMANO_LOTE, show_default=True, help='Filas por upsert multi-fila.')
+@click.option('--forzar', is_flag=True, help='Escribir también los scores que no cambian.')
+def cli_recalcular_scores(vacante_id, lote, forzar):
+    """Re-evalúa postulaciones en bloque con el motor de evaluacion.py."""
+    motor = MotorEvaluacion(engine, tamano_lote=lote, solo_cambios=not forzar)
+    progreso = motor.recalcular(vacante_id)
+    print(progreso.resumen())
+
+
+@app.cli.command('evaluar-pendientes')
+@click.option('--lote', type=int, default=TAMANO_LOTE, show_default=True)
+def cli_evaluar_pendientes(lote):
+    """Evalúa postulaciones sin evaluacion_ia (p. ej. las que quedaron en la cola al reiniciar)."""
+    ids = [r['id'] for r in query('postulaciones_sin_evaluar')]
+    for i in range(0, len(ids), lote):
+        motor_evaluacion.evaluar_postulaciones(ids[i:i + lote])
+    print(f'Postulaciones evaluadas: {len(ids)}')
+
+
+
+
+@app.cli.command('reconstruir-reportes')
+def cli_reconstruir_reportes():
+    """Recalcula los acumulados de reportes (rep_*) desde las tablas base."""
+    rows = call_proc('sp_reconstruir_reportes', ())
+    fila = rows[0] if rows else {}
+    print(f"Acumulados reconstruidos: {fila.get('vacantes', 0)} vacantes, {fila.get('departamentos', 0)} departamentos")
+
+@app.cli.command('archivar-auditoria')
+@click.option('--meses', type=int, default=6, show_default=True, help='Meses completos que quedan en logs_auditoria.')
+@click.option('--lote', type=int, default=5000, show_default=True)
+def cli_archivar_auditoria(meses, lote):
+    """Mueve los logs anteriores a los últimos --meses meses a logs_auditoria_historico."""
+    hoy = datetime.now()
+    mes = hoy.year * 12 + hoy.month - 1 - meses
+    antes = datetime(mes // 12, mes % 12 + 1, 1)
+    rows = call_proc('sp_archivar_logs', (antes, lote))
+    print(f"Logs anteriores a {antes:%Y-%m-%d} archivados: {rows[0]['archivados'] if rows else 0}")
+
+
+def motor_migracion():
+    return create_engine(f"mysql+pymysql://{DB_MIGRACION_USER}:{DB_MIGRACION_PASS}@{DB_HOST}/{DB_NAME}",
+                         poolclass=NullPool)
+
+
+@app.cli.command('migrar')
+@click.option('--hasta', type=int, default=None, help='Aplicar hasta esta versión (por defecto, todas).')
+@click.option('--simular', is_flag=True, help='Solo lista las migraciones pendientes.')
+def cli_migrar(hasta, simular):
+    """Aplica las migraciones pendientes de migraciones/ (ver migrador.py)."""
+    try:
+        pendientes = Migrador(motor_migracion()).aplicar(
+            hasta, simular, al_aplicar=lambda m, segundos: print(f'{m.ruta.name} aplicada en {segundos:.2f}s'))
+    except ErrorMigracion as e:
+        raise click.ClickException(str(e))
+    if simular:
+        for m in pendientes:
+            print(f'Pendiente: {m.ruta.name}')
+    print(f"Migraciones {'pendientes' if simular else 'aplicadas'}: {len(pendientes)}")
+
+
+@app.cli.command('migraciones')
+def cli_migraciones():
+    """Lista las migraciones y si están aplicadas."""
+    for m in Migrador(motor_migracion()).estado():
+        if m['modificada'] is None:
+            marca = 'SIN ARCHIVO'
+        elif m['modificada']:
+            marca = 'MODIFICADA'
+        else:
+            marca = ''
+        aplicada = f"{m['aplicada_en']:%Y-%m-%d %H:%M}" if m['aplicada_en'] else 'pendiente'
+        print(f"{m['version']:04d} {m['nombre']:<40} {aplicada:<16} {marca}")
+
+
+@app.cli.command('verificar-planes')
+@click.option('--min-filas', type=int, default=1000, show_default=True,
+              help='Filas desde las que una tabla cuenta como grande.')
+@click.option('--sin-analizar', is_flag=True, help='No ejecutar ANALYZE TABLE antes de revisar.')
+@click.option('--detalle', is_flag=True, help='Mostrar el EXPLAIN de cada sentencia.')
+def cli_verificar_planes(min_filas, sin_analizar, detalle):
+    """EXPLAIN de las consultas frecuentes; sale con código 1 si alguna lee
+    una tabla grande entera o hace un filesort no permitido (ver planes.py)."""
+    conn = motor_migracion().raw_connection()
+    try:
+        resultados = planes.revisar(conn, CONSULTAS, min_filas=min_filas, analizar=not sin_analizar)
+    finally:
+        conn.close()
+    fallidas = 0
+    for r in resultados:
+        fallidas += bool(r['problemas'])
+        print(f"{'FALLA' if r['problemas'] else 'ok':<6}{r['nombre']}")
+        for problema in r['problemas']:
+            print(f'      {problema}')
+        for aviso in r['avisos']:
+            print(f'      aviso: {aviso}')
+        if detalle:
+            for plan in r['planes']:
+                for fila in plan:
+                    print(f"        {fila.get('table')} type={fila.get('type')} key={fila.get('key')} "
+                          f"rows={fila.get('rows')} {fila.get('Extra') or ''}")
+    print(f'Revisiones: {len(resultados)}, con problemas: {fallidas}')
+    if fallidas:
+        raise SystemExit(1)
+
 if __name__ == '__main__':
+    # construir el índice al arrancar; si la BD no responde se hará en la primera búsqueda
+    try:
+        reconstruir_indice_vacantes()
+    except Exception as e:
+        print(f'Aviso: índice de vacantes no construido ({e})')
     app.run(debug=True)
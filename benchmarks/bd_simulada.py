@@ -0,0 +1,576 @@
+"""Base de datos simulada en proceso para benchmarks sin MySQL.
+
+Emula, sobre datos sintéticos en memoria, los procedimientos y consultas con
+nombre que usa app.py (sp_listar_vacantes_pagina, sp_generar_ranking,
+sp_crear_postulacion, sp_buscar_logs, ...). Expone la misma interfaz DB-API
+mínima que usa ejecutar_sql (raw_connection, escape, cursor, execute,
+description, fetchall, nextset, commit), de modo que la app corre sin
+cambios y se miden sus rutas reales. `latencia_ms` agrega una espera fija
+por viaje para modelar la red hasta la BD.
+
+No reproduce costos reales de MySQL: sirve para comparar versiones de la
+app entre sí, no para estimar la capacidad de la BD.
+"""
+import json
+import random
+import re
+import sys
+import threading
+import time
+from array import array
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from consultas import CONSULTAS  # noqa: E402
+import importacion  # noqa: E402
+import replicas  # noqa: E402
+
+BASE = datetime(2025, 1, 1)
+PUESTOS = ['Desarrollador', 'Analista', 'Gerente', 'Asistente', 'Técnico', 'Diseñador',
+           'Contador', 'Ingeniero', 'Coordinador', 'Especialista']
+AREAS = ['Python', 'Marketing', 'Logística', 'Producción', 'Educación', 'Finanzas',
+         'Comunicación', 'Recursos Humanos', 'Atención al cliente', 'Seguridad']
+HABILIDADES = ['python', 'sql', 'flask', 'java', 'spring', 'marketing', 'seo', 'ads', 'excel',
+               'ingles', 'liderazgo', 'ventas', 'contabilidad', 'docker', 'linux', 'react',
+               'negociacion', 'logistica', 'soporte', 'redes']
+PALABRAS = ('experiencia gestión equipo proyectos clientes análisis datos reportes ventas '
+            'planificación calidad procesos inglés liderazgo negociación soporte').split()
+
+_RE_CALL = re.compile(r'CALL (\w+)\(([^)]*)\)')
+_CONSULTA_POR_SQL = {sql: nombre for nombre, sql in CONSULTAS.items()}
+
+
+class DatosSimulados:
+    def __init__(self, vacantes=1000, postulantes=20000, postulaciones=50000, logs=20000,
+                 departamentos=20, semilla=42):
+        rnd = random.Random(semilla)
+        self._lock = threading.Lock()
+        self.departamentos = [
+            {'id': i, 'nombre': f'Departamento {i:02d}', 'descripcion': f'Área {i}'}
+            for i in range(1, departamentos + 1)
+        ]
+        self.vacantes = {}
+        for i in range(1, vacantes + 1):
+            self.vacantes[i] = {
+                'id': i,
+                'titulo': f'{rnd.choice(PUESTOS)} de {rnd.choice(AREAS)}',
+                'descripcion': ' '.join(rnd.choices(PALABRAS, k=120)),
+                'departamento_id': rnd.randint(1, departamentos),
+                'requerimientos': rnd.sample(HABILIDADES, 3),
+                'estado': 'abierta',
+                'activo': 1,
+                'creado_en': BASE + timedelta(minutes=i),
+                'actualizado_en': BASE + timedelta(minutes=i),
+            }
+        self.postulantes = [None] + [
+            (f'Postulante {i}', f'p{i}@example.com', rnd.randint(0, 20), rnd.sample(HABILIDADES, rnd.randint(1, 6)))
+            for i in range(1, postulantes + 1)
+        ]
+        self.habilidades_cv = {}  # postulante_id -> JSON
+        # postulaciones en arrays paralelos (id = índice); la posición 0 no se usa
+        self.po_postulante = array('i', [0])
+        self.po_vacante = array('i', [0])
+        self.po_segundos = array('l', [0])
+        self.po_score = array('d', [0.0])
+        self.por_vacante = {vid: [] for vid in self.vacantes}
+        self.pares = set()
+        segundos = vacantes * 60
+        while len(self.po_vacante) <= postulaciones:
+            postulante_id = rnd.randint(1, postulantes)
+            vacante_id = rnd.randint(1, vacantes)
+            if (postulante_id, vacante_id) in self.pares:
+                continue
+            segundos += rnd.randint(1, 30)
+            self._agregar_postulacion(postulante_id, vacante_id, segundos)
+        self.por_email = {p[1]: i for i, p in enumerate(self.postulantes) if p}
+        self.cv_paths = {}  # postulante_id -> cv_path
+        self.cv_extracciones = {}  # hash -> (texto, error)
+        self.usuarios = {'admin': None, 'reclutador1': None, 'auditor1': None}  # username -> email
+        self.logs = [
+            (i, rnd.choice(['admin', 'reclutador1', 'auditor1']), rnd.choice(['INSERT', 'UPDATE', 'SP']),
+             rnd.choice(['postulaciones', 'vacantes', 'evaluacion_ia']), str(rnd.randint(1, postulaciones)),
+             BASE + timedelta(seconds=i * 30), 'evento simulado')
+            for i in range(1, logs + 1)
+        ]
+
+    def _score(self, postulante_id, vacante_id):
+        _, _, anos, habilidades = self.postulantes[postulante_id]
+        habilidades = set(habilidades) | set(json.loads(self.habilidades_cv.get(postulante_id) or '[]'))
+        coincidencias = len(habilidades & set(self.vacantes[vacante_id]['requerimientos']))
+        return float(min(100, anos * 2 + coincidencias * 10))
+
+    def _agregar_postulacion(self, postulante_id, vacante_id, segundos):
+        postulacion_id = len(self.po_vacante)
+        self.po_postulante.append(postulante_id)
+        self.po_vacante.append(vacante_id)
+        self.po_segundos.append(segundos)
+        self.po_score.append(self._score(postulante_id, vacante_id))
+        self.por_vacante[vacante_id].append(postulacion_id)
+        self.pares.add((postulante_id, vacante_id))
+        return postulacion_id
+
+    def fila_ranking(self, postulacion_id):
+        postulante_id = self.po_postulante[postulacion_id]
+        return {
+            'postulacion_id': postulacion_id,
+            'vacante_id': self.po_vacante[postulacion_id],
+            'postulante_id': postulante_id,
+            'postulante_nombre': self.postulantes[postulante_id][0],
+            'score': self.po_score[postulacion_id],
+            'criterios': '{"metodo": "inicial"}',
+            'fecha_postulacion': BASE + timedelta(seconds=self.po_segundos[postulacion_id]),
+        }
+
+    # --- procedimientos ---------------------------------------------------
+
+    def sp_listar_vacantes(self):
+        return [dict(v, requerimientos=None) for v in reversed(self.vacantes.values()) if v['activo']]
+
+    def sp_listar_vacantes_pagina(self, departamento_id, cursor_fecha, cursor_id, limite):
+        filas = []
+        for v in reversed(self.vacantes.values()):
+            if not v['activo'] or (departamento_id and v['departamento_id'] != departamento_id):
+                continue
+            if cursor_fecha and (v['creado_en'], v['id']) >= (cursor_fecha, cursor_id):
+                continue
+            filas.append(dict(v, descripcion=v['descripcion'][:300]))
+            if len(filas) >= limite:
+                break
+        return filas
+
+    def sp_vacante_detalle(self, vacante_id):
+        v = self.vacantes.get(vacante_id)
+        if v is None:
+            return []
+        dep = self.departamentos[v['departamento_id'] - 1]
+        return [dict(v, requerimientos=str(v['requerimientos']).replace("'", '"'), departamento=dep['nombre'])]
+
+    def sp_generar_ranking(self, vacante_id):
+        filas = [self.fila_ranking(pid) for pid in self.por_vacante.get(vacante_id, [])]
+        filas.sort(key=lambda f: (-f['score'], f['fecha_postulacion']))
+        for f in filas:
+            del f['vacante_id']
+        return filas
+
+    def sp_ranking_fila(self, postulacion_id):
+        return [self.fila_ranking(postulacion_id)] if 0 < postulacion_id < len(self.po_vacante) else []
+
+    def sp_crear_postulacion(self, postulante_id, vacante_id, usuario):
+        with self._lock:
+            v = self.vacantes.get(vacante_id)
+            if v is None or not v['activo']:
+                raise ErrorSimulado('Vacante no existe o no está activa')
+            if not 0 < postulante_id < len(self.postulantes) or (postulante_id, vacante_id) in self.pares:
+                raise ErrorSimulado('Postulante inválido o ya postuló')
+            segundos = self.po_segundos[-1] + 1
+            postulacion_id = self._agregar_postulacion(postulante_id, vacante_id, segundos)
+            self.logs.append((len(self.logs) + 1, usuario, 'SP', 'postulaciones', str(postulacion_id),
+                              BASE + timedelta(seconds=segundos), 'sp_crear_postulacion'))
+        return [self.fila_ranking(postulacion_id)]
+
+    def sp_recalcular_score(self, postulacion_id):
+        if not 0 < postulacion_id < len(self.po_vacante):
+            raise ErrorSimulado('Postulación no encontrada')
+        self.po_score[postulacion_id] = self._score(self.po_postulante[postulacion_id], self.po_vacante[postulacion_id])
+        return [self.fila_ranking(postulacion_id)]
+
+    def sp_postulacion_timeline(self, postulacion_id):
+        if not 0 < postulacion_id < len(self.po_vacante):
+            return []
+        fecha = BASE + timedelta(seconds=self.po_segundos[postulacion_id])
+        filas = [{'estado': 'recibida', 'fecha': fecha, 'usuario': 'reclutador1'},
+                 {'estado': 'evaluacion', 'fecha': fecha, 'usuario': None}]
+        vacante = self.vacantes[self.po_vacante[postulacion_id]]
+        if vacante['estado'] == 'cerrada':
+            filas.append({'estado': 'cerrada', 'fecha': vacante['actualizado_en'], 'usuario': None})
+        return filas
+
+    def sp_cerrar_vacante(self, vacante_id, usuario):
+        if vacante_id not in self.vacantes:
+            raise ErrorSimulado('Vacante no encontrada')
+        self.vacantes[vacante_id].update(estado='cerrada', activo=0, actualizado_en=datetime.now())
+
+    def sp_listar_logs(self):
+        columnas = ('id', 'usuario_mysql', 'accion', 'tabla_afectada', 'fila_id', 'fecha', 'descripcion')
+        return [dict(zip(columnas, fila)) for fila in reversed(self.logs[-500:])]
+
+    def sp_buscar_logs(self, usuario, accion, tabla, fila_id, desde, hasta, cursor_fecha, cursor_id, limite):
+        columnas = ('id', 'usuario_mysql', 'accion', 'tabla_afectada', 'fila_id', 'fecha', 'descripcion')
+        filas = []
+        for fila in reversed(self.logs):
+            if (usuario and not fila[1].startswith(usuario)) or (accion and fila[2] != accion.upper()) \
+                    or (tabla and fila[3] != tabla) or (fila_id and fila[4] != fila_id):
+                continue
+            if (desde and fila[5] < desde) or (hasta and fila[5] >= hasta):
+                continue
+            if cursor_fecha and (fila[5], fila[0]) >= (cursor_fecha, cursor_id):
+                continue
+            filas.append(dict(zip(columnas, fila)))
+            if limite is not None and len(filas) >= limite:
+                break
+        return filas
+
+    # el dashboard del auditor cae en este nombre (ver dashboard() en app.py)
+    sp_listar_logs_dummy = sp_listar_logs
+
+    def sp_get_postulante(self, postulante_id):
+        if not 0 < postulante_id < len(self.postulantes):
+            return []
+        nombre, email, anos, habilidades = self.postulantes[postulante_id]
+        return [{'id': postulante_id, 'nombre': nombre, 'email': email, 'anos_experiencia': anos,
+                 'habilidades': str(habilidades).replace("'", '"'), 'cv_path': self.cv_paths.get(postulante_id),
+                 'habilidades_cv': self.habilidades_cv.get(postulante_id),
+                 'creado_en': BASE,
+                 'actualizado_en': BASE}]
+
+    def sp_update_postulante(self, postulante_id, nombre, email, anos, habilidades, cv_path):
+        if 0 < postulante_id < len(self.postulantes):
+            self.postulantes[postulante_id] = (nombre, email, anos, json.loads(habilidades))
+            if self.cv_paths.get(postulante_id) != cv_path:
+                self.habilidades_cv.pop(postulante_id, None)
+            self.cv_paths[postulante_id] = cv_path
+
+    def sp_report_vacantes_por_mes(self):
+        meses = {}
+        for v in self.vacantes.values():
+            mes = v['creado_en'].strftime('%Y-%m')
+            meses[mes] = meses.get(mes, 0) + 1
+        return [{'mes': m, 'total': t} for m, t in sorted(meses.items())]
+
+    def sp_report_postulantes_por_vacante(self):
+        filas = [{'vacante_id': vid, 'titulo': v['titulo'], 'total_postulantes': len(self.por_vacante[vid])}
+                 for vid, v in self.vacantes.items()]
+        return sorted(filas, key=lambda f: -f['total_postulantes'])
+
+    def sp_report_promedio_score_por_departamento(self):
+        sumas = {}
+        for pid in range(1, len(self.po_vacante)):
+            dep = self.vacantes[self.po_vacante[pid]]['departamento_id']
+            suma, n = sumas.get(dep, (0.0, 0))
+            sumas[dep] = (suma + self.po_score[pid], n + 1)
+        filas = [{'departamento_id': dep, 'nombre': self.departamentos[dep - 1]['nombre'],
+                  'promedio_score': round(suma / n, 2)} for dep, (suma, n) in sumas.items()]
+        return sorted(filas, key=lambda f: -f['promedio_score'])
+
+    def sp_authenticate_user(self, username, password):
+        roles = {'admin': 'admin', 'reclutador1': 'reclutador', 'auditor1': 'auditor'}
+        if username not in roles:
+            raise ErrorSimulado('Usuario no encontrado o inactivo')
+        return [{'id': 1, 'username': username, 'rol_app': roles[username]}]
+
+    # --- consultas con nombre ---------------------------------------------
+
+    def consulta_departamentos(self, params):
+        return [{'id': d['id'], 'nombre': d['nombre']} for d in self.departamentos]
+
+    def consulta_departamentos_detalle(self, params):
+        return [dict(d) for d in self.departamentos]
+
+    def consulta_reporte_general(self, params):
+        scores = self.po_score[1:]
+        promedio = round(sum(scores) / len(scores), 2) if scores else None
+        return [{'total_vacantes': len(self.vacantes), 'total_postulantes': len(self.postulantes) - 1,
+                 'promedio_score': promedio}]
+
+    def consulta_postulaciones_recientes(self, params):
+        ultimos = range(len(self.po_vacante) - 1, max(0, len(self.po_vacante) - 11), -1)
+        return [{'nombre': self.postulantes[self.po_postulante[i]][0],
+                 'titulo': self.vacantes[self.po_vacante[i]]['titulo'],
+                 'fecha_postulacion': BASE + timedelta(seconds=self.po_segundos[i])} for i in ultimos]
+
+    def consulta_exportar_ranking(self, params):
+        filas = self.sp_generar_ranking(params['vacante_id'])
+        clave = lambda f: (-(f['score'] if f['score'] is not None else -1), f['fecha_postulacion'], f['postulacion_id'])
+        desde = (-params['score'], params['fecha'], params['id'])
+        return sorted((f for f in filas if clave(f) > desde), key=clave)
+
+    def consulta_vacantes_abiertas(self, params):
+        return [{'id': v['id'], 'titulo': v['titulo'], 'estado': v['estado']}
+                for v in reversed(self.vacantes.values()) if v['activo'] and v['estado'] == 'abierta']
+
+    def consulta_top_por_vacante(self, params):
+        filas = []
+        for vacante_id in sorted(params['ids']):
+            top = sorted((self.fila_ranking(pid) for pid in self.por_vacante.get(vacante_id, [])),
+                         key=lambda f: (-f['score'], f['fecha_postulacion'], f['postulacion_id']))
+            filas += top[:params['k']]
+        return filas
+
+    def consulta_postulantes_habilidades(self, params):
+        return [{'id': i, 'anos_experiencia': anos, 'habilidades': str(habilidades).replace("'", '"'),
+                 'habilidades_cv': self.habilidades_cv.get(i)}
+                for i, (_, _, anos, habilidades) in enumerate(self.postulantes[1:], 1)]
+
+    def consulta_postulantes_resumen(self, params):
+        return [{'id': i, 'nombre': self.postulantes[i][0], 'email': self.postulantes[i][1]}
+                for i in params['ids'] if 0 < i < len(self.postulantes)]
+
+    def consulta_cv_paths(self, params):
+        return [{'cv_path': c} for c in set(self.cv_paths.values()) if c]
+
+    def consulta_postulaciones_postulante(self, params):
+        return []
+
+    def consulta_cvs_sin_extraer(self, params):
+        return [{'cv_path': c} for c in {c for i, c in self.cv_paths.items() if c and i not in self.habilidades_cv}]
+
+    def consulta_vacantes_requerimientos(self, params):
+        return [{'requerimientos': str(v['requerimientos']).replace("'", '"')} for v in self.vacantes.values()]
+
+    def consulta_cv_extraccion(self, params):
+        if params['hash'] not in self.cv_extracciones:
+            return []
+        texto, error = self.cv_extracciones[params['hash']]
+        return [{'texto': texto, 'error': error}]
+
+    def consulta_guardar_cv_extraccion(self, params):
+        self.cv_extracciones[params['hash']] = (params['texto'], params['error'])
+
+    def consulta_aplicar_habilidades_cv(self, params):
+        for i, c in self.cv_paths.items():
+            if c == params['cv_path']:
+                self.habilidades_cv[i] = params['habilidades']
+
+    def consulta_postulantes_por_cv(self, params):
+        return [{'id': i, 'anos_experiencia': self.postulantes[i][2],
+                 'habilidades': str(self.postulantes[i][3]).replace("'", '"'),
+                 'habilidades_cv': self.habilidades_cv.get(i)}
+                for i, c in self.cv_paths.items() if c == params['cv_path']]
+
+    def consulta_postulaciones_de_postulantes(self, params):
+        ids = set(params['ids'])
+        return [{'id': i} for i in range(1, len(self.po_vacante)) if self.po_postulante[i] in ids]
+
+    # --- SQL directo de importacion.py y evaluacion.py ----------------------
+    # las consultas con IN (...) llegan con los valores ya como parámetros
+
+    def sql_emails_postulantes(self, emails):
+        return [{'id': self.por_email[e], 'email': e} for e in emails if e in self.por_email]
+
+    def sql_emails_usuarios(self, emails):
+        registrados = set(self.usuarios.values())
+        return [{'email': e} for e in emails if e in registrados]
+
+    def sql_usernames(self, usernames):
+        return [{'username': u} for u in usernames if u in self.usuarios]
+
+    def sql_postulantes_ids(self, ids):
+        return [{'id': i} for i in ids if 0 < i < len(self.postulantes)]
+
+    def sql_vacantes_activas(self, ids):
+        return [{'id': i} for i in ids if i in self.vacantes and self.vacantes[i]['activo']]
+
+    def sql_postulaciones_de(self, postulante_ids):
+        ids = set(postulante_ids)
+        return [{'postulante_id': self.po_postulante[i], 'vacante_id': self.po_vacante[i], 'id': i}
+                for i in range(1, len(self.po_vacante)) if self.po_postulante[i] in ids]
+
+    def sql_usuario_id(self, params):
+        return [{'id': 1}] if params[0] in self.usuarios else []
+
+    def sql_postulaciones_a_evaluar(self, ids):
+        filas = []
+        for i in ids:
+            postulante_id = self.po_postulante[i]
+            nombre, _, anos, habilidades = self.postulantes[postulante_id]
+            vacante_id = self.po_vacante[i]
+            filas.append({'po': i, 'vacante_id': vacante_id, 'pt': postulante_id, 'nombre': nombre,
+                          'anos': anos, 'habilidades': str(habilidades).replace("'", '"'),
+                          'habilidades_cv': self.habilidades_cv.get(postulante_id),
+                          'req': str(self.vacantes[vacante_id]['requerimientos']).replace("'", '"'),
+                          'fecha': BASE + timedelta(seconds=self.po_segundos[i]), 'usuario': 'importacion'})
+        return filas
+
+    def sql_estado_replica(self, params):
+        # instancia sin replicación configurada
+        return []
+
+    def insertar_postulantes(self, filas):
+        with self._lock:
+            for nombre, email, anos, habilidades in filas:
+                if email in self.por_email:
+                    raise ErrorSimulado(f"Duplicate entry '{email}' for key 'email'")
+                self.postulantes.append((nombre, email, anos, json.loads(habilidades)))
+                self.por_email[email] = len(self.postulantes) - 1
+
+    def sp_crear_usuario_ex(self, username, password, nombre, email, rol):
+        with self._lock:
+            if username in self.usuarios:
+                raise ErrorSimulado(f"Duplicate entry '{username}' for key 'username'")
+            self.usuarios[username] = email
+
+    def insertar_postulaciones(self, filas):
+        with self._lock:
+            for postulante_id, vacante_id, _, _ in filas:
+                if (postulante_id, vacante_id) in self.pares:
+                    raise ErrorSimulado('Duplicate entry for key ux_postulante_vacante')
+                self._agregar_postulacion(postulante_id, vacante_id, self.po_segundos[-1] + 1)
+
+    def upsert_evaluacion(self, filas):
+        for postulacion_id, score, _ in filas:
+            self.po_score[postulacion_id] = score
+
+    def insertar_logs(self, filas):
+        for fila in filas:
+            if len(fila) == 5:  # evaluacion.SQL_AUDITORIA, sin fecha
+                fila = fila[:4] + (datetime.now(),) + fila[4:]
+            self.logs.append((len(self.logs) + 1,) + tuple(fila))
+
+
+class ErrorSimulado(Exception):
+    pass
+
+
+# prefijo del SQL (antes de la lista IN) -> método de DatosSimulados
+_SQL_DIRECTO = {
+    importacion.SQL_EMAILS_POSTULANTES.split('{}')[0]: 'sql_emails_postulantes',
+    importacion.SQL_EMAILS_USUARIOS.split('{}')[0]: 'sql_emails_usuarios',
+    importacion.SQL_USERNAMES.split('{}')[0]: 'sql_usernames',
+    importacion.SQL_POSTULANTES_IDS.split('{}')[0]: 'sql_postulantes_ids',
+    importacion.SQL_VACANTES_ACTIVAS.split('{}')[0]: 'sql_vacantes_activas',
+    importacion.SQL_POSTULACIONES_DE.split('{}')[0]: 'sql_postulaciones_de',
+    importacion.SQL_USUARIO_ID: 'sql_usuario_id',
+    'SELECT po.id, po.vacante_id, pt.id, pt.nombre, ': 'sql_postulaciones_a_evaluar',
+    replicas.SQL_ESTADO: 'sql_estado_replica',
+}
+_INSERT_MULTIPLE = {
+    importacion.SQL_INSERTAR_POSTULANTES: 'insertar_postulantes',
+    importacion.SQL_INSERTAR_POSTULACIONES: 'insertar_postulaciones',
+    'INSERT INTO evaluacion_ia ': 'upsert_evaluacion',
+    'INSERT INTO logs_auditoria ': 'insertar_logs',
+}
+
+
+def _metodo_directo(tabla, sql):
+    for prefijo, metodo in tabla.items():
+        if sql.startswith(prefijo):
+            return metodo
+    raise ErrorSimulado(f'SQL no soportado por la BD simulada: {sql[:80]}')
+
+
+class CursorSimulado:
+    def __init__(self, conexion):
+        self._conexion = conexion
+        self._resultados = []
+        self._i = 0
+        self.lastrowid = None
+
+    @property
+    def description(self):
+        if self._i >= len(self._resultados) or self._resultados[self._i] is None:
+            return None
+        filas = self._resultados[self._i]
+        return [(c,) for c in filas[0]] if filas else [('_',)]
+
+    def execute(self, sql, params=None):
+        datos = self._conexion.datos
+        if self._conexion.latencia:
+            time.sleep(self._conexion.latencia)
+        self._resultados = []
+        self._i = 0
+        if sql in _CONSULTA_POR_SQL:
+            self._resultados.append(getattr(datos, 'consulta_' + _CONSULTA_POR_SQL[sql])(params))
+            return
+        llamadas = _RE_CALL.findall(sql)
+        if not llamadas:
+            self._resultados.append(getattr(datos, _metodo_directo(_SQL_DIRECTO, sql))(params))
+            return
+        for nombre, argumentos in llamadas:
+            if params is not None:
+                args = list(params)
+            else:
+                args = [self._conexion.valor(a.strip()) for a in argumentos.split(',') if a.strip()]
+            procedimiento = getattr(datos, nombre, None)
+            if procedimiento is None:
+                raise ErrorSimulado(f'Procedimiento no simulado: {nombre}')
+            filas = procedimiento(*args)
+            if filas:
+                self._resultados.append(filas)
+            self._resultados.append(None)  # OK final de cada CALL
+
+    def executemany(self, sql, filas):
+        metodo = _metodo_directo(_INSERT_MULTIPLE, sql)
+        if self._conexion.latencia:
+            time.sleep(self._conexion.latencia)
+        getattr(self._conexion.datos, metodo)(filas)
+
+    def fetchall(self):
+        filas = self._resultados[self._i] or []
+        self._resultados[self._i] = []
+        return [tuple(f.values()) for f in filas]
+
+    def fetchone(self):
+        filas = self.fetchmany(1)
+        return filas[0] if filas else None
+
+    def fetchmany(self, n):
+        filas = self._resultados[self._i] or []
+        self._resultados[self._i] = filas[n:]
+        return [tuple(f.values()) for f in filas[:n]]
+
+    def nextset(self):
+        if self._i + 1 < len(self._resultados):
+            self._i += 1
+            return True
+        return None
+
+    def close(self):
+        pass
+
+
+class ConexionSimulada:
+    """escape() devuelve un marcador y guarda el valor real, así el CALL
+    armado por sentencia_call se puede volver a leer sin parsear SQL."""
+
+    def __init__(self, datos, latencia):
+        self.datos = datos
+        self.latencia = latencia
+        self._valores = []
+
+    def escape(self, valor):
+        self._valores.append(valor)
+        return f'__p{len(self._valores) - 1}__'
+
+    def valor(self, marcador):
+        return self._valores[int(marcador[3:-2])]
+
+    def cursor(self, *clase):
+        return CursorSimulado(self)
+
+    def commit(self):
+        self._valores = []
+
+    def rollback(self):
+        self._valores = []
+
+    def invalidate(self):
+        self._valores = []
+
+    def close(self):
+        pass
+
+
+class _PoolSimulado:
+    def checkedout(self):
+        return 0
+
+
+class MotorSimulado:
+    """Reemplazo de `app.engine` para correr la app sobre DatosSimulados."""
+
+    def __init__(self, datos, latencia_ms=0.5):
+        self.datos = datos
+        self.latencia = latencia_ms / 1000
+        self.pool = _PoolSimulado()
+
+    def raw_connection(self):
+        return ConexionSimulada(self.datos, self.latencia)
+
+
+def instalar(modulo_app, datos, latencia_ms=0.5):
+    modulo_app.engine = MotorSimulado(datos, latencia_ms)
+    # el motor de evaluación guarda el engine al crearse
+    modulo_app.motor_evaluacion.engine = modulo_app.engine
+    return modulo_app.engine
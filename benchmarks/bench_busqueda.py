@@ -0,0 +1,77 @@
+"""Benchmark: búsqueda lineal (filtro original de index()) vs índice invertido.
+
+Uso:
+    python benchmarks/bench_busqueda.py --vacantes 1000 10000 100000
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from indice_vacantes import IndiceVacantes  # noqa: E402
+
+PUESTOS = ['Desarrollador', 'Analista', 'Gerente', 'Asistente', 'Técnico', 'Diseñador',
+           'Contador', 'Ingeniero', 'Coordinador', 'Especialista']
+AREAS = ['Python', 'Marketing', 'Logística', 'Producción', 'Educación', 'Finanzas',
+         'Comunicación', 'Recursos Humanos', 'Atención al cliente', 'Seguridad']
+PALABRAS = ('experiencia gestión equipo proyectos clientes análisis datos reportes ventas '
+            'planificación calidad procesos inglés liderazgo negociación soporte '
+            'investigación documentación auditoría innovación').split()
+
+CONSULTAS = ['python', 'gestion', 'desarro', 'analista datos', 'educación', 'ingles liderazgo']
+
+
+def generar(n, semilla=42):
+    rnd = random.Random(semilla)
+    base = datetime(2025, 1, 1)
+    for i in range(1, n + 1):
+        yield {
+            'id': i,
+            'titulo': f'{rnd.choice(PUESTOS)} de {rnd.choice(AREAS)}',
+            'descripcion': ' '.join(rnd.choices(PALABRAS, k=60)),
+            'departamento_id': rnd.randint(1, 20),
+            'estado': 'abierta',
+            'activo': 1,
+            'creado_en': base + timedelta(minutes=i),
+        }
+
+
+def buscar_lineal(vacantes, buscar):
+    # mismo filtro que usaba index() antes del índice
+    buscar = buscar.lower()
+    return [v for v in vacantes if buscar in v.get('titulo', '').lower() or buscar in v.get('descripcion', '').lower()]
+
+
+def medir(fn, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        fn()
+    return (time.perf_counter() - inicio) / repeticiones * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--vacantes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeticiones', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'vacantes':>9} {'consulta':<18} {'lineal ms':>10} {'índice ms':>10} {'aceleración':>12}")
+    for n in args.vacantes:
+        vacantes = list(generar(n))
+        indice = IndiceVacantes()
+        t0 = time.perf_counter()
+        indice.reconstruir(vacantes)
+        construccion = (time.perf_counter() - t0) * 1000
+        for consulta in CONSULTAS:
+            lineal = medir(lambda: buscar_lineal(vacantes, consulta), max(1, args.repeticiones // 4))
+            con_indice = medir(lambda: indice.buscar(consulta, limite=20), args.repeticiones)
+            print(f'{n:>9} {consulta:<18} {lineal:>10.3f} {con_indice:>10.3f} {lineal / con_indice:>11.1f}x')
+        print(f'{n:>9} (construcción del índice: {construccion:.1f} ms)')
+
+
+if __name__ == '__main__':
+    main()
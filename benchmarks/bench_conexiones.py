@@ -0,0 +1,89 @@
+"""Benchmark: viajes a la BD y conexiones del pool por request.
+
+Compara DB_CONEXION_POR_REQUEST=0 (una conexión por llamada, como antes)
+con DB_CONEXION_POR_REQUEST=1 (una conexión por request + call_procs).
+Cuenta cada comando que PyMySQL envía al servidor (incluye pings, CALL,
+SELECT y COMMIT). Necesita la BD configurada en .env con seed_data.sql.
+
+Uso:
+    python benchmarks/bench_conexiones.py [--vacante 1] [--repeticiones 20]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+
+def medir(rutas, repeticiones):
+    """Se ejecuta en un subproceso con el modo ya fijado en el entorno."""
+    sys.path.insert(0, str(RAIZ))
+    import pymysql.connections
+
+    comandos = {'n': 0}
+    original = pymysql.connections.Connection._execute_command
+
+    def contar(self, command, sql):
+        comandos['n'] += 1
+        return original(self, command, sql)
+
+    pymysql.connections.Connection._execute_command = contar
+
+    import app as aplicacion
+
+    cliente = aplicacion.app.test_client()
+    resultado = {}
+    for rol, ruta in rutas:
+        with cliente.session_transaction() as sesion:
+            sesion['rol_app'] = rol
+            sesion['user_id'] = 1
+        cliente.get(ruta)  # calentar (índices y rankings en memoria)
+        comandos['n'] = 0
+        aplicacion.CONTADORES_DB['checkouts'] = 0
+        for _ in range(repeticiones):
+            cliente.get(ruta)
+        resultado[f'{rol or "-"} {ruta}'] = {
+            'viajes': comandos['n'] / repeticiones,
+            'checkouts': aplicacion.CONTADORES_DB['checkouts'] / repeticiones,
+        }
+    print(json.dumps(resultado))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--vacante', type=int, default=1)
+    parser.add_argument('--repeticiones', type=int, default=20)
+    parser.add_argument('--_modo', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    rutas = [
+        (None, '/'),
+        ('admin', '/dashboard'),
+        ('reclutador', '/dashboard'),
+        ('reclutador', f'/vacante/{args.vacante}'),
+        ('reclutador', f'/vacante/editar/{args.vacante}'),
+    ]
+    if args._modo is not None:
+        medir(rutas, args.repeticiones)
+        return
+
+    modos = {}
+    for modo in ('0', '1'):
+        env = dict(os.environ, DB_CONEXION_POR_REQUEST=modo)
+        salida = subprocess.run(
+            [sys.executable, __file__, '--_modo', modo, '--vacante', str(args.vacante),
+             '--repeticiones', str(args.repeticiones)],
+            env=env, capture_output=True, text=True, check=True)
+        modos[modo] = json.loads(salida.stdout.strip().splitlines()[-1])
+
+    print(f"{'ruta':<36} {'viajes antes':>13} {'después':>8} {'checkouts antes':>16} {'después':>8}")
+    for ruta, antes in modos['0'].items():
+        despues = modos['1'][ruta]
+        print(f"{ruta:<36} {antes['viajes']:>13.1f} {despues['viajes']:>8.1f} "
+              f"{antes['checkouts']:>16.1f} {despues['checkouts']:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark: importación masiva contra alta de a una fila.
+
+Genera postulantes y postulaciones sintéticos (con un porcentaje de filas
+inválidas o duplicadas), los importa con importacion.py sobre la BD simulada
+y compara con registrar postulaciones una por una (registrar_postulacion,
+lo que hacen /postular y /postular_ui). `--latencia` es el costo fijo de
+cada viaje a la BD.
+
+Uso:
+    python benchmarks/bench_importacion.py [--postulantes 50000] [--postulaciones 50000] [--latencia 0.5]
+"""
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ.setdefault('EVALUACION_ASINCRONA', '0')
+
+from bd_simulada import HABILIDADES, DatosSimulados, instalar  # noqa: E402
+
+
+def jsonl(registros):
+    return io.BytesIO(''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in registros).encode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--postulantes', type=int, default=50000)
+    parser.add_argument('--postulaciones', type=int, default=50000)
+    parser.add_argument('--lote', type=int, default=1000)
+    parser.add_argument('--latencia', type=float, default=0.5, help='ms por viaje a la BD')
+    parser.add_argument('--una-por-una', type=int, default=500, help='postulaciones para la comparación fila a fila')
+    args = parser.parse_args()
+
+    import app as aplicacion
+
+    rnd = random.Random(7)
+    datos = DatosSimulados(vacantes=500, postulantes=10000, postulaciones=20000, logs=10)
+    instalar(aplicacion, datos, args.latencia)
+    base = len(datos.postulantes) - 1
+
+    postulantes = []
+    for i in range(args.postulantes):
+        postulantes.append({'nombre': f'Importado {i}', 'email': f'imp{i}@example.com',
+                            'anos_experiencia': rnd.randint(0, 20),
+                            'habilidades': rnd.sample(HABILIDADES, rnd.randint(1, 5))})
+        if i % 100 == 0:
+            postulantes.append({'nombre': 'Repetido', 'email': f'p{rnd.randint(1, base)}@example.com'})
+        if i % 250 == 0:
+            postulantes.append({'nombre': '', 'email': 'sin-arroba'})
+    importador = aplicacion.crear_importador(args.lote)
+    r = importador.importar_postulantes(aplicacion.leer_registros(jsonl(postulantes), 'jsonl'), 'bench').resumen()
+    print(f"postulantes:   {r['insertadas']} insertadas, {r['fallidas']} con error, "
+          f"{r['filas_por_segundo']:,} filas/s")
+
+    total = len(datos.postulantes) - 1
+    postulaciones = [{'postulante_id': rnd.randint(1, total), 'vacante_id': rnd.randint(1, 520)}
+                     for _ in range(args.postulaciones)]
+    r = importador.importar_postulaciones(aplicacion.leer_registros(jsonl(postulaciones), 'jsonl'),
+                                          'bench').resumen()
+    print(f"postulaciones: {r['insertadas']} insertadas, {r['fallidas']} con error, "
+          f"{r['filas_por_segundo']:,} filas/s (incluye evaluación y ranking)")
+
+    inicio = time.perf_counter()
+    hechas = 0
+    while hechas < args.una_por_una:
+        try:
+            aplicacion.registrar_postulacion(rnd.randint(1, total), rnd.randint(1, 500), 'bench')
+        except Exception:
+            pass
+        hechas += 1
+    duracion = time.perf_counter() - inicio
+    print(f'una por una:   {hechas / duracion:,.0f} filas/s (registrar_postulacion)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+"""Prueba de carga de la app sobre la BD simulada (benchmarks/bd_simulada.py).
+
+Levanta la app en un servidor WSGI con hilos dentro del proceso, la carga
+con datos sintéticos a la escala indicada y lanza `--concurrencia` clientes
+durante `--duracion` segundos contra una mezcla de rutas (listado, búsqueda,
+ranking, dashboards, postulación y auditoría). Reporta por ruta p50, p95,
+p99, throughput y errores, más el detalle por procedimiento de /metrics, en
+JSON. Con --comparar se contrasta contra un resultado anterior y se sale con
+código 1 si algún p95 empeora más que --tolerancia.
+
+Uso:
+    python benchmarks/carga.py --vacantes 2000 --postulaciones 200000 \\
+        --concurrencia 16 --duracion 30 --salida base.json
+    # tras un cambio:
+    python benchmarks/carga.py ... --salida nuevo.json --comparar base.json
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# la evaluación asíncrona usa SQL directo que la BD simulada no emula
+os.environ['EVALUACION_ASINCRONA'] = '0'
+os.environ.setdefault('SLOW_QUERY_MS', '100000')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from werkzeug.serving import make_server  # noqa: E402
+
+import app as aplicacion  # noqa: E402
+from bd_simulada import DatosSimulados, instalar  # noqa: E402
+
+BUSQUEDAS = ['python', 'analista', 'desarro', 'marketing ventas', 'gerente', 'logística']
+# (nombre, peso)
+ESCENARIOS = [
+    ('listado', 30),
+    ('busqueda', 15),
+    ('ranking', 20),
+    ('dashboard_reclutador', 10),
+    ('dashboard_admin', 5),
+    ('postular', 15),
+    ('auditoria', 5),
+]
+
+
+def percentil(valores, p):
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    k = min(len(ordenados) - 1, max(0, round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[k]
+
+
+def cookie_sesion(datos_sesion):
+    serializador = aplicacion.app.session_interface.get_signing_serializer(aplicacion.app)
+    nombre = aplicacion.app.config['SESSION_COOKIE_NAME']
+    return f'{nombre}={serializador.dumps(datos_sesion)}'
+
+
+class Cliente(threading.Thread):
+    def __init__(self, puerto, datos, fin, semilla, resultados, lock):
+        super().__init__(daemon=True)
+        self.puerto = puerto
+        self.datos = datos
+        self.fin = fin
+        self.rnd = random.Random(semilla)
+        self.resultados = resultados
+        self.lock = lock
+        self.cookies = {
+            'reclutador': cookie_sesion({'user_id': 2, 'username': 'reclutador1', 'rol_app': 'reclutador'}),
+            'admin': cookie_sesion({'user_id': 1, 'username': 'admin', 'rol_app': 'admin'}),
+            'auditor': cookie_sesion({'user_id': 3, 'username': 'auditor1', 'rol_app': 'auditor'}),
+        }
+        self.nombres = [n for n, _ in ESCENARIOS]
+        self.pesos = [p for _, p in ESCENARIOS]
+
+    def peticion(self, escenario):
+        rnd = self.rnd
+        metodo, cuerpo, cabeceras = 'GET', None, {}
+        n_vacantes = len(self.datos.vacantes)
+        if escenario == 'listado':
+            params = {'departamento_id': rnd.randint(1, len(self.datos.departamentos))} if rnd.random() < 0.3 else {}
+            ruta = '/?' + urlencode(params)
+        elif escenario == 'busqueda':
+            ruta = '/?' + urlencode({'buscar': rnd.choice(BUSQUEDAS)})
+        elif escenario == 'ranking':
+            ruta = f'/ranking/{rnd.randint(1, n_vacantes)}'
+        elif escenario == 'dashboard_reclutador':
+            ruta, cabeceras = '/dashboard', {'Cookie': self.cookies['reclutador']}
+        elif escenario == 'dashboard_admin':
+            ruta, cabeceras = '/dashboard', {'Cookie': self.cookies['admin']}
+        elif escenario == 'auditoria':
+            ruta, cabeceras = '/auditoria?' + urlencode({'accion': 'insert'}), {'Cookie': self.cookies['auditor']}
+        else:
+            metodo, ruta = 'POST', '/postular'
+            cuerpo = json.dumps({'postulante_id': rnd.randint(1, len(self.datos.postulantes) - 1),
+                                 'vacante_id': rnd.randint(1, n_vacantes), 'usuario': 'carga'})
+            cabeceras = {'Content-Type': 'application/json'}
+        return metodo, ruta, cuerpo, cabeceras
+
+    def run(self):
+        propios = {}
+        while not self.fin.is_set():
+            escenario = self.rnd.choices(self.nombres, self.pesos)[0]
+            metodo, ruta, cuerpo, cabeceras = self.peticion(escenario)
+            inicio = time.perf_counter()
+            try:
+                conn = http.client.HTTPConnection('127.0.0.1', self.puerto, timeout=30)
+                conn.request(metodo, ruta, body=cuerpo, headers=cabeceras)
+                respuesta = conn.getresponse()
+                respuesta.read()
+                conn.close()
+                error = respuesta.status >= 500
+            except OSError:
+                error = True
+            segundos = time.perf_counter() - inicio
+            latencias, errores = propios.setdefault(escenario, ([], [0]))
+            latencias.append(segundos)
+            errores[0] += error
+        with self.lock:
+            for escenario, (latencias, errores) in propios.items():
+                acumulado = self.resultados.setdefault(escenario, {'latencias': [], 'errores': 0})
+                acumulado['latencias'] += latencias
+                acumulado['errores'] += errores[0]
+
+
+def resumir(crudos, duracion):
+    rutas = {}
+    total = 0
+    for escenario, r in sorted(crudos.items()):
+        lat = r['latencias']
+        total += len(lat)
+        rutas[escenario] = {
+            'requests': len(lat),
+            'errores': r['errores'],
+            'rps': round(len(lat) / duracion, 1),
+            'p50_ms': round(percentil(lat, 50) * 1000, 2),
+            'p95_ms': round(percentil(lat, 95) * 1000, 2),
+            'p99_ms': round(percentil(lat, 99) * 1000, 2),
+        }
+    return rutas, round(total / duracion, 1)
+
+
+def comparar(actual, base, tolerancia):
+    """Imprime la diferencia de p95 por ruta; True si alguna empeoró más de la tolerancia."""
+    regresion = False
+    print(f"{'ruta':<22}{'p95 base':>10}{'p95 actual':>12}{'cambio':>9}")
+    for escenario, r in actual['rutas'].items():
+        anterior = base.get('rutas', {}).get(escenario)
+        if not anterior or not anterior['p95_ms']:
+            continue
+        cambio = (r['p95_ms'] - anterior['p95_ms']) / anterior['p95_ms']
+        marca = ' <-- regresión' if cambio > tolerancia else ''
+        regresion = regresion or bool(marca)
+        print(f"{escenario:<22}{anterior['p95_ms']:>10.2f}{r['p95_ms']:>12.2f}{cambio:>+9.0%}{marca}")
+    print(f"throughput: {base.get('rps_total')} -> {actual['rps_total']} req/s")
+    return regresion
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--vacantes', type=int, default=1000)
+    parser.add_argument('--postulantes', type=int, default=20000)
+    parser.add_argument('--postulaciones', type=int, default=50000)
+    parser.add_argument('--logs', type=int, default=20000)
+    parser.add_argument('--latencia-ms', type=float, default=0.5, help='espera simulada por viaje a la BD')
+    parser.add_argument('--concurrencia', type=int, default=8)
+    parser.add_argument('--duracion', type=float, default=15.0, help='segundos de carga medida')
+    parser.add_argument('--calentamiento', type=float, default=2.0, help='segundos de carga descartada')
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--salida', help='archivo JSON de resultados')
+    parser.add_argument('--comparar', help='JSON de una corrida anterior')
+    parser.add_argument('--tolerancia', type=float, default=0.2, help='empeoramiento de p95 aceptado (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    datos = DatosSimulados(args.vacantes, args.postulantes, args.postulaciones, args.logs, semilla=args.semilla)
+    print(f'datos sintéticos generados en {time.perf_counter() - inicio:.1f} s', file=sys.stderr)
+    instalar(aplicacion, datos, args.latencia_ms)
+    aplicacion.reconstruir_indice_vacantes()
+
+    servidor = make_server('127.0.0.1', 0, aplicacion.app, threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    puerto = servidor.server_port
+
+    def correr(segundos, semilla):
+        fin = threading.Event()
+        crudos, lock = {}, threading.Lock()
+        clientes = [Cliente(puerto, datos, fin, semilla + i, crudos, lock) for i in range(args.concurrencia)]
+        for c in clientes:
+            c.start()
+        time.sleep(segundos)
+        fin.set()
+        for c in clientes:
+            c.join()
+        return crudos
+
+    if args.calentamiento > 0:
+        correr(args.calentamiento, args.semilla * 1000)
+    antes = aplicacion.metricas.resumen_db()
+    crudos = correr(args.duracion, args.semilla)
+    despues = aplicacion.metricas.resumen_db()
+    servidor.shutdown()
+
+    rutas, rps_total = resumir(crudos, args.duracion)
+    db = {}
+    for clave, d in despues.items():
+        a = antes.get(clave, {'llamadas': 0, 'segundos': 0.0})
+        llamadas = d['llamadas'] - a['llamadas']
+        if llamadas:
+            db[clave] = {'llamadas': llamadas,
+                         'ms_promedio': round((d['segundos'] - a['segundos']) / llamadas * 1000, 3)}
+    resultado = {
+        'parametros': {k: v for k, v in vars(args).items() if k not in ('salida', 'comparar')},
+        'rps_total': rps_total,
+        'rutas': rutas,
+        'db': db,
+    }
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.salida:
+        Path(args.salida).write_text(texto + '\n', encoding='utf-8')
+    print(texto)
+
+    if args.comparar:
+        base = json.loads(Path(args.comparar).read_text(encoding='utf-8'))
+        if comparar(resultado, base, args.tolerancia):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""Prueba de carga de muchos clientes que consultan: API asíncrona contra Flask.
+
+Abre `--conexiones` clientes concurrentes (con un cliente asyncio, para
+llegar a miles desde un solo proceso) y durante `--duracion` segundos pide
+una mezcla de listado de vacantes, ranking y reportes, las rutas que
+existen en las dos. Cada objetivo se mide por separado, en el orden dado,
+contra servidores ya levantados sobre la misma base local (p. ej. cargada
+con poblar_mysql.py). Reporta por objetivo y ruta p50, p95, p99,
+throughput, errores y 503, en texto y en JSON con --salida.
+
+Uso (misma cantidad de núcleos para los dos, p. ej. con taskset):
+    taskset -c 0,1 gunicorn app:app -k gthread --threads 32 -w 2 -b :5000
+    taskset -c 0,1 gunicorn 'api_async:crear_app()' -k aiohttp.GunicornWebWorker -w 2 -b :8081
+    ulimit -n 65536
+    python benchmarks/carga_async.py --conexiones 2000 --duracion 30 --vacantes 2000 \\
+        --objetivo flask=http://127.0.0.1:5000 --objetivo async=http://127.0.0.1:8081
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import aiohttp
+
+REPORTES = ('vacantes_mes', 'postulantes_vacante', 'promedio_departamento')
+
+
+def percentil(valores, p):
+    if not valores:
+        return None
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
+def elegir_ruta(rnd, vacantes, vacantes_calientes):
+    """(nombre, ruta): la mayoría de los widgets muestran pocas vacantes."""
+    vacante_id = rnd.randint(1, vacantes_calientes) if rnd.random() < 0.8 else rnd.randint(1, vacantes)
+    r = rnd.random()
+    if r < 0.45:
+        return 'vacantes', f'/api/vacantes?limite=20&departamento_id={rnd.choice(["", rnd.randint(1, 20)])}'
+    if r < 0.85:
+        return 'ranking', f'/api/ranking/{vacante_id}?limite=20'
+    return 'reportes', f'/api/report/{rnd.choice(REPORTES)}'
+
+
+async def cliente(sesion, url, fin, rnd, args, resultados):
+    while time.monotonic() < fin:
+        nombre, ruta = elegir_ruta(rnd, args.vacantes, args.calientes)
+        inicio = time.perf_counter()
+        estado = None
+        try:
+            async with sesion.get(url + ruta) as response:
+                await response.read()
+                estado = response.status
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            estado = 'error'
+        r = resultados.setdefault(nombre, {'latencias': [], 'estados': {}})
+        r['latencias'].append(time.perf_counter() - inicio)
+        r['estados'][estado] = r['estados'].get(estado, 0) + 1
+        if args.pausa:
+            await asyncio.sleep(rnd.uniform(0, 2 * args.pausa))
+
+
+async def medir(nombre, url, args):
+    resultados = {}
+    conector = aiohttp.TCPConnector(limit=0)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    async with aiohttp.ClientSession(connector=conector, timeout=timeout) as sesion:
+        inicio = time.monotonic()
+        fin = inicio + args.duracion
+        await asyncio.gather(*[cliente(sesion, url, fin, random.Random(args.semilla + i), args, resultados)
+                               for i in range(args.conexiones)])
+        duracion = time.monotonic() - inicio
+    resumen = {}
+    for ruta, r in sorted(resultados.items()):
+        latencias = r['latencias']
+        resumen[ruta] = {
+            'requests': len(latencias),
+            'rps': round(len(latencias) / duracion, 1),
+            'p50_ms': round(percentil(latencias, 0.50) * 1000, 1),
+            'p95_ms': round(percentil(latencias, 0.95) * 1000, 1),
+            'p99_ms': round(percentil(latencias, 0.99) * 1000, 1),
+            'estados': {str(k): v for k, v in r['estados'].items()},
+        }
+    total = sum(r['requests'] for r in resumen.values())
+    return {'objetivo': nombre, 'url': url, 'duracion': round(duracion, 1), 'requests': total,
+            'rps': round(total / duracion, 1), 'rutas': resumen}
+
+
+def imprimir(resultado):
+    print(f"\n{resultado['objetivo']} ({resultado['url']}): {resultado['requests']} requests, "
+          f"{resultado['rps']} req/s")
+    print(f"  {'ruta':<10}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}  estados")
+    for ruta, r in resultado['rutas'].items():
+        print(f"  {ruta:<10}{r['rps']:>9}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}  {r['estados']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--objetivo', action='append', required=True, help='nombre=url, se puede repetir')
+    parser.add_argument('--conexiones', type=int, default=1000)
+    parser.add_argument('--duracion', type=float, default=30)
+    parser.add_argument('--vacantes', type=int, default=2000, help='ids de vacante existentes: 1..N')
+    parser.add_argument('--calientes', type=int, default=20, help='vacantes que reciben el 80%% de los pedidos')
+    parser.add_argument('--pausa', type=float, default=0.0, help='segundos promedio entre pedidos de un cliente')
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--salida', help='archivo JSON con los resultados')
+    args = parser.parse_args()
+
+    resultados = []
+    for objetivo in args.objetivo:
+        nombre, _, url = objetivo.partition('=')
+        resultado = asyncio.run(medir(nombre, url.rstrip('/'), args))
+        imprimir(resultado)
+        resultados.append(resultado)
+    if len(resultados) > 1:
+        base = resultados[0]
+        for otro in resultados[1:]:
+            print(f"\n{otro['objetivo']} / {base['objetivo']}: "
+                  f"{otro['rps'] / base['rps'] if base['rps'] else float('inf'):.1f}x req/s")
+    if args.salida:
+        with open(args.salida, 'w') as archivo:
+            json.dump(resultados, archivo, indent=2)
+
+
+if __name__ == '__main__':
+    main()
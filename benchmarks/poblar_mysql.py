@@ -0,0 +1,102 @@
+"""Carga los datos sintéticos de bd_simulada.py en una base MySQL/MariaDB local.
+
+Sirve para revisar planes de ejecución (`flask verificar-planes`) y medir
+contra una base real con un volumen parecido al de producción. Requiere una
+base recién creada con setup_reclutamiento.sql (y `flask migrar`): no carga
+nada si ya hay vacantes, postulantes o postulaciones. Los triggers de
+auditoría y de reportes se ejecutan como con cualquier alta.
+
+Uso:
+    python benchmarks/poblar_mysql.py --vacantes 2000 --postulantes 50000 --postulaciones 200000
+    flask verificar-planes
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import pymysql
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bd_simulada import BASE, DatosSimulados  # noqa: E402
+
+LOTE = 5000
+
+
+def insertar(cursor, conn, tabla, columnas, filas):
+    inicio = time.perf_counter()
+    sql = (f"INSERT INTO {tabla} ({', '.join(columnas)}) "
+           f"VALUES ({', '.join(['%s'] * len(columnas))})")
+    total = 0
+    lote = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) >= LOTE:
+            cursor.executemany(sql, lote)
+            conn.commit()
+            total += len(lote)
+            lote = []
+    if lote:
+        cursor.executemany(sql, lote)
+        conn.commit()
+        total += len(lote)
+    print(f'{tabla}: {total} filas en {time.perf_counter() - inicio:.1f}s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--vacantes', type=int, default=2000)
+    parser.add_argument('--postulantes', type=int, default=50000)
+    parser.add_argument('--postulaciones', type=int, default=200000)
+    parser.add_argument('--logs', type=int, default=200000)
+    parser.add_argument('--departamentos', type=int, default=20)
+    parser.add_argument('--host', default=os.getenv('DB_HOST', '127.0.0.1'))
+    parser.add_argument('--usuario', default=os.getenv('DB_USER', 'admin_rrhh'))
+    parser.add_argument('--password', default=os.getenv('DB_PASS', 'AdminPass!2026'))
+    parser.add_argument('--base', default=os.getenv('DB_NAME', 'reclutamiento'))
+    args = parser.parse_args()
+
+    conn = pymysql.connect(host=args.host, user=args.usuario, password=args.password, database=args.base,
+                           charset='utf8mb4')
+    cursor = conn.cursor()
+    for tabla in ('vacantes', 'postulantes', 'postulaciones'):
+        cursor.execute(f'SELECT COUNT(*) FROM {tabla}')
+        if cursor.fetchone()[0]:
+            sys.exit(f'{tabla} ya tiene filas: usar una base recién creada con setup_reclutamiento.sql')
+
+    print('Generando datos...')
+    datos = DatosSimulados(vacantes=args.vacantes, postulantes=args.postulantes,
+                           postulaciones=args.postulaciones, logs=args.logs, departamentos=args.departamentos)
+    cursor.execute('SELECT COALESCE(MAX(id), 0) FROM departamentos')
+    primer_departamento = cursor.fetchone()[0]
+    insertar(cursor, conn, 'departamentos', ('id', 'nombre', 'descripcion'),
+             ((primer_departamento + d['id'], f"{d['nombre']} (sintético)", d['descripcion'])
+              for d in datos.departamentos))
+    insertar(cursor, conn, 'vacantes',
+             ('id', 'titulo', 'descripcion', 'departamento_id', 'requerimientos', 'estado', 'activo', 'creado_en'),
+             ((v['id'], v['titulo'], v['descripcion'], primer_departamento + v['departamento_id'],
+               json.dumps(v['requerimientos']), v['estado'], v['activo'], v['creado_en'])
+              for v in datos.vacantes.values()))
+    insertar(cursor, conn, 'postulantes', ('id', 'nombre', 'email', 'anos_experiencia', 'habilidades'),
+             ((i, nombre, email, anos, json.dumps(habilidades))
+              for i, (nombre, email, anos, habilidades) in enumerate(datos.postulantes) if i))
+    total = len(datos.po_vacante)
+    insertar(cursor, conn, 'postulaciones', ('id', 'postulante_id', 'vacante_id', 'fecha_postulacion', 'usuario_creo'),
+             ((i, datos.po_postulante[i], datos.po_vacante[i], BASE + timedelta(seconds=datos.po_segundos[i]),
+               'reclutador1') for i in range(1, total)))
+    insertar(cursor, conn, 'evaluacion_ia', ('postulacion_id', 'score', 'criterios'),
+             ((i, datos.po_score[i], '{"metodo": "sintetico"}') for i in range(1, total)))
+    insertar(cursor, conn, 'logs_auditoria',
+             ('usuario_mysql', 'accion', 'tabla_afectada', 'fila_id', 'fecha', 'descripcion'),
+             (fila[1:] for fila in datos.logs))
+    cursor.execute('ANALYZE TABLE vacantes, postulantes, postulaciones, evaluacion_ia, logs_auditoria')
+    cursor.fetchall()
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
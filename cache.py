@@ -0,0 +1,149 @@
+"""Cache de lecturas con invalidación explícita.
+
+`Cache.leer(clave, cargar)` devuelve el valor guardado o llama a `cargar()`
+y lo guarda (read-through). La app invalida las claves afectadas justo
+después de cada escritura (`Cache.invalidar`); el TTL acota lo que pueda
+quedar desactualizado en otros procesos cuando el backend es local.
+
+Backends:
+- CacheLocal: LRU en memoria del proceso con TTL (por defecto).
+- CacheRedis: compartido entre procesos; requiere el paquete `redis`
+  (opcional, no está en requirements.txt).
+
+Las claves son tuplas, p. ej. ('vacante', 12) o ('departamentos',). Los
+valores guardados se comparten entre requests: no modificarlos.
+"""
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheLocal:
+    def __init__(self, max_entradas=10000):
+        self._max = max_entradas
+        self._datos = OrderedDict()  # clave -> (vence, valor)
+        self._lock = threading.Lock()
+        self.expulsadas = 0
+
+    def obtener(self, clave):
+        """(True, valor) si está y no venció; (False, None) si no."""
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return False, None
+            vence, valor = entrada
+            if vence < time.monotonic():
+                del self._datos[clave]
+                return False, None
+            self._datos.move_to_end(clave)
+            return True, valor
+
+    def guardar(self, clave, valor, ttl):
+        with self._lock:
+            self._datos[clave] = (time.monotonic() + ttl, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self._max:
+                self._datos.popitem(last=False)
+                self.expulsadas += 1
+
+    def borrar(self, claves):
+        with self._lock:
+            for clave in claves:
+                self._datos.pop(clave, None)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+    def __len__(self):
+        return len(self._datos)
+
+
+class CacheRedis:
+    def __init__(self, url, prefijo='reclutamiento:'):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError('CACHE_URL apunta a Redis pero el paquete redis no está instalado') from e
+        self._redis = redis.Redis.from_url(url)
+        self._prefijo = prefijo
+        self.expulsadas = 0
+
+    def _clave(self, clave):
+        return self._prefijo + ':'.join(str(p) for p in clave)
+
+    def obtener(self, clave):
+        crudo = self._redis.get(self._clave(clave))
+        if crudo is None:
+            return False, None
+        return True, pickle.loads(crudo)
+
+    def guardar(self, clave, valor, ttl):
+        self._redis.set(self._clave(clave), pickle.dumps(valor), ex=max(1, int(ttl)))
+
+    def borrar(self, claves):
+        if claves:
+            self._redis.delete(*(self._clave(c) for c in claves))
+
+    def limpiar(self):
+        for clave in self._redis.scan_iter(self._prefijo + '*'):
+            self._redis.delete(clave)
+
+    def __len__(self):
+        return sum(1 for _ in self._redis.scan_iter(self._prefijo + '*'))
+
+
+class Cache:
+    def __init__(self, backend, ttl=60):
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+        self._version = 0
+
+    def leer(self, clave, cargar, ttl=None):
+        encontrado, valor = self.backend.obtener(clave)
+        with self._lock:
+            if encontrado:
+                self.aciertos += 1
+            else:
+                self.fallos += 1
+            version = self._version
+        if encontrado:
+            return valor
+        valor = cargar()
+        # si hubo una invalidación mientras se cargaba, el valor puede ser
+        # anterior a la escritura: se devuelve pero no se guarda
+        with self._lock:
+            if version == self._version:
+                self.backend.guardar(clave, valor, ttl or self.ttl)
+        return valor
+
+    def invalidar(self, *claves):
+        with self._lock:
+            self._version += 1
+            self.invalidaciones += len(claves)
+        self.backend.borrar(claves)
+
+    def estadisticas(self):
+        total = self.aciertos + self.fallos
+        return {
+            'backend': type(self.backend).__name__,
+            'entradas': len(self.backend),
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': round(self.aciertos / total, 4) if total else None,
+            'invalidaciones': self.invalidaciones,
+            'expulsadas': self.backend.expulsadas,
+            'ttl': self.ttl,
+        }
+
+
+def crear_cache(url=None, ttl=60, max_entradas=10000):
+    """CacheLocal salvo que `url` sea redis://... o rediss://..."""
+    if url and url.startswith(('redis://', 'rediss://')):
+        return Cache(CacheRedis(url), ttl)
+    return Cache(CacheLocal(max_entradas), ttl)
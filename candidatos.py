@@ -0,0 +1,115 @@
+"""Búsqueda inversa: mejores postulantes existentes para una vacante.
+
+Índice en memoria de todos los postulantes:
+- posting lists: id de habilidad normalizada -> set de postulante_id
+- buckets de experiencia: años -> set de postulante_id (claves ordenadas)
+
+`mejores(requerimientos, k)` puntúa con la fórmula de fn_calcular_score
+(LEAST(100, anos * 2 + coincidencias * 10)): cuenta coincidencias solo sobre
+las posting lists de los requerimientos y completa con los de más
+experiencia sin coincidencias recorriendo los buckets de mayor a menor. El
+costo depende de cuántos postulantes tienen alguna habilidad pedida, no del
+total. Las habilidades (declaradas más las extraídas del CV) se comparan
+normalizadas y sin repetir, igual que evaluacion.py.
+"""
+import heapq
+import threading
+from bisect import insort
+
+from evaluacion import Vocabulario, calcular_score, leer_lista_json
+
+
+class IndiceCandidatos:
+    def __init__(self):
+        self.vocabulario = Vocabulario()
+        self._postings = {}      # habilidad_id -> set(postulante_id)
+        self._buckets = {}       # anos -> set(postulante_id)
+        self._anos_orden = []    # claves de _buckets, ascendente
+        self._postulantes = {}   # postulante_id -> (anos, frozenset(habilidad_id))
+        self._lock = threading.RLock()
+        self.construido = False
+
+    def __len__(self):
+        return len(self._postulantes)
+
+    def reconstruir(self, filas):
+        """filas: dicts con id, anos_experiencia, habilidades y habilidades_cv (JSON)."""
+        nuevo = IndiceCandidatos()
+        nuevo.vocabulario = self.vocabulario
+        for fila in filas:
+            habilidades = leer_lista_json(fila.get('habilidades')) + leer_lista_json(fila.get('habilidades_cv'))
+            nuevo._agregar(fila['id'], fila.get('anos_experiencia'), habilidades)
+        with self._lock:
+            self._postings = nuevo._postings
+            self._buckets = nuevo._buckets
+            self._anos_orden = nuevo._anos_orden
+            self._postulantes = nuevo._postulantes
+            self.construido = True
+
+    def actualizar(self, postulante_id, anos, habilidades):
+        with self._lock:
+            self._quitar(postulante_id)
+            self._agregar(postulante_id, anos, habilidades)
+
+    def eliminar(self, postulante_id):
+        with self._lock:
+            self._quitar(postulante_id)
+
+    def _agregar(self, postulante_id, anos, habilidades):
+        anos = int(anos or 0)
+        ids = frozenset(i for i in (self.vocabulario.id(h) for h in habilidades) if i is not None)
+        self._postulantes[postulante_id] = (anos, ids)
+        for i in ids:
+            self._postings.setdefault(i, set()).add(postulante_id)
+        bucket = self._buckets.get(anos)
+        if bucket is None:
+            bucket = self._buckets[anos] = set()
+            insort(self._anos_orden, anos)
+        bucket.add(postulante_id)
+
+    def _quitar(self, postulante_id):
+        actual = self._postulantes.pop(postulante_id, None)
+        if actual is None:
+            return
+        anos, ids = actual
+        for i in ids:
+            posting = self._postings.get(i)
+            if posting is not None:
+                posting.discard(postulante_id)
+                if not posting:
+                    del self._postings[i]
+        bucket = self._buckets[anos]
+        bucket.discard(postulante_id)
+        if not bucket:
+            del self._buckets[anos]
+            self._anos_orden.remove(anos)
+
+    def mejores(self, requerimientos, k=20, excluir=()):
+        """Top-k [{postulante_id, score, coincidencias, anos_experiencia}] por
+        score desc, coincidencias desc, años desc e id asc."""
+        requeridos = {i for i in (self.vocabulario.id(r, crear=False) for r in requerimientos) if i is not None}
+        excluir = set(excluir)
+        with self._lock:
+            coincidencias = {}
+            for i in requeridos:
+                for postulante_id in self._postings.get(i, ()):
+                    coincidencias[postulante_id] = coincidencias.get(postulante_id, 0) + 1
+            candidatos = []
+            for postulante_id, c in coincidencias.items():
+                if postulante_id in excluir:
+                    continue
+                anos = self._postulantes[postulante_id][0]
+                candidatos.append((calcular_score(anos, c), c, anos, -postulante_id))
+            top = heapq.nlargest(k, candidatos)
+            # sin coincidencias el score es solo anos * 2: los de más experiencia
+            faltan = k
+            for anos in reversed(self._anos_orden):
+                if faltan <= 0 or (len(top) >= k and calcular_score(anos, 0) <= top[-1][0]):
+                    break
+                libres = (p for p in self._buckets[anos] if p not in coincidencias and p not in excluir)
+                for postulante_id in heapq.nsmallest(faltan, libres):
+                    candidatos.append((calcular_score(anos, 0), 0, anos, -postulante_id))
+                    faltan -= 1
+            top = heapq.nlargest(k, candidatos)
+        return [{'postulante_id': -neg_id, 'score': score, 'coincidencias': c, 'anos_experiencia': anos}
+                for score, c, anos, neg_id in top]
@@ -0,0 +1,158 @@
+"""Cola acotada de evaluaciones pendientes con un pool de hilos.
+
+La app encola ids de postulaciones recién registradas; cada hilo toma un
+lote (hasta `tamano_lote` ids o lo que llegue en `espera_lote` segundos),
+lo evalúa con `procesar_lote(ids)`. Si el lote falla, procesa sus ids de a
+uno para que un id con problemas no arrastre a los demás, y solo los que
+fallan solos se reintentan con espera exponencial hasta `reintentos` veces.
+"""
+import logging
+import queue
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+
+class ColaEvaluacion:
+    def __init__(self, procesar_lote, hilos=2, capacidad=10000, tamano_lote=100,
+                 espera_lote=0.2, reintentos=3, espera_reintento=0.5, nombre='evaluacion'):
+        """Sirve para cualquier id hashable: la extracción de CVs la usa con cv_path."""
+        self._procesar_lote = procesar_lote
+        self._nombre = nombre
+        self._hilos = hilos
+        self._cola = queue.Queue(maxsize=capacidad)
+        self._tamano_lote = tamano_lote
+        self._espera_lote = espera_lote
+        self._reintentos = reintentos
+        self._espera_reintento = espera_reintento
+        self._lock = threading.Lock()
+        self._pendientes = set()
+        self._trabajadores = []
+        self._detener = threading.Event()
+        self.procesadas = 0
+        self.fallidas = 0
+        self.reintentadas = 0
+
+    def iniciar(self):
+        with self._lock:
+            if self._trabajadores:
+                return
+            self._detener.clear()
+            for i in range(self._hilos):
+                hilo = threading.Thread(target=self._trabajar, name=f'{self._nombre}-{i}', daemon=True)
+                hilo.start()
+                self._trabajadores.append(hilo)
+
+    def detener(self, timeout=5.0):
+        self._detener.set()
+        for hilo in self._trabajadores:
+            hilo.join(timeout)
+        self._trabajadores = []
+
+    def encolar(self, postulacion_id):
+        """False si la cola está llena (el llamador decide qué hacer)."""
+        self.iniciar()
+        # se marca antes de encolar: un trabajador rápido podría terminarlo
+        # antes de marcarlo y dejarlo pendiente para siempre
+        with self._lock:
+            ya_pendiente = postulacion_id in self._pendientes
+            self._pendientes.add(postulacion_id)
+        try:
+            self._cola.put_nowait((postulacion_id, 0))
+        except queue.Full:
+            if not ya_pendiente:
+                with self._lock:
+                    self._pendientes.discard(postulacion_id)
+            return False
+        return True
+
+    def pendiente(self, postulacion_id):
+        with self._lock:
+            return postulacion_id in self._pendientes
+
+    def profundidad(self):
+        return self._cola.qsize()
+
+    def estadisticas(self):
+        with self._lock:
+            en_proceso = len(self._pendientes)
+        return {
+            'profundidad': self.profundidad(),
+            'pendientes': en_proceso,
+            'hilos': len(self._trabajadores),
+            'procesadas': self.procesadas,
+            'fallidas': self.fallidas,
+            'reintentadas': self.reintentadas,
+        }
+
+    def _tomar_lote(self):
+        try:
+            lote = [self._cola.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        limite = time.monotonic() + self._espera_lote
+        while len(lote) < self._tamano_lote:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                lote.append(self._cola.get(timeout=restante))
+            except queue.Empty:
+                break
+        return lote
+
+    def _trabajar(self):
+        while not self._detener.is_set():
+            lote = self._tomar_lote()
+            if not lote:
+                continue
+            ids = [postulacion_id for postulacion_id, _ in lote]
+            try:
+                self._procesar_lote(ids)
+                self._terminar(ids, ok=True)
+            except Exception:
+                log.exception('Fallo al procesar lote de %d elementos (%s)', len(ids), self._nombre)
+                self._procesar_de_a_uno(lote)
+            finally:
+                for _ in lote:
+                    self._cola.task_done()
+
+    def _procesar_de_a_uno(self, lote):
+        if len(lote) == 1:
+            self._reintentar(lote[0][0], lote[0][1] + 1)
+            return
+        for postulacion_id, intento in lote:
+            try:
+                self._procesar_lote([postulacion_id])
+                self._terminar([postulacion_id], ok=True)
+            except Exception:
+                log.exception('%s: fallo al procesar %s', self._nombre, postulacion_id)
+                self._reintentar(postulacion_id, intento + 1)
+
+    def _reintentar(self, postulacion_id, intento):
+        if intento > self._reintentos:
+            log.error('%s: %s sin procesar tras %d intentos', self._nombre, postulacion_id, self._reintentos)
+            self._terminar([postulacion_id], ok=False)
+            return
+        with self._lock:
+            self.reintentadas += 1
+        # reencolar tras la espera sin bloquear al trabajador
+        espera = self._espera_reintento * (2 ** (intento - 1))
+        temporizador = threading.Timer(espera, self._reencolar, (postulacion_id, intento))
+        temporizador.daemon = True
+        temporizador.start()
+
+    def _reencolar(self, postulacion_id, intento):
+        try:
+            self._cola.put_nowait((postulacion_id, intento))
+        except queue.Full:
+            self._terminar([postulacion_id], ok=False)
+
+    def _terminar(self, ids, ok):
+        with self._lock:
+            self._pendientes.difference_update(ids)
+            if ok:
+                self.procesadas += len(ids)
+            else:
+                self.fallidas += len(ids)
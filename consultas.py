@@ -0,0 +1,97 @@
+"""Consultas SQL en línea usadas por la app, con nombre.
+
+Los procedimientos almacenados se llaman por su nombre con call_proc; las
+pocas consultas que no pasan por un procedimiento viven aquí para que se
+llamen igual (query('departamentos')) y puedan medirse y reutilizarse.
+Parámetros en formato PyMySQL: %(nombre)s.
+"""
+
+CONSULTAS = {
+    'departamentos': 'SELECT id, nombre FROM departamentos ORDER BY nombre',
+    'departamentos_detalle': 'SELECT id, nombre, descripcion FROM departamentos ORDER BY nombre',
+    'reporte_general': 'SELECT total_vacantes, total_postulantes, promedio_score FROM vista_reporte_general',
+    'postulaciones_recientes': '''
+        SELECT pt.nombre, v.titulo, po.fecha_postulacion
+        FROM postulaciones po
+        JOIN postulantes pt ON pt.id = po.postulante_id
+        JOIN vacantes v ON v.id = po.vacante_id
+        ORDER BY po.fecha_postulacion DESC LIMIT 10
+    ''',
+    'postulaciones_postulante': '''
+        SELECT po.id AS postulacion_id, po.fecha_postulacion, po.estado,
+               v.id AS vacante_id, v.titulo, d.nombre AS departamento,
+               e.score
+        FROM postulaciones po
+        JOIN vacantes v ON v.id = po.vacante_id
+        LEFT JOIN departamentos d ON d.id = v.departamento_id
+        LEFT JOIN evaluacion_ia e ON e.postulacion_id = po.id
+        WHERE po.postulante_id = %(postulante_id)s
+        ORDER BY po.fecha_postulacion DESC
+    ''',
+    'postulaciones_sin_evaluar': '''
+        SELECT po.id FROM postulaciones po
+        LEFT JOIN evaluacion_ia e ON e.postulacion_id = po.id
+        WHERE e.id IS NULL ORDER BY po.id
+    ''',
+    # ranking completo de una vacante para exportar, con cursor
+    # (score, fecha_postulacion, id); sin score ordena como -1
+    'exportar_ranking': '''
+        SELECT po.id AS postulacion_id, pt.id AS postulante_id, pt.nombre AS postulante_nombre,
+               e.score, e.criterios, po.fecha_postulacion
+        FROM postulaciones po
+        JOIN postulantes pt ON pt.id = po.postulante_id
+        LEFT JOIN evaluacion_ia e ON e.postulacion_id = po.id
+        WHERE po.vacante_id = %(vacante_id)s
+          AND (COALESCE(e.score, -1) < %(score)s
+               OR (COALESCE(e.score, -1) = %(score)s
+                   AND (po.fecha_postulacion > %(fecha)s
+                        OR (po.fecha_postulacion = %(fecha)s AND po.id > %(id)s))))
+        ORDER BY COALESCE(e.score, -1) DESC, po.fecha_postulacion ASC, po.id ASC
+    ''',
+    # vacantes abiertas del dashboard del reclutador: sin descripción ni
+    # requerimientos, que sp_listar_vacantes devuelve completos
+    'vacantes_abiertas': '''
+        SELECT id, titulo, estado FROM vacantes
+        WHERE activo = 1 AND estado = 'abierta'
+        ORDER BY creado_en DESC
+    ''',
+    # top-k de varias vacantes en una lectura (dashboard del reclutador): se
+    # devuelven k filas por vacante, no el ranking completo; mismo orden que
+    # sp_generar_ranking y que ranking_memoria.clave_ranking
+    'top_por_vacante': '''
+        SELECT t.postulacion_id, t.vacante_id, pt.id AS postulante_id, pt.nombre AS postulante_nombre,
+               t.score, e.criterios, t.fecha_postulacion
+        FROM (
+            SELECT po.id AS postulacion_id, po.vacante_id, po.postulante_id, ev.score, po.fecha_postulacion,
+                   ROW_NUMBER() OVER (PARTITION BY po.vacante_id
+                                      ORDER BY COALESCE(ev.score, -1) DESC, po.fecha_postulacion ASC,
+                                               po.id ASC) AS puesto
+            FROM postulaciones po
+            LEFT JOIN evaluacion_ia ev ON ev.postulacion_id = po.id
+            WHERE po.vacante_id IN %(ids)s
+        ) t
+        JOIN postulantes pt ON pt.id = t.postulante_id
+        LEFT JOIN evaluacion_ia e ON e.postulacion_id = t.postulacion_id
+        WHERE t.puesto <= %(k)s
+        ORDER BY t.vacante_id, t.puesto
+    ''',
+    'postulantes_habilidades': 'SELECT id, anos_experiencia, habilidades, habilidades_cv FROM postulantes',
+    'postulantes_resumen': 'SELECT id, nombre, email FROM postulantes WHERE id IN %(ids)s',
+    'cv_paths': 'SELECT DISTINCT cv_path FROM postulantes WHERE cv_path IS NOT NULL',
+    'cvs_sin_extraer': 'SELECT DISTINCT cv_path FROM postulantes WHERE cv_path IS NOT NULL AND habilidades_cv IS NULL',
+    'vacantes_requerimientos': 'SELECT requerimientos FROM vacantes',
+    'cv_extraccion': 'SELECT texto, error FROM cv_extracciones WHERE hash = %(hash)s',
+    'guardar_cv_extraccion': '''
+        INSERT INTO cv_extracciones (hash, texto, caracteres, error, segundos)
+        VALUES (%(hash)s, %(texto)s, %(caracteres)s, %(error)s, %(segundos)s)
+        ON DUPLICATE KEY UPDATE texto = VALUES(texto), caracteres = VALUES(caracteres),
+            error = VALUES(error), segundos = VALUES(segundos), extraido_en = CURRENT_TIMESTAMP
+    ''',
+    # todos los postulantes con el mismo archivo (el almacén deduplica por hash)
+    'aplicar_habilidades_cv': 'UPDATE postulantes SET habilidades_cv = %(habilidades)s WHERE cv_path = %(cv_path)s',
+    'postulantes_por_cv': '''
+        SELECT id, anos_experiencia, habilidades, habilidades_cv FROM postulantes WHERE cv_path = %(cv_path)s
+    ''',
+    'postulaciones_de_postulantes': 'SELECT id FROM postulaciones WHERE postulante_id IN %(ids)s',
+    'insertar_postulante': 'INSERT INTO postulantes (nombre, email) VALUES (%(nombre)s, %(email)s)',
+}
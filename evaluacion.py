@@ -0,0 +1,274 @@
+"""Motor de re-evaluación masiva de postulaciones.
+
+Aplica la misma fórmula que fn_calcular_score (LEAST(100, anos * 2 +
+coincidencias * 10)) a todas las postulaciones de una vacante o de todas las
+vacantes. Las habilidades y requerimientos se normalizan (mayúsculas y
+acentos plegados, espacios colapsados; la misma regla que
+fn_contar_coincidencias en migraciones/0002), se codifican como ids enteros y cada postulante queda
+como un bitset (un int de Python); las coincidencias de un lote son un AND +
+int.bit_count() por fila. Los resultados se escriben en evaluacion_ia con
+upserts multi-fila por bloques.
+"""
+import json
+import threading
+import time
+
+from indice_vacantes import plegar
+
+TAMANO_LOTE = 1000
+METODO = 'recalculo_lote'
+
+SQL_AUDITORIA = (
+    'INSERT INTO logs_auditoria (usuario_mysql, accion, tabla_afectada, fila_id, descripcion) '
+    'VALUES (%s, %s, %s, %s, %s)'
+)
+
+SQL_UPSERT_EVALUACION = (
+    'INSERT INTO evaluacion_ia (postulacion_id, score, criterios) VALUES (%s, %s, %s) '
+    'ON DUPLICATE KEY UPDATE score = VALUES(score), criterios = VALUES(criterios), '
+    'actualizado_en = CURRENT_TIMESTAMP'
+)
+
+
+def normalizar_habilidad(habilidad):
+    # equivale a fn_normalizar_habilidad comparada con utf8mb4_unicode_ci
+    return ' '.join(plegar(str(habilidad)).split())
+
+
+def leer_lista_json(valor):
+    """habilidades / requerimientos llegan como texto JSON desde PyMySQL."""
+    if isinstance(valor, (bytes, str)):
+        try:
+            valor = json.loads(valor)
+        except ValueError:
+            return []
+    return valor if isinstance(valor, list) else []
+
+
+def calcular_score(anos, coincidencias):
+    """Equivalente en Python de fn_calcular_score."""
+    return float(min(100, (anos or 0) * 2 + coincidencias * 10))
+
+
+class Vocabulario:
+    """Asigna un id entero estable a cada habilidad normalizada."""
+
+    def __init__(self):
+        self._ids = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def id(self, habilidad, crear=True):
+        clave = normalizar_habilidad(habilidad)
+        if not clave:
+            return None
+        i = self._ids.get(clave)
+        if i is None and crear:
+            # los hilos de la cola de evaluación comparten el vocabulario
+            with self._lock:
+                i = self._ids.setdefault(clave, len(self._ids))
+        return i
+
+    def mascara(self, habilidades, crear=True):
+        mascara = 0
+        for h in habilidades:
+            i = self.id(h, crear)
+            if i is not None:
+                mascara |= 1 << i
+        return mascara
+
+
+def contar_coincidencias(mascaras, mascara_req):
+    """Coincidencias de cada bitset de `mascaras` con `mascara_req`."""
+    return [(m & mascara_req).bit_count() for m in mascaras]
+
+
+def calcular_scores(anos, coincidencias):
+    return [calcular_score(a, c) for a, c in zip(anos, coincidencias)]
+
+
+class Progreso:
+    """Reporte de avance y throughput en la salida estándar."""
+
+    def __init__(self, salida=print, cada=5000):
+        self._salida = salida
+        self._cada = cada
+        self.inicio = time.perf_counter()
+        self.procesadas = 0
+        self.escritas = 0
+        self._ultimo = 0
+
+    def avanzar(self, procesadas, escritas):
+        self.procesadas += procesadas
+        self.escritas += escritas
+        if self.procesadas - self._ultimo >= self._cada:
+            self._ultimo = self.procesadas
+            self._salida(self.resumen())
+
+    def resumen(self):
+        duracion = time.perf_counter() - self.inicio
+        ritmo = self.procesadas / duracion if duracion > 0 else 0.0
+        return (f'{self.procesadas} postulaciones evaluadas, {self.escritas} escritas '
+                f'en {duracion:.1f}s ({ritmo:,.0f} postulaciones/s)')
+
+
+class MotorEvaluacion:
+    def __init__(self, engine, tamano_lote=TAMANO_LOTE, solo_cambios=True, auditoria=None):
+        """`auditoria`: BufferAuditoria opcional; sin él los eventos se insertan
+        en la misma transacción que los scores."""
+        self.engine = engine
+        self.auditoria = auditoria
+        self.tamano_lote = tamano_lote
+        self.solo_cambios = solo_cambios
+        self.vocabulario = Vocabulario()
+        self._postulantes = {}  # postulante_id -> (anos, mascara)
+
+    def cargar_postulantes(self, conn, ids=None):
+        cur = conn.cursor()
+        try:
+            if ids is None:
+                cur.execute('SELECT id, anos_experiencia, habilidades, habilidades_cv FROM postulantes')
+            else:
+                ids = list(ids)
+                if not ids:
+                    return
+                marcas = ', '.join(['%s'] * len(ids))
+                cur.execute('SELECT id, anos_experiencia, habilidades, habilidades_cv FROM postulantes '
+                            f'WHERE id IN ({marcas})', ids)
+            for postulante_id, anos, habilidades, habilidades_cv in cur.fetchall():
+                self._postulantes[postulante_id] = (anos or 0, self.mascara_postulante(habilidades, habilidades_cv))
+        finally:
+            cur.close()
+
+    def mascara_postulante(self, habilidades, habilidades_cv=None):
+        """Habilidades declaradas más las extraídas del CV (ver extraccion_cv.py)."""
+        return self.vocabulario.mascara(leer_lista_json(habilidades) + leer_lista_json(habilidades_cv))
+
+    def evaluar(self, requerimientos, postulaciones):
+        """postulaciones: [(postulacion_id, postulante_id, score_actual)].
+        Devuelve [(postulacion_id, score, coincidencias, score_actual)]."""
+        mascara_req = self.vocabulario.mascara(requerimientos)
+        datos = [self._postulantes.get(p[1], (0, 0)) for p in postulaciones]
+        coincidencias = contar_coincidencias([d[1] for d in datos], mascara_req)
+        scores = calcular_scores([d[0] for d in datos], coincidencias)
+        return [(p[0], s, c, p[2]) for p, s, c in zip(postulaciones, scores, coincidencias)]
+
+    def recalcular(self, vacante_id=None, progreso=None):
+        """Re-evalúa una vacante o, sin vacante_id, todas. Devuelve el Progreso."""
+        progreso = progreso or Progreso()
+        conn = self.engine.raw_connection()
+        try:
+            if not self._postulantes:
+                self.cargar_postulantes(conn)
+            cur = conn.cursor()
+            try:
+                if vacante_id is None:
+                    cur.execute('SELECT id, requerimientos FROM vacantes ORDER BY id')
+                else:
+                    cur.execute('SELECT id, requerimientos FROM vacantes WHERE id = %s', (vacante_id,))
+                vacantes = cur.fetchall()
+            finally:
+                cur.close()
+            for vid, requerimientos in vacantes:
+                self._recalcular_vacante(conn, vid, leer_lista_json(requerimientos), progreso)
+        finally:
+            conn.close()
+        return progreso
+
+    def _recalcular_vacante(self, conn, vacante_id, requerimientos, progreso):
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                'SELECT po.id, po.postulante_id, e.score FROM postulaciones po '
+                'LEFT JOIN evaluacion_ia e ON e.postulacion_id = po.id WHERE po.vacante_id = %s',
+                (vacante_id,))
+            postulaciones = cur.fetchall()
+        finally:
+            cur.close()
+        for i in range(0, len(postulaciones), self.tamano_lote):
+            resultados = self.evaluar(requerimientos, postulaciones[i:i + self.tamano_lote])
+            escritas = self.escribir(conn, resultados)
+            progreso.avanzar(len(resultados), escritas)
+
+    def evaluar_postulaciones(self, postulacion_ids, metodo='inicial'):
+        """Evalúa postulaciones concretas (p. ej. recién registradas) en una
+        sola consulta y un upsert. Devuelve las filas de ranking resultantes.
+        `metodo` queda en los criterios; con 'cv' (habilidades extraídas del
+        CV) la auditoría lo registra como recálculo."""
+        ids = list(postulacion_ids)
+        if not ids:
+            return []
+        conn = self.engine.raw_connection()
+        try:
+            cur = conn.cursor()
+            try:
+                marcas = ', '.join(['%s'] * len(ids))
+                cur.execute(
+                    'SELECT po.id, po.vacante_id, pt.id, pt.nombre, pt.anos_experiencia, pt.habilidades, '
+                    'pt.habilidades_cv, v.requerimientos, po.fecha_postulacion, po.usuario_creo FROM postulaciones po '
+                    'JOIN postulantes pt ON pt.id = po.postulante_id '
+                    f'JOIN vacantes v ON v.id = po.vacante_id WHERE po.id IN ({marcas})', ids)
+                datos = cur.fetchall()
+            finally:
+                cur.close()
+            filas = []
+            resultados = []
+            auditoria = []
+            if metodo == 'cv':
+                descripcion = 'recalculo con habilidades del CV: puntaje={:.2f}'
+            else:
+                descripcion = 'evaluacion asincrona: puntaje inicial={:.2f}'
+            for (postulacion_id, vacante_id, postulante_id, nombre, anos, habilidades, habilidades_cv,
+                 requerimientos, fecha, usuario) in datos:
+                mascara = self.mascara_postulante(habilidades, habilidades_cv)
+                coincidencias = (mascara & self.vocabulario.mascara(leer_lista_json(requerimientos))).bit_count()
+                score = calcular_score(anos, coincidencias)
+                criterios = json.dumps({'metodo': metodo, 'coincidencias': coincidencias})
+                resultados.append((postulacion_id, score, criterios))
+                auditoria.append((usuario, 'SP', 'postulaciones', str(postulacion_id),
+                                  descripcion.format(score)))
+                filas.append({
+                    'postulacion_id': postulacion_id, 'vacante_id': vacante_id,
+                    'postulante_id': postulante_id, 'postulante_nombre': nombre,
+                    'score': score, 'criterios': criterios, 'fecha_postulacion': fecha,
+                })
+            if resultados:
+                cur = conn.cursor()
+                try:
+                    cur.executemany(SQL_UPSERT_EVALUACION, resultados)
+                    if self.auditoria is None:
+                        cur.executemany(SQL_AUDITORIA, auditoria)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                finally:
+                    cur.close()
+                if self.auditoria is not None:
+                    for evento in auditoria:
+                        self.auditoria.registrar(*evento)
+            return filas
+        finally:
+            conn.close()
+
+    def escribir(self, conn, resultados):
+        filas = [
+            (postulacion_id, score, json.dumps({'metodo': METODO, 'coincidencias': coincidencias}))
+            for postulacion_id, score, coincidencias, actual in resultados
+            if not self.solo_cambios or actual is None or float(actual) != score
+        ]
+        if not filas:
+            return 0
+        cur = conn.cursor()
+        try:
+            # PyMySQL convierte executemany de un INSERT ... VALUES en un INSERT multi-fila
+            cur.executemany(SQL_UPSERT_EVALUACION, filas)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+        return len(filas)
@@ -0,0 +1,64 @@
+"""Serialización por bloques para exportaciones grandes (CSV y NDJSON).
+
+Los generadores reciben un iterable de filas (dicts) y devuelven texto en
+bloques de ~`tamano_bloque` caracteres, sin acumular el resultado: la
+memoria usada depende del bloque, no de la cantidad de filas. Cada fila
+lleva una columna `cursor` (la que devuelve `cursor_de(fila)`); si la
+descarga se corta, se retoma pidiendo la exportación con el cursor de la
+última fila recibida completa.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+TAMANO_BLOQUE = 64 * 1024
+
+
+def valor_exportable(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, bytes):
+        return valor.decode('utf-8', 'replace')
+    return valor
+
+
+def generar_csv(filas, cursor_de, tamano_bloque=TAMANO_BLOQUE):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    columnas = None
+    for fila in filas:
+        if columnas is None:
+            columnas = list(fila)
+            escritor.writerow(columnas + ['cursor'])
+        escritor.writerow([valor_exportable(fila.get(c)) for c in columnas] + [cursor_de(fila)])
+        if buffer.tell() >= tamano_bloque:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def generar_ndjson(filas, cursor_de, tamano_bloque=TAMANO_BLOQUE):
+    partes, tamano = [], 0
+    for fila in filas:
+        linea = json.dumps({k: valor_exportable(v) for k, v in fila.items()} | {'cursor': cursor_de(fila)},
+                           ensure_ascii=False) + '\n'
+        partes.append(linea)
+        tamano += len(linea)
+        if tamano >= tamano_bloque:
+            yield ''.join(partes)
+            partes, tamano = [], 0
+    if partes:
+        yield ''.join(partes)
+
+
+# formato -> (mimetype, generador)
+FORMATOS = {
+    'csv': ('text/csv; charset=utf-8', generar_csv),
+    'ndjson': ('application/x-ndjson; charset=utf-8', generar_ndjson),
+}
@@ -0,0 +1,155 @@
+"""Extracción de habilidades desde los CVs subidos.
+
+- `extraer_texto(ruta)`: texto plano de un PDF (requiere el paquete opcional
+  `pypdf`) o DOCX (zip + XML, sin dependencias). Los .doc binarios no se
+  leen y devuelven ''.
+- `VocabularioCV`: las habilidades que aparecen en vacantes.requerimientos,
+  por forma normalizada (minúsculas, sin acentos ni puntuación en los
+  bordes). `buscar(texto)` devuelve las que aparecen en el texto, con el
+  texto original del requerimiento, así se guardan escritas como en la
+  vacante (la comparación, en evaluacion.py y en fn_contar_coincidencias,
+  no distingue mayúsculas ni acentos).
+- `LectorCV`: lee el texto en un pool de procesos (el parseo de PDF es CPU
+  y no libera el GIL) o, con `procesos=0`, en el hilo que llama. Los
+  procesos se crean con spawn: un fork desde un worker de Flask con hilos
+  copiaría locks tomados por otros hilos. Un CV que pasa el timeout
+  reinicia el pool (el proceso trabado se mata) y no se cachea.
+
+La cola, el cache por hash (tabla cv_extracciones) y la aplicación de los
+resultados a postulantes están en app.py.
+"""
+import hashlib
+import html
+import multiprocessing
+import re
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as TimeoutFuturo
+from pathlib import Path
+
+from indice_vacantes import plegar
+
+MAX_CARACTERES = 200000
+_BORDES = '.,;:()[]{}"\'¿?¡!*-–•/'
+_RE_HEX64 = re.compile(r'^[0-9a-f]{64}$')
+
+
+class ExtraccionNoDisponible(Exception):
+    """Falta la dependencia opcional para leer el formato (no se cachea)."""
+
+
+class ExtraccionDemorada(Exception):
+    """La lectura pasó el timeout (no se cachea: se reintenta más tarde)."""
+
+
+def texto_pdf(ruta):
+    try:
+        from pypdf import PdfReader
+    except ImportError as e:
+        raise ExtraccionNoDisponible('Para leer CVs en PDF instalar pypdf') from e
+    partes, total = [], 0
+    for pagina in PdfReader(ruta).pages:
+        texto = pagina.extract_text() or ''
+        partes.append(texto)
+        total += len(texto)
+        if total >= MAX_CARACTERES:
+            break
+    return '\n'.join(partes)
+
+
+def texto_docx(ruta):
+    with zipfile.ZipFile(ruta) as docx:
+        xml = docx.read('word/document.xml').decode('utf-8', 'replace')
+    xml = re.sub(r'</w:p>|<w:br/>|<w:tab/>', '\n', xml)
+    return html.unescape(re.sub(r'<[^>]+>', '', xml))
+
+
+EXTRACTORES = {'.pdf': texto_pdf, '.docx': texto_docx}
+
+
+def extraer_texto(ruta):
+    extractor = EXTRACTORES.get(Path(ruta).suffix.lower())
+    if extractor is None:
+        return ''
+    return extractor(ruta)[:MAX_CARACTERES]
+
+
+def hash_de(ruta):
+    """El almacén guarda los CVs como <sha256>.<ext>; los subidos antes del
+    almacén por hash se leen para calcularlo."""
+    ruta = Path(ruta)
+    if _RE_HEX64.match(ruta.stem):
+        return ruta.stem
+    digest = hashlib.sha256()
+    with open(ruta, 'rb') as archivo:
+        for bloque in iter(lambda: archivo.read(64 * 1024), b''):
+            digest.update(bloque)
+    return digest.hexdigest()
+
+
+def tokens(texto):
+    return [t for t in (t.strip(_BORDES) for t in plegar(texto).split()) if t]
+
+
+class VocabularioCV:
+    def __init__(self, habilidades):
+        self._canonicas = {}  # forma normalizada -> texto del requerimiento
+        for habilidad in habilidades:
+            clave = ' '.join(tokens(str(habilidad)))
+            if clave:
+                self._canonicas.setdefault(clave, str(habilidad).strip())
+        self._largos = sorted({clave.count(' ') + 1 for clave in self._canonicas})
+
+    def __len__(self):
+        return len(self._canonicas)
+
+    def buscar(self, texto):
+        palabras = tokens(texto)
+        encontradas = set()
+        # habilidades de varias palabras ('atencion al cliente'): n-gramas
+        # de los largos que existen en el vocabulario
+        for n in self._largos:
+            for i in range(len(palabras) - n + 1):
+                canonica = self._canonicas.get(' '.join(palabras[i:i + n]))
+                if canonica is not None:
+                    encontradas.add(canonica)
+        return sorted(encontradas)
+
+
+class LectorCV:
+    def __init__(self, procesos=2):
+        self._procesos = procesos
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def leer(self, ruta, timeout=120):
+        if not self._procesos:
+            return extraer_texto(ruta)
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self._procesos,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+            pool = self._pool
+        try:
+            return pool.submit(extraer_texto, str(ruta)).result(timeout)
+        except TimeoutFuturo as e:
+            self._reiniciar(pool)
+            raise ExtraccionDemorada(f'La lectura de {Path(ruta).name} superó {timeout} s') from e
+
+    def _reiniciar(self, pool):
+        """Descarta el pool con el proceso trabado; la próxima lectura crea otro."""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        if hasattr(pool, 'kill_workers'):  # Python 3.14+
+            pool.kill_workers()
+        else:
+            for proceso in list((pool._processes or {}).values()):
+                proceso.kill()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def detener(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
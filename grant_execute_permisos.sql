@@ -9,16 +9,22 @@ GRANT EXECUTE ON PROCEDURE sp_recalcular_score TO rol_admin;
 GRANT EXECUTE ON PROCEDURE sp_report_vacantes_por_mes TO rol_admin;
 GRANT EXECUTE ON PROCEDURE sp_report_postulantes_por_vacante TO rol_admin;
 GRANT EXECUTE ON PROCEDURE sp_report_promedio_score_por_departamento TO rol_admin;
+GRANT EXECUTE ON PROCEDURE sp_reconstruir_reportes TO rol_admin;
 GRANT EXECUTE ON PROCEDURE sp_create_departamento TO rol_admin;
 GRANT EXECUTE ON PROCEDURE sp_update_departamento TO rol_admin;
 GRANT EXECUTE ON PROCEDURE sp_listar_usuarios TO rol_admin;
 GRANT EXECUTE ON PROCEDURE sp_crear_postulacion TO rol_admin;
+GRANT EXECUTE ON PROCEDURE sp_registrar_postulacion TO rol_admin;
 GRANT EXECUTE ON PROCEDURE sp_generar_ranking TO rol_admin;
+GRANT EXECUTE ON PROCEDURE sp_ranking_fila TO rol_admin;
 GRANT EXECUTE ON PROCEDURE sp_cerrar_vacante TO rol_admin;
 GRANT EXECUTE ON PROCEDURE sp_listar_logs TO rol_admin;
+GRANT EXECUTE ON PROCEDURE sp_buscar_logs TO rol_admin;
+GRANT EXECUTE ON PROCEDURE sp_archivar_logs TO rol_admin;
 GRANT EXECUTE ON PROCEDURE sp_log_auditoria TO rol_admin;
 GRANT EXECUTE ON PROCEDURE sp_crear_usuario TO rol_admin;
 GRANT EXECUTE ON PROCEDURE sp_listar_vacantes TO rol_admin;
+GRANT EXECUTE ON PROCEDURE sp_listar_vacantes_pagina TO rol_admin;
 GRANT EXECUTE ON PROCEDURE sp_vacante_detalle TO rol_admin;
 GRANT EXECUTE ON PROCEDURE sp_listar_postulantes_por_vacante TO rol_admin;
 GRANT EXECUTE ON PROCEDURE sp_crear_usuario_ex TO rol_admin;
@@ -33,6 +39,13 @@ GRANT EXECUTE ON PROCEDURE sp_get_postulante TO rol_admin;
 -- Otorgar EXECUTE en FUNCTIONS también
 GRANT EXECUTE ON FUNCTION fn_calcular_score TO rol_admin;
 GRANT EXECUTE ON FUNCTION fn_validar_postulante TO rol_admin;
+GRANT EXECUTE ON FUNCTION fn_habilidades_efectivas TO rol_admin;
+GRANT EXECUTE ON FUNCTION fn_normalizar_habilidad TO rol_admin;
+GRANT EXECUTE ON FUNCTION fn_habilidad_en_lista TO rol_admin;
+GRANT EXECUTE ON FUNCTION fn_contar_coincidencias TO rol_admin;
+
+-- En las réplicas de lectura (DB_REPLICAS): la app revisa el retraso con SHOW REPLICA STATUS
+-- GRANT REPLICATION CLIENT ON *.* TO 'admin_rrhh'@'%';
 
 -- Aplicar los cambios
 FLUSH PRIVILEGES;
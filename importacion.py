@@ -0,0 +1,365 @@
+"""Importación masiva de postulantes y postulaciones.
+
+Entrada: arreglo JSON, JSONL (un objeto por línea) o CSV con encabezado,
+leídos de un flujo binario; JSONL y CSV se procesan a medida que llegan.
+Los registros se validan y escriben por bloques de `tamano_bloque`: por
+bloque hay una consulta IN por cada verificación (emails y usuarios ya
+registrados, postulantes y vacantes existentes, postulaciones previas) en
+lugar de fn_validar_postulante fila por fila, un INSERT multi-fila por tabla
+y un commit. Los registros que no pasan la validación se informan con su
+número de fila (1 = primer registro) y no detienen la importación. Si el
+bloque falla en la BD, se vuelve a escribir de a un registro para informar
+el error de cada fila y no perder los demás.
+
+Postulantes: nombre, email, anos_experiencia, habilidades (lista JSON o
+texto separado por comas) y opcionalmente username + password para crear el
+usuario con rol postulante, como register() (sp_crear_usuario_ex, uno por
+usuario).
+Postulaciones: vacante_id y postulante_id o postulante_email.
+"""
+import csv
+import io
+import json
+import re
+import time
+
+TAMANO_BLOQUE = 1000
+MAX_ERRORES = 1000
+
+SQL_EMAILS_POSTULANTES = 'SELECT id, email FROM postulantes WHERE email IN ({})'
+SQL_EMAILS_USUARIOS = 'SELECT email FROM usuarios WHERE email IN ({})'
+SQL_USERNAMES = 'SELECT username FROM usuarios WHERE username IN ({})'
+SQL_POSTULANTES_IDS = 'SELECT id FROM postulantes WHERE id IN ({})'
+SQL_VACANTES_ACTIVAS = 'SELECT id FROM vacantes WHERE activo = 1 AND id IN ({})'
+# usa el prefijo de ux_postulante_vacante
+SQL_POSTULACIONES_DE = 'SELECT postulante_id, vacante_id, id FROM postulaciones WHERE postulante_id IN ({})'
+SQL_USUARIO_ID = 'SELECT id FROM usuarios WHERE username = %s'
+
+# solo marcadores %s en VALUES: PyMySQL los envía como un INSERT multi-fila
+SQL_INSERTAR_POSTULANTES = (
+    'INSERT INTO postulantes (nombre, email, anos_experiencia, habilidades) VALUES (%s, %s, %s, %s)'
+)
+SQL_INSERTAR_POSTULACIONES = (
+    'INSERT INTO postulaciones (postulante_id, vacante_id, usuario_creo, usuario_id) VALUES (%s, %s, %s, %s)'
+)
+# los usuarios se crean como en register(): el hash y la auditoría quedan en el procedimiento
+SQL_CREAR_USUARIO = 'CALL sp_crear_usuario_ex(%s, %s, %s, %s, %s)'
+
+_RE_EMAIL = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+
+class RegistroInvalido(ValueError):
+    pass
+
+
+def leer_registros(flujo, formato):
+    """Genera (fila, registro, error) desde un flujo binario; `error` es un
+    texto cuando el registro no se pudo leer."""
+    texto = io.TextIOWrapper(flujo, encoding='utf-8-sig', newline='')
+    if formato == 'json':
+        try:
+            datos = json.load(texto)
+        except ValueError as e:
+            raise RegistroInvalido(f'JSON inválido: {e}') from e
+        if not isinstance(datos, list):
+            raise RegistroInvalido('Se esperaba un arreglo JSON de objetos')
+        for fila, registro in enumerate(datos, 1):
+            if isinstance(registro, dict):
+                yield fila, registro, None
+            else:
+                yield fila, None, 'se esperaba un objeto'
+    elif formato == 'jsonl':
+        fila = 0
+        for linea in texto:
+            if not linea.strip():
+                continue
+            fila += 1
+            try:
+                registro = json.loads(linea)
+            except ValueError as e:
+                yield fila, None, f'JSON inválido: {e}'
+                continue
+            if isinstance(registro, dict):
+                yield fila, registro, None
+            else:
+                yield fila, None, 'se esperaba un objeto'
+    elif formato == 'csv':
+        for fila, registro in enumerate(csv.DictReader(texto), 1):
+            yield fila, registro, None
+    else:
+        raise RegistroInvalido(f'Formato no soportado: {formato}')
+
+
+def _texto(registro, campo, requerido=False, largo=None):
+    valor = registro.get(campo)
+    valor = '' if valor is None else str(valor).strip()
+    if requerido and not valor:
+        raise RegistroInvalido(f'{campo} requerido')
+    if largo and len(valor) > largo:
+        raise RegistroInvalido(f'{campo} supera {largo} caracteres')
+    return valor or None
+
+
+def _entero(registro, campo, requerido=False, minimo=None):
+    valor = registro.get(campo)
+    if valor is None or str(valor).strip() == '':
+        if requerido:
+            raise RegistroInvalido(f'{campo} requerido')
+        return None
+    try:
+        numero = int(str(valor).strip())
+    except ValueError:
+        raise RegistroInvalido(f'{campo} debe ser un entero') from None
+    if minimo is not None and numero < minimo:
+        raise RegistroInvalido(f'{campo} debe ser >= {minimo}')
+    return numero
+
+
+def _habilidades(valor):
+    if valor is None or valor == '':
+        return []
+    if isinstance(valor, str):
+        texto = valor.strip()
+        if texto.startswith('['):
+            try:
+                valor = json.loads(texto)
+            except ValueError:
+                raise RegistroInvalido('habilidades no es una lista JSON válida') from None
+        else:
+            return [h.strip() for h in re.split(r'[,;]', texto) if h.strip()]
+    if not isinstance(valor, list):
+        raise RegistroInvalido('habilidades debe ser una lista')
+    return [str(h).strip() for h in valor if str(h).strip()]
+
+
+def validar_postulante(registro):
+    email = _texto(registro, 'email', True, 200)
+    if not _RE_EMAIL.match(email):
+        raise RegistroInvalido('email inválido')
+    username = _texto(registro, 'username', largo=100)
+    password = _texto(registro, 'password')
+    if bool(username) != bool(password):
+        raise RegistroInvalido('username y password van juntos')
+    return {
+        'nombre': _texto(registro, 'nombre', True, 150),
+        'email': email,
+        'anos_experiencia': _entero(registro, 'anos_experiencia', minimo=0) or 0,
+        'habilidades': _habilidades(registro.get('habilidades')),
+        'username': username,
+        'password': password,
+    }
+
+
+def validar_postulacion(registro):
+    postulante_id = _entero(registro, 'postulante_id', minimo=1)
+    email = None if postulante_id else _texto(registro, 'postulante_email', largo=200)
+    if not postulante_id and not email:
+        raise RegistroInvalido('postulante_id o postulante_email requerido')
+    return {
+        'postulante_id': postulante_id,
+        'postulante_email': email,
+        'vacante_id': _entero(registro, 'vacante_id', True, 1),
+    }
+
+
+def _marcas(valores):
+    return ', '.join(['%s'] * len(valores))
+
+
+class ResultadoImportacion:
+    def __init__(self, max_errores=MAX_ERRORES):
+        self.inicio = time.perf_counter()
+        self.filas = 0
+        self.insertadas = 0
+        self.fallidas = 0
+        self.errores = []
+        self._max_errores = max_errores
+
+    def fallo(self, fila, error):
+        self.fallidas += 1
+        if self._max_errores is None or len(self.errores) < self._max_errores:
+            self.errores.append({'fila': fila, 'error': error})
+
+    def resumen(self):
+        duracion = time.perf_counter() - self.inicio
+        return {
+            'filas': self.filas,
+            'insertadas': self.insertadas,
+            'fallidas': self.fallidas,
+            'errores': sorted(self.errores, key=lambda e: e['fila']),
+            'errores_omitidos': self.fallidas - len(self.errores),
+            'segundos': round(duracion, 3),
+            'filas_por_segundo': round(self.filas / duracion) if duracion > 0 else None,
+        }
+
+
+class ImportadorMasivo:
+    def __init__(self, engine, tamano_bloque=TAMANO_BLOQUE, auditoria=None, al_insertar=None,
+                 max_errores=MAX_ERRORES):
+        """`al_insertar(tipo, filas)` recibe, después de cada commit, las filas
+        insertadas del bloque (dicts con su id) para actualizar índices,
+        caches y rankings de la app. `max_errores=None` guarda todos los
+        errores en el resultado."""
+        self.engine = engine
+        self.tamano_bloque = tamano_bloque
+        self.max_errores = max_errores
+        self.auditoria = auditoria
+        self.al_insertar = al_insertar
+
+    def importar_postulantes(self, registros, usuario=None):
+        return self._importar('postulantes', registros, validar_postulante, self._bloque_postulantes, usuario)
+
+    def importar_postulaciones(self, registros, usuario=None):
+        return self._importar('postulaciones', registros, validar_postulacion, self._bloque_postulaciones, usuario)
+
+    def _importar(self, tipo, registros, validar, procesar, usuario):
+        resultado = ResultadoImportacion(self.max_errores)
+        conn = self.engine.raw_connection()
+        try:
+            contexto = {'usuario': usuario, 'usuario_id': self._usuario_id(conn, usuario)}
+            bloque = []
+            for fila, registro, error in registros:
+                resultado.filas += 1
+                if error is None:
+                    try:
+                        bloque.append((fila, validar(registro)))
+                    except RegistroInvalido as e:
+                        error = str(e)
+                if error is not None:
+                    resultado.fallo(fila, error)
+                if len(bloque) >= self.tamano_bloque:
+                    self._escribir_bloque(conn, tipo, bloque, procesar, contexto, resultado)
+                    bloque = []
+            if bloque:
+                self._escribir_bloque(conn, tipo, bloque, procesar, contexto, resultado)
+        finally:
+            conn.close()
+        return resultado
+
+    def _escribir_bloque(self, conn, tipo, bloque, procesar, contexto, resultado):
+        errores = []
+        try:
+            insertadas = procesar(conn, bloque, contexto, errores)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            # un registro rechazado por la BD (p. ej. otro proceso insertó el
+            # mismo email después de la verificación) hace fallar el bloque
+            # entero: se escribe de a uno, validando otra vez cada registro
+            insertadas, errores = [], []
+            for fila, registro in bloque:
+                try:
+                    insertadas += procesar(conn, [(fila, registro)], contexto, errores)
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    errores.append((fila, f'no insertado: {e}'))
+        for fila, error in errores:
+            resultado.fallo(fila, error)
+        if not insertadas:
+            return
+        resultado.insertadas += len(insertadas)
+        if self.auditoria is not None:
+            self.auditoria.registrar(contexto['usuario'], 'APP', tipo, None,
+                                     f'importación masiva: {len(insertadas)} filas')
+        if self.al_insertar is not None:
+            self.al_insertar(tipo, insertadas)
+
+    def _usuario_id(self, conn, usuario):
+        if not usuario:
+            return None
+        filas = self._consultar(conn, SQL_USUARIO_ID, (usuario,))
+        return filas[0][0] if filas else None
+
+    def _consultar(self, conn, sql, params):
+        cur = conn.cursor()
+        try:
+            cur.execute(sql, params)
+            return cur.fetchall()
+        finally:
+            cur.close()
+
+    def _existentes(self, conn, sql, valores):
+        valores = list(valores)
+        if not valores:
+            return []
+        return self._consultar(conn, sql.format(_marcas(valores)), valores)
+
+    def _bloque_postulantes(self, conn, bloque, contexto, errores):
+        # emails y usernames se comparan sin mayúsculas, como la collation de MySQL
+        emails = {e.casefold() for _, e in self._existentes(conn, SQL_EMAILS_POSTULANTES,
+                                                                {r['email'] for _, r in bloque})}
+        con_usuario = [r for _, r in bloque if r['username']]
+        emails_usuarios = {e.casefold() for (e,) in self._existentes(conn, SQL_EMAILS_USUARIOS,
+                                                                     {r['email'] for r in con_usuario})}
+        usernames = {u.casefold() for (u,) in self._existentes(conn, SQL_USERNAMES,
+                                                               {r['username'] for r in con_usuario})}
+        validos = []
+        for fila, r in bloque:
+            email = r['email'].casefold()
+            username = r['username'].casefold() if r['username'] else None
+            if email in emails:
+                errores.append((fila, 'email ya registrado'))
+            elif username and email in emails_usuarios:
+                errores.append((fila, 'email ya registrado como usuario'))
+            elif username and username in usernames:
+                errores.append((fila, 'username ya registrado'))
+            else:
+                emails.add(email)
+                if username:
+                    emails_usuarios.add(email)
+                    usernames.add(username)
+                validos.append(r)
+        if not validos:
+            return []
+        cur = conn.cursor()
+        try:
+            cur.executemany(SQL_INSERTAR_POSTULANTES, [
+                (r['nombre'], r['email'], r['anos_experiencia'], json.dumps(r['habilidades'], ensure_ascii=False))
+                for r in validos])
+            for r in validos:
+                if r['username']:
+                    cur.execute(SQL_CREAR_USUARIO, (r['username'], r['password'], r['nombre'], r['email'],
+                                                    'postulante'))
+        finally:
+            cur.close()
+        # con innodb_autoinc_lock_mode=2 los ids de un INSERT multi-fila no
+        # son necesariamente consecutivos: se leen por email
+        ids = {e.casefold(): i for i, e in self._existentes(conn, SQL_EMAILS_POSTULANTES,
+                                                            {r['email'] for r in validos})}
+        return [{'id': ids.get(r['email'].casefold()), 'nombre': r['nombre'], 'email': r['email'],
+                 'anos_experiencia': r['anos_experiencia'], 'habilidades': r['habilidades']}
+                for r in validos]
+
+    def _bloque_postulaciones(self, conn, bloque, contexto, errores):
+        por_email = {e.casefold(): i for i, e in self._existentes(
+            conn, SQL_EMAILS_POSTULANTES, {r['postulante_email'] for _, r in bloque if r['postulante_email']})}
+        for _, r in bloque:
+            if r['postulante_email']:
+                r['postulante_id'] = por_email.get(r['postulante_email'].casefold())
+        postulante_ids = {r['postulante_id'] for _, r in bloque if r['postulante_id']}
+        postulantes = {i for (i,) in self._existentes(conn, SQL_POSTULANTES_IDS, postulante_ids)}
+        vacantes = {i for (i,) in self._existentes(conn, SQL_VACANTES_ACTIVAS, {r['vacante_id'] for _, r in bloque})}
+        pares = {(p, v) for p, v, _ in self._existentes(conn, SQL_POSTULACIONES_DE, postulantes)}
+        validos = []
+        for fila, r in bloque:
+            par = (r['postulante_id'], r['vacante_id'])
+            if par[0] not in postulantes:
+                errores.append((fila, 'postulante no existe'))
+            elif par[1] not in vacantes:
+                errores.append((fila, 'vacante no existe o no está activa'))
+            elif par in pares:
+                errores.append((fila, 'el postulante ya postuló a esta vacante'))
+            else:
+                pares.add(par)
+                validos.append(par)
+        if not validos:
+            return []
+        cur = conn.cursor()
+        try:
+            cur.executemany(SQL_INSERTAR_POSTULACIONES,
+                            [(p, v, contexto['usuario'], contexto['usuario_id']) for p, v in validos])
+        finally:
+            cur.close()
+        ids = {(p, v): i for p, v, i in self._existentes(conn, SQL_POSTULACIONES_DE, {p for p, _ in validos})}
+        return [{'id': ids.get(par), 'postulante_id': par[0], 'vacante_id': par[1]} for par in validos]
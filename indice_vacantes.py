@@ -0,0 +1,180 @@
+"""Índice invertido en memoria para la búsqueda de vacantes.
+
+Tokeniza titulo y descripcion plegando mayúsculas y acentos ("Gestión" y
+"gestion" son el mismo término), pondera por TF-IDF y admite prefijos
+("desarro" encuentra "desarrollador"). Se reconstruye completo desde la BD
+y se mantiene incrementalmente cuando la app crea, edita o cierra vacantes.
+"""
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+
+_RE_TOKEN = re.compile(r'\w+')
+
+# palabras vacías frecuentes en las descripciones (ya plegadas)
+STOPWORDS = {
+    'a', 'al', 'con', 'de', 'del', 'el', 'en', 'es', 'la', 'las', 'lo', 'los',
+    'o', 'para', 'por', 'que', 'se', 'sin', 'su', 'sus', 'un', 'una', 'y',
+}
+
+PESO_TITULO = 3.0
+PESO_DESCRIPCION = 1.0
+LARGO_RESUMEN = 300
+# tope de términos a los que se expande un prefijo
+MAX_EXPANSION_PREFIJO = 64
+
+
+def plegar(texto):
+    """Minúsculas y sin diacríticos: 'Educación' -> 'educacion'."""
+    texto = unicodedata.normalize('NFKD', (texto or '').casefold())
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+
+def tokenizar(texto):
+    return [t for t in _RE_TOKEN.findall(plegar(texto)) if t not in STOPWORDS]
+
+
+def resumen_vacante(vacante):
+    """Fila del listado: misma forma que sp_listar_vacantes_pagina."""
+    descripcion = vacante.get('descripcion') or ''
+    return {
+        'id': vacante['id'],
+        'titulo': vacante.get('titulo'),
+        'descripcion': descripcion[:LARGO_RESUMEN],
+        'departamento_id': vacante.get('departamento_id'),
+        'estado': vacante.get('estado'),
+        'activo': vacante.get('activo', 1),
+        'creado_en': vacante.get('creado_en'),
+    }
+
+
+class IndiceVacantes:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = {}      # termino -> {vacante_id: peso}
+        self._terminos_doc = {}  # vacante_id -> set(terminos)
+        self._docs = {}          # vacante_id -> resumen
+        self._vocabulario = []   # términos ordenados, para prefijos con bisect
+        self.construido = False
+
+    def __len__(self):
+        return len(self._docs)
+
+    def reconstruir(self, vacantes):
+        with self._lock:
+            self._postings = {}
+            self._terminos_doc = {}
+            self._docs = {}
+            for v in vacantes:
+                self._indexar(v)
+            self._vocabulario = sorted(self._postings)
+            self.construido = True
+
+    def actualizar(self, vacante):
+        """Alta o modificación; una vacante inactiva se quita del índice."""
+        with self._lock:
+            self._quitar(vacante['id'])
+            if vacante.get('activo', 1):
+                nuevos = self._indexar(vacante)
+                for termino in nuevos:
+                    i = bisect_left(self._vocabulario, termino)
+                    if i == len(self._vocabulario) or self._vocabulario[i] != termino:
+                        self._vocabulario.insert(i, termino)
+
+    def eliminar(self, vacante_id):
+        with self._lock:
+            self._quitar(vacante_id)
+
+    def buscar(self, consulta, departamento_id=None, limite=20, offset=0):
+        """Devuelve (filas, total). Todos los términos deben coincidir
+        (exacto o por prefijo); el orden es por relevancia TF-IDF."""
+        terminos = tokenizar(consulta)
+        if not terminos:
+            return [], 0
+        with self._lock:
+            n_docs = len(self._docs) or 1
+            # por cada término: [(posting, factor)] de sus expansiones
+            grupos = []
+            for termino in dict.fromkeys(terminos):
+                grupo = []
+                for candidato in self._expandir(termino):
+                    posting = self._postings[candidato]
+                    idf = math.log(1 + n_docs / len(posting))
+                    # coincidencia exacta pesa más que una por prefijo
+                    grupo.append((posting, idf if candidato == termino else idf * 0.5))
+                if not grupo:
+                    return [], 0
+                grupos.append(grupo)
+            # el término más selectivo fija los candidatos; el resto solo se consulta
+            grupos.sort(key=lambda g: sum(len(p) for p, _ in g))
+            puntajes = {}
+            for posting, factor in grupos[0]:
+                for vacante_id, peso in posting.items():
+                    if puntajes.get(vacante_id, 0.0) < peso * factor:
+                        puntajes[vacante_id] = peso * factor
+            if departamento_id is not None:
+                puntajes = {vid: p for vid, p in puntajes.items()
+                            if self._docs[vid].get('departamento_id') == departamento_id}
+            for grupo in grupos[1:]:
+                siguientes = {}
+                for vacante_id, acumulado in puntajes.items():
+                    mejor = 0.0
+                    for posting, factor in grupo:
+                        peso = posting.get(vacante_id)
+                        if peso is not None and peso * factor > mejor:
+                            mejor = peso * factor
+                    if mejor:
+                        siguientes[vacante_id] = acumulado + mejor
+                puntajes = siguientes
+            total = len(puntajes)
+            ids = heapq.nsmallest(offset + limite, puntajes, key=lambda vid: (-puntajes[vid], -vid))
+            return [dict(self._docs[vid]) for vid in ids[offset:]], total
+
+    def _expandir(self, termino):
+        if termino in self._postings:
+            yield termino
+        i = bisect_left(self._vocabulario, termino)
+        encontrados = 0
+        while i < len(self._vocabulario) and encontrados < MAX_EXPANSION_PREFIJO:
+            candidato = self._vocabulario[i]
+            if not candidato.startswith(termino):
+                break
+            if candidato != termino:
+                encontrados += 1
+                yield candidato
+            i += 1
+
+    def _indexar(self, vacante):
+        vacante_id = vacante['id']
+        pesos = {}
+        for termino in tokenizar(vacante.get('titulo')):
+            pesos[termino] = pesos.get(termino, 0.0) + PESO_TITULO
+        for termino in tokenizar(vacante.get('descripcion')):
+            pesos[termino] = pesos.get(termino, 0.0) + PESO_DESCRIPCION
+        nuevos = []
+        for termino, peso in pesos.items():
+            posting = self._postings.get(termino)
+            if posting is None:
+                posting = self._postings[termino] = {}
+                nuevos.append(termino)
+            # tf amortiguado para que una descripción larga no domine
+            posting[vacante_id] = 1 + math.log(peso)
+        self._terminos_doc[vacante_id] = set(pesos)
+        self._docs[vacante_id] = resumen_vacante(vacante)
+        return nuevos
+
+    def _quitar(self, vacante_id):
+        for termino in self._terminos_doc.pop(vacante_id, ()):
+            posting = self._postings.get(termino)
+            if posting is None:
+                continue
+            posting.pop(vacante_id, None)
+            if not posting:
+                del self._postings[termino]
+                i = bisect_left(self._vocabulario, termino)
+                if i < len(self._vocabulario) and self._vocabulario[i] == termino:
+                    del self._vocabulario[i]
+        self._docs.pop(vacante_id, None)
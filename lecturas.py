@@ -0,0 +1,107 @@
+"""Lecturas que comparten la app Flask (app.py) y la API asíncrona
+(api_async.py): parámetros y paginación de cada listado y decodificación de
+las columnas JSON. Los procedimientos y consultas son los mismos en las dos
+(setup_reclutamiento.sql y consultas.py); aquí está cómo se piden y cómo se
+arma la página, para que ambas devuelvan exactamente lo mismo.
+"""
+import base64
+import json
+from datetime import datetime
+
+VACANTES_POR_PAGINA = 20
+VACANTES_POR_PAGINA_MAX = 100
+RANKING_POR_PAGINA = 50
+RANKING_POR_PAGINA_MAX = 500
+
+LISTAR_VACANTES = 'sp_listar_vacantes_pagina'
+VACANTE_DETALLE = 'sp_vacante_detalle'
+GENERAR_RANKING = 'sp_generar_ranking'
+# todas las vacantes activas, para el índice de búsqueda
+VACANTES_INDICE = 'sp_listar_vacantes'
+
+# Procedimientos de los reportes, por el nombre de /api/report/<nombre> y
+# /exportar/reporte/<nombre>
+REPORTES = {
+    'vacantes_mes': 'sp_report_vacantes_por_mes',
+    'postulantes_vacante': 'sp_report_postulantes_por_vacante',
+    'promedio_departamento': 'sp_report_promedio_score_por_departamento',
+}
+
+
+def codificar_cursor(*partes):
+    crudo = '|'.join(p.isoformat() if isinstance(p, datetime) else str(p) for p in partes)
+    return base64.urlsafe_b64encode(crudo.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """Devuelve la lista de partes (str) o None si el cursor falta o es inválido."""
+    if not cursor:
+        return None
+    try:
+        return base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode().split('|')
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def leer_limite(valor, defecto, maximo):
+    try:
+        limite = int(valor) if valor else defecto
+    except (TypeError, ValueError):
+        limite = defecto
+    return max(1, min(limite, maximo))
+
+
+def leer_offset(valor):
+    try:
+        return max(0, int(valor or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def decodificar_json(filas, *columnas):
+    """Decodifica en el lugar las columnas JSON que PyMySQL devuelve como
+    texto. Se hace una vez al leer, antes de guardar las filas en la cache o
+    en el ranking en memoria, y no en cada uso desde las plantillas."""
+    for fila in filas:
+        for columna in columnas:
+            valor = fila.get(columna)
+            if isinstance(valor, (str, bytes)):
+                try:
+                    fila[columna] = json.loads(valor)
+                except ValueError:
+                    pass
+    return filas
+
+
+def parametros_vacantes(departamento_id, cursor, limite):
+    """Parámetros de sp_listar_vacantes_pagina; se pide una fila extra para
+    saber si hay página siguiente (ver pagina_vacantes)."""
+    partes = decodificar_cursor(cursor)
+    try:
+        cursor_fecha, cursor_id = datetime.fromisoformat(partes[0]), int(partes[1])
+    except (TypeError, ValueError, IndexError):
+        cursor_fecha, cursor_id = None, None
+    return departamento_id, cursor_fecha, cursor_id, limite + 1
+
+
+def pagina_vacantes(rows, limite):
+    """(filas, siguiente) a partir de las limite + 1 filas pedidas."""
+    siguiente = None
+    if len(rows) > limite:
+        rows = rows[:limite]
+        ultimo = rows[-1]
+        siguiente = codificar_cursor(ultimo['creado_en'], ultimo['id'])
+    return rows, siguiente
+
+
+def offset_busqueda(cursor):
+    """La búsqueda por texto pagina por posición en el resultado del índice."""
+    partes = decodificar_cursor(cursor)
+    try:
+        return max(0, int(partes[0]))
+    except (TypeError, ValueError, IndexError):
+        return 0
+
+
+def siguiente_busqueda(offset, limite, total):
+    return codificar_cursor(offset + limite) if offset + limite < total else None
@@ -0,0 +1,144 @@
+"""Métricas de la app en memoria y exportación en formato Prometheus.
+
+Por cada procedimiento o consulta con nombre se guardan llamadas, errores,
+filas devueltas y un histograma de latencia; por cada endpoint, requests
+por código de estado y latencia. Las llamadas que superan `umbral_lento`
+se registran en el logger 'reclutamiento.lento'. El costo por observación
+es un perf_counter, un bisect y unas sumas bajo un lock.
+"""
+import logging
+import threading
+from bisect import bisect_left
+
+log_lento = logging.getLogger('reclutamiento.lento')
+
+# límites superiores de los buckets, en segundos
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histograma:
+    __slots__ = ('conteos', 'suma', 'total')
+
+    def __init__(self):
+        self.conteos = [0] * (len(BUCKETS) + 1)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, segundos):
+        self.conteos[bisect_left(BUCKETS, segundos)] += 1
+        self.suma += segundos
+        self.total += 1
+
+    def lineas(self, nombre, etiquetas):
+        acumulado = 0
+        for limite, conteo in zip(BUCKETS + (float('inf'),), self.conteos):
+            acumulado += conteo
+            le = '+Inf' if limite == float('inf') else repr(limite)
+            yield f'{nombre}_bucket{{{etiquetas},le="{le}"}} {acumulado}'
+        yield f'{nombre}_sum{{{etiquetas}}} {self.suma:.6f}'
+        yield f'{nombre}_count{{{etiquetas}}} {self.total}'
+
+
+class _EstadisticaDB:
+    __slots__ = ('histograma', 'errores', 'filas')
+
+    def __init__(self):
+        self.histograma = Histograma()
+        self.errores = 0
+        self.filas = 0
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class RegistroMetricas:
+    def __init__(self, umbral_lento=0.2):
+        self.umbral_lento = umbral_lento
+        self._lock = threading.Lock()
+        self._db = {}        # (tipo, nombre) -> _EstadisticaDB
+        self._http = {}      # endpoint -> Histograma
+        self._estados = {}   # (endpoint, estado) -> conteo
+        self._medidores = []  # (nombre, ayuda, funcion)
+        self._contadores = []  # (nombre, ayuda, funcion)
+
+    def observar_db(self, tipo, nombre, segundos, filas=0, error=False, detalle=None):
+        with self._lock:
+            est = self._db.get((tipo, nombre))
+            if est is None:
+                est = self._db[(tipo, nombre)] = _EstadisticaDB()
+            est.histograma.observar(segundos)
+            est.filas += filas
+            if error:
+                est.errores += 1
+        if segundos >= self.umbral_lento:
+            log_lento.warning('%s %s tardó %.1f ms (%d filas)%s', tipo, nombre, segundos * 1000, filas,
+                              f' {detalle}' if detalle else '')
+
+    def observar_http(self, endpoint, estado, segundos):
+        with self._lock:
+            hist = self._http.get(endpoint)
+            if hist is None:
+                hist = self._http[endpoint] = Histograma()
+            hist.observar(segundos)
+            clave = (endpoint, estado)
+            self._estados[clave] = self._estados.get(clave, 0) + 1
+
+    def registrar_medidor(self, nombre, ayuda, funcion):
+        """Valor instantáneo leído al exportar (p. ej. profundidad de una cola).
+        `funcion` devuelve un número o un dict {etiqueta: número}."""
+        self._medidores.append((nombre, ayuda, funcion))
+
+    def registrar_contador(self, nombre, ayuda, funcion):
+        self._contadores.append((nombre, ayuda, funcion))
+
+    def resumen_db(self):
+        with self._lock:
+            return {
+                f'{tipo}:{nombre}': {
+                    'llamadas': est.histograma.total,
+                    'errores': est.errores,
+                    'filas': est.filas,
+                    'segundos': round(est.histograma.suma, 6),
+                }
+                for (tipo, nombre), est in self._db.items()
+            }
+
+    def exportar(self):
+        """Texto en formato de exposición de Prometheus 0.0.4."""
+        lineas = []
+        with self._lock:
+            db = [(k, est) for k, est in self._db.items()]
+            lineas += ['# HELP reclutamiento_db_duracion_segundos Latencia de procedimientos y consultas.',
+                       '# TYPE reclutamiento_db_duracion_segundos histogram']
+            for (tipo, nombre), est in db:
+                lineas += est.histograma.lineas('reclutamiento_db_duracion_segundos',
+                                                f'tipo="{tipo}",nombre="{_escapar(nombre)}"')
+            lineas += ['# HELP reclutamiento_db_filas_total Filas devueltas.',
+                       '# TYPE reclutamiento_db_filas_total counter']
+            lineas += [f'reclutamiento_db_filas_total{{tipo="{t}",nombre="{_escapar(n)}"}} {est.filas}'
+                       for (t, n), est in db]
+            lineas += ['# HELP reclutamiento_db_errores_total Llamadas que terminaron en error.',
+                       '# TYPE reclutamiento_db_errores_total counter']
+            lineas += [f'reclutamiento_db_errores_total{{tipo="{t}",nombre="{_escapar(n)}"}} {est.errores}'
+                       for (t, n), est in db]
+            lineas += ['# HELP reclutamiento_http_duracion_segundos Latencia por endpoint.',
+                       '# TYPE reclutamiento_http_duracion_segundos histogram']
+            for endpoint, hist in self._http.items():
+                lineas += hist.lineas('reclutamiento_http_duracion_segundos', f'endpoint="{_escapar(endpoint)}"')
+            lineas += ['# HELP reclutamiento_http_requests_total Requests por endpoint y código.',
+                       '# TYPE reclutamiento_http_requests_total counter']
+            lineas += [f'reclutamiento_http_requests_total{{endpoint="{_escapar(e)}",estado="{c}"}} {n}'
+                       for (e, c), n in self._estados.items()]
+        for tipo, registrados in (('gauge', self._medidores), ('counter', self._contadores)):
+            for nombre, ayuda, funcion in registrados:
+                try:
+                    valor = funcion()
+                except Exception:
+                    continue
+                lineas += [f'# HELP {nombre} {ayuda}', f'# TYPE {nombre} {tipo}']
+                if isinstance(valor, dict):
+                    lineas += [f'{nombre}{{{etiqueta}}} {v}' for etiqueta, v in valor.items()]
+                else:
+                    lineas.append(f'{nombre} {valor}')
+        return '\n'.join(lineas) + '\n'
@@ -0,0 +1,40 @@
+-- 0001: índices para las consultas frecuentes sobre postulaciones y línea de
+-- tiempo sin CAST sobre logs_auditoria.fila_id.
+-- Revisar con: flask verificar-planes
+
+-- postulaciones_recientes (dashboard admin): ORDER BY fecha_postulacion DESC LIMIT 10
+CREATE INDEX ix_postulaciones_fecha ON postulaciones (fecha_postulacion, id);
+
+-- postulaciones_postulante (/mi-perfil, /postulante/<id>): WHERE postulante_id ORDER BY fecha_postulacion
+CREATE INDEX ix_postulaciones_postulante_fecha ON postulaciones (postulante_id, fecha_postulacion);
+
+-- sp_listar_postulantes_por_vacante: WHERE vacante_id ORDER BY fecha_postulacion;
+-- también lo usan sp_generar_ranking y exportar_ranking para filtrar la vacante
+CREATE INDEX ix_postulaciones_vacante_fecha ON postulaciones (vacante_id, fecha_postulacion);
+
+-- sp_postulacion_timeline: fila_id se compara con una variable VARCHAR, que
+-- tiene la collation de la base (la de la columna), en lugar de
+-- CAST(p_postulacion_id AS CHAR), que toma la de la conexión con la que se
+-- creó el procedimiento; así se usan ix_logs_tabla_fila_fecha e
+-- ix_logs_hist_tabla_fila_fecha
+DROP PROCEDURE IF EXISTS sp_postulacion_timeline;
+DELIMITER $$
+CREATE PROCEDURE sp_postulacion_timeline(IN p_postulacion_id INT)
+BEGIN
+  DECLARE v_fila VARCHAR(200) DEFAULT p_postulacion_id;
+  SELECT 'recibida' AS estado, fecha_postulacion AS fecha, usuario_creo AS usuario FROM postulaciones WHERE id = p_postulacion_id
+  UNION ALL
+  SELECT 'evaluacion', actualizado_en, NULL FROM evaluacion_ia WHERE postulacion_id = p_postulacion_id
+  UNION ALL
+  SELECT accion AS estado, fecha, usuario_mysql FROM logs_auditoria WHERE tabla_afectada='postulaciones' AND fila_id = v_fila
+  UNION ALL
+  SELECT accion, fecha, usuario_mysql FROM logs_auditoria_historico WHERE tabla_afectada='postulaciones' AND fila_id = v_fila
+  UNION ALL
+  SELECT 'cerrada', v.actualizado_en, NULL FROM postulaciones po JOIN vacantes v ON v.id = po.vacante_id
+  WHERE po.id = p_postulacion_id AND v.estado = 'cerrada'
+  ORDER BY fecha;
+END$$
+DELIMITER ;
+
+-- DROP PROCEDURE quita los permisos sobre el procedimiento
+GRANT EXECUTE ON PROCEDURE sp_postulacion_timeline TO rol_admin;
@@ -0,0 +1,171 @@
+-- 0002: coincidencias entre habilidades y requerimientos con la misma regla
+-- que la evaluación en Python (evaluacion.normalizar_habilidad): sin
+-- distinguir mayúsculas ni acentos, espacios colapsados y cada habilidad
+-- contada una vez. JSON_SEARCH compara en binario ('Python' <> 'python');
+-- aquí los valores se extraen a VARCHAR y se comparan con
+-- utf8mb4_unicode_ci, la collation de la base.
+
+-- FUNCTION: espacios al inicio y al final quitados y repetidos colapsados
+DROP FUNCTION IF EXISTS fn_normalizar_habilidad;
+DELIMITER $$
+CREATE FUNCTION fn_normalizar_habilidad(p_habilidad VARCHAR(200)) RETURNS VARCHAR(200)
+DETERMINISTIC
+BEGIN
+  RETURN REGEXP_REPLACE(REGEXP_REPLACE(p_habilidad, '[[:space:]]+', ' '), '^ | $', '');
+END$$
+DELIMITER ;
+
+-- FUNCTION: si la lista JSON tiene la habilidad (ya normalizada)
+DROP FUNCTION IF EXISTS fn_habilidad_en_lista;
+DELIMITER $$
+CREATE FUNCTION fn_habilidad_en_lista(p_lista JSON, p_habilidad VARCHAR(200)) RETURNS BOOLEAN
+DETERMINISTIC
+BEGIN
+  DECLARE v_idx INT DEFAULT 0;
+  DECLARE v_skill VARCHAR(200);
+  loop_lista: LOOP
+    SET v_skill = JSON_UNQUOTE(JSON_EXTRACT(p_lista, CONCAT('$[', v_idx, ']')));
+    IF v_skill IS NULL THEN
+      RETURN FALSE;
+    END IF;
+    IF fn_normalizar_habilidad(v_skill) COLLATE utf8mb4_unicode_ci = p_habilidad COLLATE utf8mb4_unicode_ci THEN
+      RETURN TRUE;
+    END IF;
+    SET v_idx = v_idx + 1;
+  END LOOP loop_lista;
+END$$
+DELIMITER ;
+
+-- FUNCTION: habilidades distintas de p_habilidades presentes en p_requerimientos
+DROP FUNCTION IF EXISTS fn_contar_coincidencias;
+DELIMITER $$
+CREATE FUNCTION fn_contar_coincidencias(p_habilidades JSON, p_requerimientos JSON) RETURNS INT
+DETERMINISTIC
+BEGIN
+  DECLARE v_contadas JSON DEFAULT JSON_ARRAY();
+  DECLARE v_coincidencias INT DEFAULT 0;
+  DECLARE v_idx INT DEFAULT 0;
+  DECLARE v_skill VARCHAR(200);
+  loop_coinc: LOOP
+    SET v_skill = JSON_UNQUOTE(JSON_EXTRACT(p_habilidades, CONCAT('$[', v_idx, ']')));
+    IF v_skill IS NULL THEN
+      LEAVE loop_coinc;
+    END IF;
+    SET v_skill = fn_normalizar_habilidad(v_skill);
+    IF v_skill <> '' AND NOT fn_habilidad_en_lista(v_contadas, v_skill)
+       AND fn_habilidad_en_lista(p_requerimientos, v_skill) THEN
+      SET v_coincidencias = v_coincidencias + 1;
+      SET v_contadas = JSON_ARRAY_APPEND(v_contadas, '$', v_skill);
+    END IF;
+    SET v_idx = v_idx + 1;
+  END LOOP loop_coinc;
+  RETURN v_coincidencias;
+END$$
+DELIMITER ;
+
+-- fn_habilidades_efectivas: las del CV que ya están declaradas (con otra
+-- escritura) no se agregan
+DROP FUNCTION IF EXISTS fn_habilidades_efectivas;
+DELIMITER $$
+CREATE FUNCTION fn_habilidades_efectivas(p_habilidades JSON, p_habilidades_cv JSON) RETURNS JSON
+DETERMINISTIC
+BEGIN
+  DECLARE v_resultado JSON DEFAULT IFNULL(p_habilidades, JSON_ARRAY());
+  DECLARE v_idx INT DEFAULT 0;
+  DECLARE v_skill VARCHAR(200);
+  loop_cv: LOOP
+    SET v_skill = JSON_UNQUOTE(JSON_EXTRACT(p_habilidades_cv, CONCAT('$[', v_idx, ']')));
+    IF v_skill IS NULL THEN
+      LEAVE loop_cv;
+    END IF;
+    IF NOT fn_habilidad_en_lista(v_resultado, fn_normalizar_habilidad(v_skill)) THEN
+      SET v_resultado = JSON_ARRAY_APPEND(v_resultado, '$', v_skill);
+    END IF;
+    SET v_idx = v_idx + 1;
+  END LOOP loop_cv;
+  RETURN v_resultado;
+END$$
+DELIMITER ;
+
+DROP PROCEDURE IF EXISTS sp_recalcular_score;
+DELIMITER $$
+CREATE PROCEDURE sp_recalcular_score(IN p_postulacion_id INT)
+BEGIN
+  DECLARE v_postulante INT;
+  DECLARE v_anos INT DEFAULT 0;
+  DECLARE v_coincidencias INT DEFAULT 0;
+  DECLARE v_score DECIMAL(6,2) DEFAULT 0;
+  SELECT postulante_id INTO v_postulante FROM postulaciones WHERE id = p_postulacion_id;
+  IF v_postulante IS NULL THEN
+    SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Postulación no encontrada';
+  END IF;
+  -- mismas coincidencias que sp_crear_postulacion y la evaluación en Python
+  SELECT pt.anos_experiencia,
+         fn_contar_coincidencias(fn_habilidades_efectivas(pt.habilidades, pt.habilidades_cv), v.requerimientos)
+    INTO v_anos, v_coincidencias
+    FROM postulaciones po
+    JOIN postulantes pt ON pt.id = po.postulante_id
+    JOIN vacantes v ON v.id = po.vacante_id
+    WHERE po.id = p_postulacion_id;
+  SET v_score = fn_calcular_score(IFNULL(v_anos,0), IFNULL(v_coincidencias,0));
+  -- actualizar o insertar en evaluacion_ia
+  INSERT INTO evaluacion_ia (postulacion_id, score, criterios) VALUES (p_postulacion_id, v_score, JSON_OBJECT('metodo','recalculo'))
+    ON DUPLICATE KEY UPDATE score = v_score, criterios = JSON_OBJECT('metodo','recalculo'), actualizado_en = CURRENT_TIMESTAMP;
+  INSERT INTO logs_auditoria (usuario_mysql, accion, tabla_afectada, fila_id, descripcion)
+    VALUES (CURRENT_USER(), 'UPDATE', 'evaluacion_ia', CAST(p_postulacion_id AS CHAR), CONCAT('sp_recalcular_score: ', v_score));
+  -- devolver la fila de ranking actualizada
+  CALL sp_ranking_fila(p_postulacion_id);
+END$$
+DELIMITER ;
+
+DROP PROCEDURE IF EXISTS sp_crear_postulacion;
+DELIMITER $$
+CREATE PROCEDURE sp_crear_postulacion(
+  IN p_postulante_id INT,
+  IN p_vacante_id INT,
+  IN p_usuario VARCHAR(150)
+)
+BEGIN
+  DECLARE v_activo INT DEFAULT 0;
+  DECLARE v_anos INT DEFAULT 0;
+  DECLARE v_coincidencias INT DEFAULT 0;
+  DECLARE v_score DECIMAL(6,2) DEFAULT 0;
+  DECLARE v_usuario_id INT DEFAULT NULL;
+  -- validar vacante
+  SELECT activo INTO v_activo FROM vacantes WHERE id = p_vacante_id;
+  IF v_activo IS NULL OR v_activo = 0 THEN
+    SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Vacante no existe o no está activa';
+  END IF;
+  -- validar postulante
+  IF fn_validar_postulante(p_postulante_id, p_vacante_id) = FALSE THEN
+    SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Postulante inválido o ya postuló';
+  END IF;
+  -- resolver usuario (username -> id) si existe
+  SELECT id INTO v_usuario_id FROM usuarios WHERE username = p_usuario LIMIT 1;
+  -- insertar postulacion (guardar username y usuario_id FK cuando sea posible)
+  INSERT INTO postulaciones (postulante_id, vacante_id, usuario_creo, usuario_id)
+    VALUES (p_postulante_id, p_vacante_id, p_usuario, v_usuario_id);
+  SET @last_postulacion_id = LAST_INSERT_ID();
+  -- calcular score inicial: años de experiencia y habilidades presentes en los requerimientos
+  SELECT pt.anos_experiencia,
+         fn_contar_coincidencias(fn_habilidades_efectivas(pt.habilidades, pt.habilidades_cv), v.requerimientos)
+    INTO v_anos, v_coincidencias
+    FROM postulantes pt JOIN vacantes v ON v.id = p_vacante_id WHERE pt.id = p_postulante_id;
+  SET v_score = fn_calcular_score(IFNULL(v_anos,0), IFNULL(v_coincidencias,0));
+  -- insertar evaluación IA
+  INSERT INTO evaluacion_ia (postulacion_id, score, criterios) VALUES (@last_postulacion_id, v_score, JSON_OBJECT('metodo','inicial'));
+  -- auditoría
+  INSERT INTO logs_auditoria (usuario_mysql, accion, tabla_afectada, fila_id, descripcion)
+    VALUES (p_usuario, 'SP', 'postulaciones', @last_postulacion_id, CONCAT('sp_crear_postulacion: puntaje inicial=', v_score));
+  -- devolver la fila de ranking de la nueva postulación
+  CALL sp_ranking_fila(@last_postulacion_id);
+END$$
+DELIMITER ;
+
+-- DROP PROCEDURE/FUNCTION quita los permisos sobre la rutina
+GRANT EXECUTE ON PROCEDURE sp_recalcular_score TO rol_admin;
+GRANT EXECUTE ON PROCEDURE sp_crear_postulacion TO rol_admin;
+GRANT EXECUTE ON FUNCTION fn_normalizar_habilidad TO rol_admin;
+GRANT EXECUTE ON FUNCTION fn_habilidad_en_lista TO rol_admin;
+GRANT EXECUTE ON FUNCTION fn_contar_coincidencias TO rol_admin;
+GRANT EXECUTE ON FUNCTION fn_habilidades_efectivas TO rol_admin;
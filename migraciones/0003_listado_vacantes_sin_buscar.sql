@@ -0,0 +1,26 @@
+-- 0003: sp_listar_vacantes_pagina sin p_buscar. La búsqueda por texto la
+-- resuelve el índice en memoria (indice_vacantes.py) y la app siempre pasaba
+-- NULL; la rama LIKE '%...%' no puede usar índices y recorría vacantes.
+-- La app desde esta versión llama al procedimiento con 4 parámetros:
+-- aplicar antes de desplegarla.
+DROP PROCEDURE IF EXISTS sp_listar_vacantes_pagina;
+DELIMITER $$
+CREATE PROCEDURE sp_listar_vacantes_pagina(
+  IN p_departamento_id INT,
+  IN p_cursor_fecha DATETIME,
+  IN p_cursor_id INT,
+  IN p_limite INT
+)
+BEGIN
+  SELECT id, titulo, LEFT(descripcion, 300) AS descripcion, departamento_id, estado, activo, creado_en
+  FROM vacantes
+  WHERE activo = 1
+    AND (p_departamento_id IS NULL OR departamento_id = p_departamento_id)
+    AND (p_cursor_fecha IS NULL OR creado_en < p_cursor_fecha OR (creado_en = p_cursor_fecha AND id < p_cursor_id))
+  ORDER BY creado_en DESC, id DESC
+  LIMIT p_limite;
+END$$
+DELIMITER ;
+
+-- DROP PROCEDURE quita los permisos sobre el procedimiento
+GRANT EXECUTE ON PROCEDURE sp_listar_vacantes_pagina TO rol_admin;
@@ -0,0 +1,167 @@
+"""Migraciones versionadas del esquema, sobre setup_reclutamiento.sql.
+
+setup_reclutamiento.sql crea la base desde cero (versión 0). Los cambios
+posteriores van en migraciones/NNNN_descripcion.sql, en el mismo formato que
+el script (sentencias terminadas en ';', bloques con DELIMITER para
+procedimientos y triggers). `Migrador.aplicar()` ejecuta en orden las que
+faltan y registra cada una en schema_migraciones con el sha256 de su
+contenido: si un archivo ya aplicado cambia, se detiene en lugar de dejar
+la base distinta de lo que dicen los archivos (una corrección va en una
+migración nueva).
+
+En MySQL el DDL no es transaccional: si una migración falla a mitad, lo ya
+ejecutado queda y la migración no se registra. Hay que revisar el error,
+deshacer a mano lo aplicado y volver a correrla.
+"""
+import hashlib
+import re
+import time
+from pathlib import Path
+
+DIRECTORIO = Path(__file__).resolve().parent / 'migraciones'
+RE_ARCHIVO = re.compile(r'^(\d{4})_(\w+)\.sql$')
+RE_DELIMITER = re.compile(r'^\s*DELIMITER\s+(\S+)\s*$', re.IGNORECASE)
+# dos `flask migrar` a la vez no deben aplicar la misma migración
+CANDADO = 'reclutamiento_migraciones'
+
+SQL_TABLA = '''
+    CREATE TABLE IF NOT EXISTS schema_migraciones (
+      version INT PRIMARY KEY,
+      nombre VARCHAR(200) NOT NULL,
+      checksum CHAR(64) NOT NULL,
+      segundos DECIMAL(10,3) DEFAULT NULL,
+      aplicada_en DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+
+class ErrorMigracion(Exception):
+    pass
+
+
+def dividir_sentencias(texto):
+    """Sentencias de un script SQL, como las separa el cliente mysql."""
+    sentencias, actual, delimitador = [], [], ';'
+    for linea in texto.splitlines():
+        cambio = RE_DELIMITER.match(linea)
+        if cambio:
+            delimitador = cambio.group(1)
+            continue
+        if not actual and (not linea.strip() or linea.lstrip().startswith('--')):
+            continue
+        actual.append(linea)
+        if linea.rstrip().endswith(delimitador):
+            sentencia = '\n'.join(actual).rstrip()[:-len(delimitador)].strip()
+            if sentencia:
+                sentencias.append(sentencia)
+            actual = []
+    resto = '\n'.join(actual).strip()
+    if resto:
+        sentencias.append(resto)
+    return sentencias
+
+
+class Migracion:
+    def __init__(self, ruta):
+        coincide = RE_ARCHIVO.match(ruta.name)
+        if not coincide:
+            raise ErrorMigracion(f'Nombre inválido: {ruta.name} (se espera NNNN_descripcion.sql)')
+        self.version = int(coincide.group(1))
+        self.nombre = coincide.group(2)
+        self.ruta = ruta
+        self.texto = ruta.read_text(encoding='utf-8')
+        self.checksum = hashlib.sha256(self.texto.encode('utf-8')).hexdigest()
+
+    def sentencias(self):
+        return dividir_sentencias(self.texto)
+
+
+def leer_migraciones(directorio=DIRECTORIO):
+    migraciones = sorted((Migracion(r) for r in Path(directorio).glob('*.sql')), key=lambda m: m.version)
+    for anterior, siguiente in zip(migraciones, migraciones[1:]):
+        if anterior.version == siguiente.version:
+            raise ErrorMigracion(f'Versión {siguiente.version} repetida: {anterior.ruta.name}, {siguiente.ruta.name}')
+    return migraciones
+
+
+class Migrador:
+    def __init__(self, engine, directorio=DIRECTORIO):
+        """`engine`: con un usuario que pueda crear índices, tablas y
+        procedimientos (no el de la app)."""
+        self._engine = engine
+        self._directorio = directorio
+
+    def _conectar(self):
+        conn = self._engine.raw_connection()
+        cursor = conn.cursor()
+        cursor.execute(SQL_TABLA)
+        conn.commit()
+        return conn, cursor
+
+    def _aplicadas(self, cursor):
+        cursor.execute('SELECT version, nombre, checksum, aplicada_en FROM schema_migraciones ORDER BY version')
+        return {fila[0]: fila for fila in cursor.fetchall()}
+
+    def estado(self):
+        """Una fila por migración (archivos y registradas): version, nombre,
+        aplicada_en (None si está pendiente) y modificada."""
+        conn, cursor = self._conectar()
+        try:
+            aplicadas = self._aplicadas(cursor)
+        finally:
+            conn.close()
+        filas = []
+        for m in leer_migraciones(self._directorio):
+            registro = aplicadas.pop(m.version, None)
+            filas.append({'version': m.version, 'nombre': m.nombre,
+                          'aplicada_en': registro[3] if registro else None,
+                          'modificada': bool(registro) and registro[2] != m.checksum})
+        # registradas cuyo archivo ya no está
+        for version, nombre, _, aplicada_en in aplicadas.values():
+            filas.append({'version': version, 'nombre': nombre, 'aplicada_en': aplicada_en,
+                          'modificada': None})
+        return sorted(filas, key=lambda f: f['version'])
+
+    def aplicar(self, hasta=None, simular=False, al_aplicar=None):
+        """Aplica las pendientes hasta la versión `hasta` (todas si es None).
+        `al_aplicar(migracion, segundos)` se llama después de cada una.
+        Devuelve las migraciones aplicadas (o las que se aplicarían)."""
+        conn, cursor = self._conectar()
+        try:
+            cursor.execute('SELECT GET_LOCK(%s, 0)', (CANDADO,))
+            if not cursor.fetchone()[0]:
+                raise ErrorMigracion('Otra ejecución de las migraciones está en curso')
+            try:
+                aplicadas = self._aplicadas(cursor)
+                pendientes = []
+                for m in leer_migraciones(self._directorio):
+                    registro = aplicadas.get(m.version)
+                    if registro is not None:
+                        if registro[2] != m.checksum:
+                            raise ErrorMigracion(f'{m.ruta.name} cambió después de aplicarse; '
+                                                 'los cambios van en una migración nueva')
+                    elif hasta is None or m.version <= hasta:
+                        pendientes.append(m)
+                if simular:
+                    return pendientes
+                for m in pendientes:
+                    inicio = time.perf_counter()
+                    for sentencia in m.sentencias():
+                        try:
+                            cursor.execute(sentencia)
+                            while cursor.nextset():
+                                pass
+                        except Exception as e:
+                            raise ErrorMigracion(f'{m.ruta.name}: {e}\n{sentencia}') from e
+                    segundos = time.perf_counter() - inicio
+                    cursor.execute('INSERT INTO schema_migraciones (version, nombre, checksum, segundos) '
+                                   'VALUES (%s, %s, %s, %s)', (m.version, m.nombre, m.checksum, round(segundos, 3)))
+                    conn.commit()
+                    if al_aplicar is not None:
+                        al_aplicar(m, segundos)
+                return pendientes
+            finally:
+                cursor.execute('SELECT RELEASE_LOCK(%s)', (CANDADO,))
+                cursor.fetchall()
+        finally:
+            conn.close()
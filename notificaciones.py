@@ -0,0 +1,153 @@
+"""Cambios en vivo para las páginas abiertas (Server-Sent Events).
+
+`CanalCambios.publicar(tema, clave, valor)` anota un cambio, p. ej. tema
+('ranking', 12) y clave postulacion_id. Un hilo junta lo publicado cada
+`ventana` segundos: los cambios a una misma clave se combinan (se conservan
+el primer y el último valor) y, por cada tema con suscriptores, el evento se
+arma una sola vez con `armar(tema, cambios)` y se copia a la cola de cada
+suscriptor. Lo publicado en temas sin suscriptores se descarta al
+publicarlo. El trabajo depende de la cantidad de cambios, no de las páginas
+abiertas.
+
+Un suscriptor que no lee y llena su cola recibe un evento 'recargar' en
+lugar de los cambios perdidos. El canal es del proceso: con varios procesos
+de la app cada uno avisa de sus propias escrituras.
+"""
+import logging
+import queue
+import threading
+
+log = logging.getLogger(__name__)
+
+
+class DemasiadosSuscriptores(Exception):
+    pass
+
+
+class Suscripcion:
+    def __init__(self, canal, temas, capacidad):
+        self.temas = temas
+        self.cola = queue.Queue(maxsize=capacidad)
+        self._canal = canal
+
+    def entregar(self, evento):
+        try:
+            self.cola.put_nowait(evento)
+        except queue.Full:
+            # se descarta lo pendiente: el cliente vuelve a pedir la página
+            while True:
+                try:
+                    self.cola.get_nowait()
+                except queue.Empty:
+                    break
+            self.cola.put_nowait(('recargar', {}))
+            self._canal.desbordes += 1
+
+    def cerrar(self):
+        self._canal._quitar(self)
+
+
+class CanalCambios:
+    def __init__(self, armar, ventana=0.5, capacidad=100, max_suscriptores=1000):
+        """`armar(tema, cambios)`: cambios es {clave: (primer_valor, ultimo_valor)};
+        devuelve una lista de eventos (tipo, datos) para los suscriptores del tema."""
+        self._armar = armar
+        self._ventana = ventana
+        self._capacidad = capacidad
+        self._max_suscriptores = max_suscriptores
+        self._lock = threading.Lock()
+        self._suscriptores = {}  # tema -> set(Suscripcion)
+        self._total_suscriptores = 0
+        self._pendientes = {}    # tema -> {clave: (primero, ultimo)}
+        self._hay_cambios = threading.Event()
+        self._detener = threading.Event()
+        self._hilo = None
+        self.publicados = 0
+        self.enviados = 0
+        self.desbordes = 0
+
+    def suscriptores(self):
+        return self._total_suscriptores
+
+    def iniciar(self):
+        with self._lock:
+            if self._hilo is not None:
+                return
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._trabajar, name='canal-cambios', daemon=True)
+            self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+        self._hay_cambios.set()
+        if self._hilo is not None:
+            self._hilo.join(self._ventana * 4)
+            self._hilo = None
+
+    def suscribir(self, *temas):
+        self.iniciar()
+        suscripcion = Suscripcion(self, temas, self._capacidad)
+        with self._lock:
+            if self._total_suscriptores >= self._max_suscriptores:
+                raise DemasiadosSuscriptores(f'Máximo de {self._max_suscriptores} conexiones en vivo')
+            for tema in temas:
+                self._suscriptores.setdefault(tema, set()).add(suscripcion)
+            self._total_suscriptores += 1
+        return suscripcion
+
+    def _quitar(self, suscripcion):
+        with self._lock:
+            quitada = False
+            for tema in suscripcion.temas:
+                suscriptores = self._suscriptores.get(tema)
+                if suscriptores and suscripcion in suscriptores:
+                    suscriptores.discard(suscripcion)
+                    quitada = True
+                    if not suscriptores:
+                        del self._suscriptores[tema]
+                        self._pendientes.pop(tema, None)
+            if quitada:
+                self._total_suscriptores -= 1
+
+    def publicar(self, tema, clave, valor):
+        with self._lock:
+            if tema not in self._suscriptores:
+                return
+            cambios = self._pendientes.setdefault(tema, {})
+            anterior = cambios.get(clave)
+            cambios[clave] = (anterior[0] if anterior else valor, valor)
+            self.publicados += 1
+        self._hay_cambios.set()
+
+    def repartir(self):
+        """Arma y entrega lo acumulado; lo llama el hilo del canal."""
+        with self._lock:
+            pendientes, self._pendientes = self._pendientes, {}
+        for tema, cambios in pendientes.items():
+            try:
+                eventos = self._armar(tema, cambios)
+            except Exception:
+                log.exception('Error armando el evento de %s', tema)
+                continue
+            if not eventos:
+                continue
+            with self._lock:
+                suscriptores = list(self._suscriptores.get(tema, ()))
+            for suscripcion in suscriptores:
+                for evento in eventos:
+                    suscripcion.entregar(evento)
+            self.enviados += len(suscriptores) * len(eventos)
+
+    def _trabajar(self):
+        while not self._detener.is_set():
+            self._hay_cambios.wait()
+            # ventana de acumulación: los cambios que llegan mientras tanto van juntos
+            self._detener.wait(self._ventana)
+            self._hay_cambios.clear()
+            self.repartir()
+
+    def estadisticas(self):
+        with self._lock:
+            temas = len(self._suscriptores)
+        return {'suscriptores': self._total_suscriptores, 'temas': temas, 'publicados': self.publicados,
+                'enviados': self.enviados, 'desbordes': self.desbordes}
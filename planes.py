@@ -0,0 +1,187 @@
+"""Revisión de los planes de ejecución (EXPLAIN) de las consultas frecuentes.
+
+Cada `Revision` es un procedimiento o una consulta de consultas.py que se
+ejecuta en cada página vista. De los procedimientos se toma el cuerpo
+instalado (information_schema.ROUTINES), no una copia: se explican sus
+SELECT con los parámetros reemplazados por valores de muestra tomados de la
+base. Un plan falla si sobre una tabla grande hace una lectura completa
+(type ALL, o index sin LIMIT) o un filesort que la revisión no permite
+explícitamente.
+
+Una tabla cuenta como grande desde `min_filas` filas: con tablas casi vacías
+el optimizador elige leerlas enteras aunque el índice exista, y ese plan no
+dice nada de producción. Para revisar en local, cargar datos sintéticos con
+benchmarks/poblar_mysql.py. Funciona con MySQL 8 y MariaDB 10.5+.
+"""
+import re
+
+TABLAS_GRANDES = ('postulaciones', 'postulantes', 'evaluacion_ia', 'vacantes',
+                  'logs_auditoria', 'logs_auditoria_historico')
+RE_TABLA = re.compile(r'\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(?!ON\b|WHERE\b|JOIN\b|LEFT\b|INNER\b|ORDER\b|'
+                      r'GROUP\b|UNION\b|LIMIT\b)(\w+))?', re.IGNORECASE)
+RE_VARIABLE = re.compile(r'\b([pv]_\w+)\b')
+
+SQL_MUESTRA = '''
+    SELECT po.id AS postulacion_id, po.vacante_id, po.postulante_id, v.departamento_id
+    FROM postulaciones po JOIN vacantes v ON v.id = po.vacante_id
+    ORDER BY po.id DESC LIMIT 1
+'''
+MUESTRA_VACIA = {'postulacion_id': 1, 'vacante_id': 1, 'postulante_id': 1, 'departamento_id': 1}
+
+# las ramas que arma sp_buscar_logs con PREPARE (no se pueden leer del cuerpo)
+SQL_LOGS = ('SELECT id, usuario_mysql, accion, tabla_afectada, fila_id, fecha, descripcion '
+            'FROM logs_auditoria WHERE 1 = 1{filtro} ORDER BY fecha DESC, id DESC LIMIT 51')
+CURSOR_LOGS = ' AND (fecha < NOW() OR (fecha = NOW() AND id < 1000000))'
+
+MOTIVO_RANKING = ('ordena por evaluacion_ia.score, que está en otra tabla: el filesort es sobre las '
+                  'postulaciones de una vacante y la app guarda el ranking en memoria')
+
+
+class Revision:
+    def __init__(self, nombre, proc=None, sql=None, valores=None, permitir_filesort=(), motivo=None):
+        """`valores(muestra)`: parámetros del procedimiento ({'p_x': valor}) o
+        de la consulta ({'x': valor}); `permitir_filesort`: tablas en las que
+        se acepta, con `motivo`."""
+        self.nombre = nombre
+        self.proc = proc
+        self.sql = sql
+        self.valores = valores or (lambda muestra: {})
+        self.permitir_filesort = set(permitir_filesort)
+        self.motivo = motivo
+
+
+def revisiones(consultas):
+    return [
+        Revision('sp_postulacion_timeline', proc='sp_postulacion_timeline',
+                 valores=lambda m: {'p_postulacion_id': m['postulacion_id'], 'v_fila': str(m['postulacion_id'])}),
+        Revision('sp_ranking_fila', proc='sp_ranking_fila',
+                 valores=lambda m: {'p_postulacion_id': m['postulacion_id']}),
+        Revision('sp_generar_ranking', proc='sp_generar_ranking', valores=lambda m: {'p_vacante_id': m['vacante_id']},
+                 permitir_filesort=['postulaciones'], motivo=MOTIVO_RANKING),
+        Revision('sp_listar_postulantes_por_vacante', proc='sp_listar_postulantes_por_vacante',
+                 valores=lambda m: {'p_vacante_id': m['vacante_id']}),
+        Revision('sp_vacante_detalle', proc='sp_vacante_detalle', valores=lambda m: {'p_vacante_id': m['vacante_id']}),
+        Revision('sp_listar_vacantes', proc='sp_listar_vacantes'),
+        Revision('sp_listar_vacantes_pagina', proc='sp_listar_vacantes_pagina',
+                 valores=lambda m: {'p_departamento_id': None, 'p_cursor_fecha': None, 'p_cursor_id': None,
+                                    'p_limite': 21}),
+        Revision('sp_listar_vacantes_pagina (departamento)', proc='sp_listar_vacantes_pagina',
+                 valores=lambda m: {'p_departamento_id': m['departamento_id'], 'p_cursor_fecha': None,
+                                    'p_cursor_id': None, 'p_limite': 21}),
+        Revision('sp_listar_logs', proc='sp_listar_logs'),
+        Revision('sp_buscar_logs', sql=SQL_LOGS.format(filtro='')),
+        Revision('sp_buscar_logs (cursor)', sql=SQL_LOGS.format(filtro=CURSOR_LOGS)),
+        Revision('sp_buscar_logs (usuario)', sql=SQL_LOGS.format(filtro=" AND usuario_mysql LIKE 'admin%'")),
+        Revision('sp_buscar_logs (accion)', sql=SQL_LOGS.format(filtro=" AND accion = 'UPDATE'")),
+        Revision('sp_buscar_logs (fila)',
+                 sql=SQL_LOGS.format(filtro=" AND tabla_afectada = 'postulaciones' AND fila_id = '1'")),
+        Revision('postulaciones_recientes', sql=consultas['postulaciones_recientes']),
+        Revision('postulaciones_postulante', sql=consultas['postulaciones_postulante'],
+                 valores=lambda m: {'postulante_id': m['postulante_id']}),
+        Revision('top_por_vacante', sql=consultas['top_por_vacante'],
+                 valores=lambda m: {'ids': (m['vacante_id'],), 'k': 5},
+                 permitir_filesort=['postulaciones'], motivo=MOTIVO_RANKING),
+        Revision('exportar_ranking', sql=consultas['exportar_ranking'],
+                 valores=lambda m: {'vacante_id': m['vacante_id'], 'score': 101, 'fecha': '1970-01-01', 'id': 0},
+                 permitir_filesort=['postulaciones'], motivo=MOTIVO_RANKING),
+    ]
+
+
+def filas_dict(cursor):
+    columnas = [d[0] for d in cursor.description]
+    return [dict(zip(columnas, fila)) for fila in cursor.fetchall()]
+
+
+def sentencias_de_procedimiento(cursor, nombre, valores, escapar):
+    """Los SELECT del cuerpo instalado de un procedimiento, con los
+    parámetros y variables reemplazados por literales."""
+    cursor.execute('SELECT ROUTINE_DEFINITION FROM information_schema.ROUTINES '
+                   'WHERE ROUTINE_SCHEMA = DATABASE() AND ROUTINE_NAME = %s', (nombre,))
+    fila = cursor.fetchone()
+    if fila is None or fila[0] is None:
+        raise LookupError(f'No se puede leer {nombre}: falta el procedimiento o el permiso para ver su cuerpo')
+    cuerpo = re.sub(r'--[^\n]*', '', fila[0])
+    cuerpo = re.sub(r'^\s*BEGIN\b|\bEND\s*$', '', cuerpo.strip(), flags=re.IGNORECASE)
+    sentencias = []
+    for sentencia in (s.strip() for s in cuerpo.split(';')):
+        if not re.match(r'SELECT\b', sentencia, re.IGNORECASE) or re.search(r'\bINTO\b', sentencia, re.IGNORECASE):
+            continue
+
+        def literal(coincide):
+            if coincide.group(1) not in valores:
+                raise KeyError(f'{nombre}: falta el valor de {coincide.group(1)}')
+            return escapar(valores[coincide.group(1)])
+
+        sentencias.append(RE_VARIABLE.sub(literal, sentencia))
+    return sentencias
+
+
+def alias_de_tablas(sql):
+    alias = {}
+    for tabla, nombre in RE_TABLA.findall(sql):
+        alias[nombre or tabla] = tabla
+        alias[tabla] = tabla
+    return alias
+
+
+def problemas_del_plan(plan, sql, grandes, permitir_filesort):
+    """Problemas de un EXPLAIN (filas como dict) sobre tablas grandes."""
+    alias = alias_de_tablas(sql)
+    con_limite = re.search(r'\bLIMIT\b', sql, re.IGNORECASE) is not None
+    problemas = []
+    for fila in plan:
+        tabla = alias.get(fila.get('table'), fila.get('table'))
+        if tabla not in grandes:
+            continue
+        tipo = fila.get('type')
+        extra = fila.get('Extra') or ''
+        if tipo == 'ALL':
+            problemas.append(f'{tabla}: lectura completa ({fila.get("rows")} filas estimadas)')
+        elif tipo == 'index' and not con_limite:
+            problemas.append(f'{tabla}: recorre el índice {fila.get("key")} completo')
+        if 'Using filesort' in extra and tabla not in permitir_filesort:
+            problemas.append(f'{tabla}: filesort')
+    return problemas
+
+
+def revisar(conn, consultas, min_filas=1000, analizar=True):
+    """Ejecuta las revisiones con una conexión PyMySQL. Devuelve una lista
+    de {'nombre', 'problemas', 'avisos', 'planes'}."""
+    cursor = conn.cursor()
+    if analizar:
+        # estadísticas al día para que el plan sea el de producción
+        cursor.execute('ANALYZE TABLE ' + ', '.join(TABLAS_GRANDES))
+        cursor.fetchall()
+    cursor.execute('SELECT TABLE_NAME, TABLE_ROWS FROM information_schema.TABLES '
+                   'WHERE TABLE_SCHEMA = DATABASE()')
+    tamanos = {tabla: filas or 0 for tabla, filas in cursor.fetchall()}
+    grandes = {t for t in TABLAS_GRANDES if tamanos.get(t, 0) >= min_filas}
+    cursor.execute(SQL_MUESTRA)
+    muestra = (filas_dict(cursor) or [MUESTRA_VACIA])[0]
+
+    resultados = []
+    for revision in revisiones(consultas):
+        resultado = {'nombre': revision.nombre, 'problemas': [], 'avisos': [], 'planes': []}
+        try:
+            valores = revision.valores(muestra)
+            if revision.proc:
+                sentencias = [(s, None) for s in
+                              sentencias_de_procedimiento(cursor, revision.proc, valores, conn.escape)]
+            else:
+                sentencias = [(revision.sql, valores or None)]
+            for sql, params in sentencias:
+                cursor.execute('EXPLAIN ' + sql, params)
+                plan = filas_dict(cursor)
+                resultado['planes'].append(plan)
+                resultado['problemas'] += problemas_del_plan(plan, sql, grandes, revision.permitir_filesort)
+        except Exception as e:
+            resultado['problemas'].append(f'error: {e}')
+        if revision.motivo:
+            resultado['avisos'].append(f'filesort permitido: {revision.motivo}')
+        resultados.append(resultado)
+    pequenas = [t for t in TABLAS_GRANDES if t not in grandes]
+    if pequenas:
+        resultados.append({'nombre': 'datos', 'problemas': [], 'planes': [],
+                           'avisos': [f'menos de {min_filas} filas (no se revisan): ' + ', '.join(pequenas)]})
+    cursor.close()
+    return resultados
@@ -0,0 +1,351 @@
+"""Ranking por vacante mantenido en memoria.
+
+Cada vacante tiene una skip list indexable (con anchos por nivel), de modo
+que insertar, mover o quitar una postulación, leer el top-K o una página
+desde un offset y obtener la posición de una postulación cuestan O(log n).
+El orden es el mismo que sp_generar_ranking: score DESC (sin score al
+final), fecha_postulacion ASC y, para desempatar, postulacion_id.
+"""
+import heapq
+import random
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from itertools import islice
+
+MAX_NIVEL = 24
+_INF = float('inf')
+
+
+class _Nodo:
+    __slots__ = ('clave', 'valor', 'siguientes', 'anchos')
+
+    def __init__(self, clave, valor, niveles):
+        self.clave = clave
+        self.valor = valor
+        self.siguientes = [None] * niveles
+        self.anchos = [1] * niveles
+
+
+class ListaIndexable:
+    """Skip list ordenada por clave con acceso por posición."""
+
+    def __init__(self, semilla=None):
+        self._cabeza = _Nodo(None, None, MAX_NIVEL)
+        self._nivel = 1
+        self._largo = 0
+        self._rnd = random.Random(semilla)
+
+    def __len__(self):
+        return self._largo
+
+    def _nivel_aleatorio(self):
+        nivel = 1
+        while nivel < MAX_NIVEL and self._rnd.random() < 0.5:
+            nivel += 1
+        return nivel
+
+    def _buscar_previos(self, clave):
+        previos = [None] * MAX_NIVEL
+        posiciones = [0] * MAX_NIVEL
+        nodo = self._cabeza
+        pos = 0
+        for nivel in range(self._nivel - 1, -1, -1):
+            while nodo.siguientes[nivel] is not None and nodo.siguientes[nivel].clave < clave:
+                pos += nodo.anchos[nivel]
+                nodo = nodo.siguientes[nivel]
+            previos[nivel] = nodo
+            posiciones[nivel] = pos
+        return previos, posiciones
+
+    def insertar(self, clave, valor):
+        previos, posiciones = self._buscar_previos(clave)
+        niveles = self._nivel_aleatorio()
+        if niveles > self._nivel:
+            for nivel in range(self._nivel, niveles):
+                previos[nivel] = self._cabeza
+                posiciones[nivel] = 0
+                self._cabeza.anchos[nivel] = self._largo + 1
+            self._nivel = niveles
+        nuevo = _Nodo(clave, valor, niveles)
+        pos = posiciones[0] + 1
+        for nivel in range(niveles):
+            previo = previos[nivel]
+            nuevo.siguientes[nivel] = previo.siguientes[nivel]
+            previo.siguientes[nivel] = nuevo
+            nuevo.anchos[nivel] = previo.anchos[nivel] - (pos - 1 - posiciones[nivel])
+            previo.anchos[nivel] = pos - posiciones[nivel]
+        for nivel in range(niveles, self._nivel):
+            previos[nivel].anchos[nivel] += 1
+        self._largo += 1
+
+    def quitar(self, clave):
+        previos, _ = self._buscar_previos(clave)
+        objetivo = previos[0].siguientes[0]
+        if objetivo is None or objetivo.clave != clave:
+            raise KeyError(clave)
+        for nivel in range(self._nivel):
+            previo = previos[nivel]
+            if previo.siguientes[nivel] is objetivo:
+                previo.anchos[nivel] += objetivo.anchos[nivel] - 1
+                previo.siguientes[nivel] = objetivo.siguientes[nivel]
+            else:
+                previo.anchos[nivel] -= 1
+        while self._nivel > 1 and self._cabeza.siguientes[self._nivel - 1] is None:
+            self._nivel -= 1
+        self._largo -= 1
+
+    def posicion(self, clave):
+        """Índice 0-based de la clave; KeyError si no existe."""
+        previos, posiciones = self._buscar_previos(clave)
+        nodo = previos[0].siguientes[0]
+        if nodo is None or nodo.clave != clave:
+            raise KeyError(clave)
+        return posiciones[0]
+
+    def rango(self, offset, limite):
+        """Valores en las posiciones [offset, offset + limite)."""
+        if offset >= self._largo or limite <= 0:
+            return []
+        nodo = self._cabeza
+        restante = offset + 1
+        for nivel in range(self._nivel - 1, -1, -1):
+            while nodo.siguientes[nivel] is not None and nodo.anchos[nivel] <= restante:
+                restante -= nodo.anchos[nivel]
+                nodo = nodo.siguientes[nivel]
+        valores = []
+        while nodo is not None and len(valores) < limite:
+            valores.append(nodo.valor)
+            nodo = nodo.siguientes[0]
+        return valores
+
+
+def clave_ranking(fila):
+    score = fila.get('score')
+    return (
+        -float(score) if score is not None else _INF,
+        fila.get('fecha_postulacion') or datetime.max,
+        fila['postulacion_id'],
+    )
+
+
+class RankingVacante:
+    def __init__(self, vacante, filas):
+        self.vacante = vacante
+        self.cargado_en = time.monotonic()
+        self._lista = ListaIndexable()
+        self._claves = {}
+        for fila in filas:
+            self.actualizar(fila)
+
+    def __len__(self):
+        return len(self._lista)
+
+    def actualizar(self, fila):
+        """Inserta o reubica una postulación con su nuevo score."""
+        postulacion_id = fila['postulacion_id']
+        anterior = self._claves.pop(postulacion_id, None)
+        if anterior is not None:
+            self._lista.quitar(anterior)
+        clave = clave_ranking(fila)
+        self._lista.insertar(clave, fila)
+        self._claves[postulacion_id] = clave
+
+    def quitar(self, postulacion_id):
+        clave = self._claves.pop(postulacion_id, None)
+        if clave is not None:
+            self._lista.quitar(clave)
+
+    def pagina(self, offset=0, limite=50):
+        return self._lista.rango(offset, limite)
+
+    def posicion(self, postulacion_id):
+        """Posición 1-based o None si la postulación no está en el ranking."""
+        clave = self._claves.get(postulacion_id)
+        if clave is None:
+            return None
+        return self._lista.posicion(clave) + 1
+
+
+class _Carga:
+    __slots__ = ('terminada', 'pendientes', 'ranking', 'sin_vacante', 'invalidada')
+
+    def __init__(self):
+        self.terminada = threading.Event()
+        self.pendientes = []
+        self.ranking = None
+        self.sin_vacante = False
+        self.invalidada = False
+
+
+class AlmacenRankings:
+    """Rankings por vacante cargados bajo demanda.
+
+    `cargador(vacante_id)` devuelve (vacante, filas) o (None, []) si la
+    vacante no existe. Con `ttl` > 0 un ranking se recarga pasado ese tiempo,
+    lo que acota la desactualización cuando hay varios procesos de la app.
+    Con `max_rankings` > 0 se guardan a lo sumo esa cantidad de vacantes: al
+    pasarse sale la usada hace más tiempo (LRU).
+    `cargador_top(vacante_ids, k)` devuelve {vacante_id: top-k ordenado} de
+    las vacantes cuyo ranking no está en memoria (ver top).
+    """
+
+    def __init__(self, cargador, ttl=0, cargador_top=None, max_rankings=0):
+        self._cargador = cargador
+        self._cargador_top = cargador_top
+        self._ttl = ttl
+        self._max_rankings = max_rankings
+        self._lock = threading.RLock()
+        self._rankings = OrderedDict()
+        self._cargas = {}  # vacante_id -> _Carga en curso
+
+    def _vigente(self, ranking):
+        return not self._ttl or time.monotonic() - ranking.cargado_en < self._ttl
+
+    def _en_memoria(self, vacante_id):
+        """Ranking vigente en memoria (marcado como recién usado) o None; el
+        vencido se descarta. Llamar con el lock tomado."""
+        ranking = self._rankings.get(vacante_id)
+        if ranking is None:
+            return None
+        if not self._vigente(ranking):
+            del self._rankings[vacante_id]
+            return None
+        self._rankings.move_to_end(vacante_id)
+        return ranking
+
+    def _guardar(self, vacante_id, ranking):
+        self._rankings[vacante_id] = ranking
+        self._rankings.move_to_end(vacante_id)
+        if self._max_rankings:
+            while len(self._rankings) > self._max_rankings:
+                self._rankings.popitem(last=False)
+
+    def obtener(self, vacante_id):
+        """Una sola carga por vacante a la vez: los demás hilos esperan su
+        resultado. Los cambios que llegan durante la carga (actualizar) se
+        guardan y se aplican sobre el ranking leído antes de publicarlo."""
+        while True:
+            with self._lock:
+                ranking = self._en_memoria(vacante_id)
+                if ranking is not None:
+                    return ranking
+                carga = self._cargas.get(vacante_id)
+                if carga is None:
+                    carga = self._cargas[vacante_id] = _Carga()
+                    break
+            carga.terminada.wait()
+            if carga.ranking is not None or carga.sin_vacante:
+                return carga.ranking
+            # la carga falló: reintentar
+        try:
+            vacante, filas = self._cargador(vacante_id)
+            ranking = RankingVacante(vacante, filas) if vacante is not None else None
+            with self._lock:
+                if ranking is None:
+                    carga.sin_vacante = True
+                    self._rankings.pop(vacante_id, None)
+                else:
+                    for fila in carga.pendientes:
+                        ranking.actualizar(fila)
+                    if not carga.invalidada:
+                        self._guardar(vacante_id, ranking)
+                    carga.ranking = ranking
+            return ranking
+        finally:
+            with self._lock:
+                self._cargas.pop(vacante_id, None)
+            carga.terminada.set()
+
+    def cargado(self, vacante_id):
+        with self._lock:
+            return vacante_id in self._rankings
+
+    def actualizar(self, vacante_id, fila):
+        """Aplica un cambio de score; si el ranking no está en memoria no hace
+        nada, la próxima lectura lo cargará ya con el cambio. Devuelve la
+        posición que tenía la postulación (None si era nueva o si el ranking
+        no está cargado)."""
+        with self._lock:
+            carga = self._cargas.get(vacante_id)
+            if carga is not None:
+                # la carga en curso puede haber leído la fila antes del cambio
+                carga.pendientes.append(fila)
+            ranking = self._rankings.get(vacante_id)
+            if ranking is None:
+                return None
+            self._rankings.move_to_end(vacante_id)
+            anterior = ranking.posicion(fila['postulacion_id'])
+            ranking.actualizar(fila)
+            return anterior
+
+    def invalidar(self, vacante_id=None):
+        with self._lock:
+            if vacante_id is None:
+                self._rankings.clear()
+                cargas = list(self._cargas.values())
+            else:
+                self._rankings.pop(vacante_id, None)
+                cargas = [self._cargas[vacante_id]] if vacante_id in self._cargas else []
+            for carga in cargas:
+                # lo leído puede ser anterior a la invalidación: no se guarda
+                carga.invalidada = True
+
+    def total(self, vacante_id):
+        with self._lock:
+            ranking = self._rankings.get(vacante_id)
+            return len(ranking) if ranking is not None else None
+
+    def pagina(self, vacante_id, offset=0, limite=50):
+        ranking = self.obtener(vacante_id)
+        if ranking is None:
+            return None, [], 0
+        with self._lock:
+            return ranking.vacante, ranking.pagina(offset, limite), len(ranking)
+
+    def posicion(self, vacante_id, postulacion_id, cargar=True):
+        """Con `cargar=False` no lee la BD: None si el ranking no está en memoria."""
+        if cargar:
+            ranking = self.obtener(vacante_id)
+        else:
+            with self._lock:
+                ranking = self._rankings.get(vacante_id)
+        if ranking is None:
+            return None
+        with self._lock:
+            return ranking.posicion(postulacion_id)
+
+    def top(self, vacante_ids, k=5):
+        """Top-k de cada vacante y top-k entre todas.
+
+        Devuelve ({vacante_id: filas}, [(vacante_id, fila), ...]). Los
+        rankings ya cargados y vigentes se leen de memoria; el resto se pide
+        con `cargador_top` (k filas por vacante) sin cargar ni guardar su
+        ranking completo, así el dashboard no depende del total de
+        postulaciones. El general mezcla con un heap los top-k por vacante,
+        que ya vienen ordenados.
+        """
+        por_vacante = {}
+        faltan = []
+        with self._lock:
+            for vacante_id in vacante_ids:
+                ranking = self._en_memoria(vacante_id)
+                if ranking is not None:
+                    por_vacante[vacante_id] = ranking.pagina(0, k)
+                else:
+                    faltan.append(vacante_id)
+        if faltan and self._cargador_top is not None:
+            leidos = self._cargador_top(faltan, k)
+            por_vacante.update((vacante_id, leidos.get(vacante_id, [])) for vacante_id in faltan)
+        else:
+            for vacante_id in faltan:
+                ranking = self.obtener(vacante_id)
+                if ranking is not None:
+                    with self._lock:
+                        por_vacante[vacante_id] = ranking.pagina(0, k)
+        por_vacante = {vacante_id: por_vacante[vacante_id] for vacante_id in vacante_ids if vacante_id in por_vacante}
+        listas = ([(clave_ranking(fila), vacante_id, fila) for fila in filas]
+                  for vacante_id, filas in por_vacante.items())
+        general = [(vacante_id, fila) for _, vacante_id, fila in islice(heapq.merge(*listas), k)]
+        return por_vacante, general
@@ -0,0 +1,119 @@
+"""Buffer de eventos de auditoría generados por la app (no por la BD).
+
+`registrar()` solo agrega el evento a memoria; un hilo lo escribe en
+logs_auditoria con INSERT multi-fila cuando se juntan `tamano_lote` eventos
+o pasan `intervalo` segundos. La fecha se toma al registrar, no al escribir.
+`detener()` (registrado con atexit en app.py) escribe lo pendiente antes de
+salir. Si la BD falla los eventos vuelven al buffer y se reintenta en el
+próximo ciclo; pasada la `capacidad` se descartan los más viejos y se
+cuentan en `descartados`.
+"""
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+
+log = logging.getLogger(__name__)
+
+SQL_INSERTAR = (
+    'INSERT INTO logs_auditoria (usuario_mysql, accion, tabla_afectada, fila_id, fecha, descripcion) '
+    'VALUES (%s, %s, %s, %s, %s, %s)'
+)
+
+
+class BufferAuditoria:
+    def __init__(self, escribir, tamano_lote=200, intervalo=2.0, capacidad=50000):
+        """`escribir(filas)` inserta una lista de tuplas con el orden de SQL_INSERTAR."""
+        self._escribir = escribir
+        self._tamano_lote = tamano_lote
+        self._intervalo = intervalo
+        self._capacidad = capacidad
+        self._eventos = deque()
+        self._lock = threading.Lock()
+        self._lock_escritura = threading.Lock()
+        self._hay_lote = threading.Event()
+        self._detener = threading.Event()
+        self._hilo = None
+        self.escritos = 0
+        self.descartados = 0
+        self.fallos = 0
+
+    def iniciar(self):
+        with self._lock:
+            if self._hilo is not None:
+                return
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._trabajar, name='auditoria', daemon=True)
+            self._hilo.start()
+
+    def detener(self, timeout=5.0):
+        """Detiene el hilo y escribe lo que quede en el buffer."""
+        self._detener.set()
+        self._hay_lote.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+            self._hilo = None
+        try:
+            self.vaciar()
+        except Exception:
+            log.exception('No se pudieron escribir %d eventos de auditoría al salir', len(self))
+
+    def registrar(self, usuario, accion, tabla, fila_id=None, descripcion=None, fecha=None):
+        evento = (usuario, accion, tabla, None if fila_id is None else str(fila_id),
+                  fecha or datetime.now(), descripcion)
+        with self._lock:
+            if len(self._eventos) >= self._capacidad:
+                self._eventos.popleft()
+                self.descartados += 1
+            self._eventos.append(evento)
+            completo = len(self._eventos) >= self._tamano_lote
+        if completo:
+            self._hay_lote.set()
+        if self._hilo is None:
+            self.iniciar()
+
+    def vaciar(self):
+        """Escribe todo lo pendiente en bloques de `tamano_lote`. Devuelve cuántos escribió."""
+        with self._lock_escritura:
+            escritos = 0
+            while True:
+                with self._lock:
+                    lote = [self._eventos.popleft() for _ in range(min(self._tamano_lote, len(self._eventos)))]
+                if not lote:
+                    return escritos
+                try:
+                    self._escribir(lote)
+                except Exception:
+                    self.fallos += 1
+                    with self._lock:
+                        # devolver al frente, en orden, sin pasar la capacidad
+                        espacio = self._capacidad - len(self._eventos)
+                        if espacio < len(lote):
+                            self.descartados += len(lote) - max(espacio, 0)
+                            lote = lote[len(lote) - max(espacio, 0):]
+                        self._eventos.extendleft(reversed(lote))
+                    raise
+                escritos += len(lote)
+                self.escritos += len(lote)
+
+    def __len__(self):
+        return len(self._eventos)
+
+    def estadisticas(self):
+        return {
+            'pendientes': len(self),
+            'escritos': self.escritos,
+            'descartados': self.descartados,
+            'fallos': self.fallos,
+        }
+
+    def _trabajar(self):
+        while not self._detener.is_set():
+            self._hay_lote.wait(self._intervalo)
+            self._hay_lote.clear()
+            if self._detener.is_set():
+                break
+            try:
+                self.vaciar()
+            except Exception:
+                log.exception('Fallo al escribir eventos de auditoría; se reintentará')
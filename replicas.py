@@ -0,0 +1,143 @@
+"""Réplicas de lectura de MySQL.
+
+`Replicas` reparte lecturas entre varios engines (uno por réplica) en
+ronda, solo entre las sanas. Un hilo revisa cada `intervalo` segundos cada
+réplica con SHOW REPLICA STATUS (SHOW SLAVE STATUS en MySQL anterior a
+8.0.22 y MariaDB anterior a 10.5.1, que no conocen la forma nueva): está
+sana si responde y, cuando replica de un primario, si la replicación corre
+con un retraso de hasta `max_retraso` segundos. Una instancia sin replicación configurada (p. ej. una segunda
+base local para pruebas) devuelve el estado vacío y cuenta como sana con
+retraso 0. La app también marca caída una réplica a la que no pudo
+conectarse (`marcar_caida`), sin esperar al próximo chequeo.
+
+Qué se lee de una réplica y cuándo se usa el primario lo decide app.py.
+"""
+import logging
+import threading
+from itertools import count
+
+log = logging.getLogger(__name__)
+
+SQL_ESTADO = 'SHOW REPLICA STATUS'
+SQL_ESTADO_ANTERIOR = 'SHOW SLAVE STATUS'
+# ER_PARSE_ERROR: la versión no conoce SHOW REPLICA STATUS
+ERROR_SINTAXIS = 1064
+# MySQL 8.0.22+ usa Source; versiones anteriores y MariaDB, Master
+COLUMNAS_RETRASO = ('Seconds_Behind_Source', 'Seconds_Behind_Master')
+
+
+class Replica:
+    __slots__ = ('nombre', 'engine', 'sana', 'retraso', 'error', 'lecturas', 'sql_estado')
+
+    def __init__(self, nombre, engine):
+        self.nombre = nombre
+        self.engine = engine
+        self.sana = True  # hasta el primer chequeo
+        self.retraso = None
+        self.error = None
+        self.lecturas = 0
+        self.sql_estado = SQL_ESTADO
+
+
+class Replicas:
+    def __init__(self, motores, intervalo=5.0, max_retraso=30):
+        """`motores`: {nombre: engine}, p. ej. {'10.0.0.2:3306': engine}."""
+        self._replicas = [Replica(nombre, engine) for nombre, engine in motores.items()]
+        self._intervalo = intervalo
+        self._max_retraso = max_retraso
+        self._turno = count()
+        self._lock = threading.Lock()
+        self._hilo = None
+        self._detener = threading.Event()
+
+    def __len__(self):
+        return len(self._replicas)
+
+    def __iter__(self):
+        return iter(self._replicas)
+
+    def iniciar(self):
+        with self._lock:
+            if self._hilo is not None or not self._replicas:
+                return
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._vigilar, name='replicas', daemon=True)
+            self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(self._intervalo)
+            self._hilo = None
+
+    def elegir(self):
+        """Réplica sana siguiente en la ronda, o None si no hay ninguna."""
+        self.iniciar()
+        sanas = [r for r in self._replicas if r.sana]
+        if not sanas:
+            return None
+        replica = sanas[next(self._turno) % len(sanas)]
+        replica.lecturas += 1
+        return replica
+
+    def marcar_caida(self, replica, error):
+        if replica.sana:
+            log.warning('Réplica %s fuera de servicio: %s', replica.nombre, error)
+        replica.sana = False
+        replica.error = str(error)
+
+    def chequear(self):
+        for replica in self._replicas:
+            try:
+                retraso = self._retraso(replica)
+            except Exception as e:
+                self.marcar_caida(replica, e)
+                continue
+            replica.retraso = retraso
+            if retraso is None:
+                self.marcar_caida(replica, 'replicación detenida')
+            elif retraso > self._max_retraso:
+                self.marcar_caida(replica, f'retraso de {retraso} s')
+            else:
+                if not replica.sana:
+                    log.info('Réplica %s de nuevo en servicio', replica.nombre)
+                replica.sana = True
+                replica.error = None
+
+    def _retraso(self, replica):
+        """Segundos de retraso; 0 si la instancia no replica de otra y None
+        si la replicación está detenida."""
+        conn = replica.engine.raw_connection()
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(replica.sql_estado)
+            except Exception as e:
+                if replica.sql_estado == SQL_ESTADO_ANTERIOR or not e.args or e.args[0] != ERROR_SINTAXIS:
+                    raise
+                replica.sql_estado = SQL_ESTADO_ANTERIOR
+                cursor.execute(replica.sql_estado)
+            fila = cursor.fetchone()
+            columnas = [d[0] for d in cursor.description or ()]
+            cursor.close()
+        finally:
+            conn.close()
+        if fila is None:
+            return 0
+        estado = dict(zip(columnas, fila))
+        for columna in COLUMNAS_RETRASO:
+            if columna in estado:
+                return estado[columna]
+        return 0
+
+    def _vigilar(self):
+        while not self._detener.is_set():
+            try:
+                self.chequear()
+            except Exception:
+                log.exception('Error revisando réplicas')
+            self._detener.wait(self._intervalo)
+
+    def estado(self):
+        return [{'replica': r.nombre, 'sana': r.sana, 'retraso': r.retraso, 'error': r.error,
+                 'lecturas': r.lecturas} for r in self._replicas]
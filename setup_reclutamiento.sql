@@ -1,6 +1,7 @@
 -- Script: Sistema Inteligente de Reclutamiento para PYME
 -- Fecha: 2026-02-11
 -- Objetivo: crear BDD, tablas, roles, usuarios, funciones, SP, triggers, vistas y auditoría
+-- Cambios posteriores: migraciones/ (aplicar con `flask migrar` después de este script)
 
 DROP DATABASE IF EXISTS reclutamiento;
 CREATE DATABASE reclutamiento CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
@@ -58,7 +59,10 @@ CREATE TABLE vacantes (
   activo TINYINT(1) DEFAULT 1,
   creado_en DATETIME DEFAULT CURRENT_TIMESTAMP,
   actualizado_en DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-  FOREIGN KEY (departamento_id) REFERENCES departamentos(id) ON UPDATE CASCADE ON DELETE RESTRICT
+  FOREIGN KEY (departamento_id) REFERENCES departamentos(id) ON UPDATE CASCADE ON DELETE RESTRICT,
+  -- índices para el listado paginado (keyset sobre creado_en, id)
+  INDEX ix_vacantes_activo_creado (activo, creado_en, id),
+  INDEX ix_vacantes_dep_activo_creado (departamento_id, activo, creado_en, id)
 );
 
 CREATE TABLE postulantes (
@@ -68,7 +72,23 @@ CREATE TABLE postulantes (
   anos_experiencia INT DEFAULT 0,
   habilidades JSON DEFAULT (JSON_ARRAY()),
   cv_path VARCHAR(500) DEFAULT NULL,
-  creado_en DATETIME DEFAULT CURRENT_TIMESTAMP
+  -- habilidades encontradas en el CV (extraccion_cv.py); NULL = sin extraer
+  habilidades_cv JSON DEFAULT NULL,
+  creado_en DATETIME DEFAULT CURRENT_TIMESTAMP,
+  actualizado_en DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  INDEX ix_postulantes_cv_path (cv_path)
+);
+
+-- Texto extraído de cada CV, por hash del archivo: un CV ya leído no se
+-- vuelve a procesar (las habilidades se recalculan del texto con el
+-- vocabulario vigente de vacantes.requerimientos)
+CREATE TABLE cv_extracciones (
+  hash CHAR(64) PRIMARY KEY,
+  texto MEDIUMTEXT,
+  caracteres INT NOT NULL DEFAULT 0,
+  error VARCHAR(255) DEFAULT NULL,
+  segundos DECIMAL(8,3) DEFAULT NULL,
+  extraido_en DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
 CREATE TABLE postulaciones (
@@ -113,11 +133,66 @@ CREATE TABLE usuarios (
 CREATE TABLE logs_auditoria (
   id BIGINT AUTO_INCREMENT PRIMARY KEY,
   usuario_mysql VARCHAR(200) NULL,
-  accion ENUM('INSERT','UPDATE','DELETE','SP') NOT NULL,
+  accion ENUM('INSERT','UPDATE','DELETE','SP','APP') NOT NULL,
   tabla_afectada VARCHAR(200),
   fila_id VARCHAR(200),
   fecha DATETIME DEFAULT CURRENT_TIMESTAMP,
-  descripcion TEXT
+  descripcion TEXT,
+  INDEX ix_logs_fecha (fecha, id),
+  INDEX ix_logs_usuario_fecha (usuario_mysql, fecha, id),
+  INDEX ix_logs_accion_fecha (accion, fecha, id),
+  INDEX ix_logs_tabla_fila_fecha (tabla_afectada, fila_id, fecha, id)
+);
+
+-- Logs archivados por sp_archivar_logs (misma forma; solo se consultan por fila)
+CREATE TABLE logs_auditoria_historico (
+  id BIGINT PRIMARY KEY,
+  usuario_mysql VARCHAR(200) NULL,
+  accion ENUM('INSERT','UPDATE','DELETE','SP','APP') NOT NULL,
+  tabla_afectada VARCHAR(200),
+  fila_id VARCHAR(200),
+  fecha DATETIME,
+  descripcion TEXT,
+  INDEX ix_logs_hist_tabla_fila_fecha (tabla_afectada, fila_id, fecha)
+);
+
+-- Acumulados para reportes, mantenidos por triggers (trg_rep_*) y
+-- reconstruibles con sp_reconstruir_reportes
+CREATE TABLE rep_vacantes_mes (
+  mes CHAR(7) PRIMARY KEY,
+  total INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE rep_vacante (
+  vacante_id INT PRIMARY KEY,
+  departamento_id INT NOT NULL,
+  total_postulaciones INT NOT NULL DEFAULT 0,
+  evaluadas INT NOT NULL DEFAULT 0,
+  suma_score DECIMAL(14,2) NOT NULL DEFAULT 0,
+  INDEX ix_rep_vacante_total (total_postulaciones)
+);
+
+CREATE TABLE rep_departamento (
+  departamento_id INT PRIMARY KEY,
+  total_postulaciones INT NOT NULL DEFAULT 0,
+  evaluadas INT NOT NULL DEFAULT 0,
+  suma_score DECIMAL(14,2) NOT NULL DEFAULT 0
+);
+
+CREATE TABLE rep_general (
+  id TINYINT PRIMARY KEY DEFAULT 1,
+  total_vacantes INT NOT NULL DEFAULT 0,
+  total_postulantes INT NOT NULL DEFAULT 0
+);
+INSERT INTO rep_general (id) VALUES (1);
+
+-- Conteo mensual de los logs archivados, por tabla y acción
+CREATE TABLE logs_auditoria_mensual (
+  mes CHAR(7) NOT NULL,
+  tabla_afectada VARCHAR(200) NOT NULL DEFAULT '',
+  accion ENUM('INSERT','UPDATE','DELETE','SP','APP') NOT NULL,
+  total INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (mes, tabla_afectada, accion)
 );
 
 -- FUNCTION: calcular score simple
@@ -131,6 +206,29 @@ BEGIN
 END$$
 DELIMITER ;
 
+-- FUNCTION: habilidades declaradas más las del CV que no estén ya en la lista
+-- (sin repetir, para no contar dos veces la misma coincidencia)
+DELIMITER $$
+CREATE FUNCTION fn_habilidades_efectivas(p_habilidades JSON, p_habilidades_cv JSON) RETURNS JSON
+DETERMINISTIC
+BEGIN
+  DECLARE v_resultado JSON DEFAULT IFNULL(p_habilidades, JSON_ARRAY());
+  DECLARE v_idx INT DEFAULT 0;
+  DECLARE v_skill VARCHAR(200);
+  loop_cv: LOOP
+    SET v_skill = JSON_UNQUOTE(JSON_EXTRACT(p_habilidades_cv, CONCAT('$[', v_idx, ']')));
+    IF v_skill IS NULL THEN
+      LEAVE loop_cv;
+    END IF;
+    IF JSON_SEARCH(v_resultado, 'one', v_skill) IS NULL THEN
+      SET v_resultado = JSON_ARRAY_APPEND(v_resultado, '$', v_skill);
+    END IF;
+    SET v_idx = v_idx + 1;
+  END LOOP loop_cv;
+  RETURN v_resultado;
+END$$
+DELIMITER ;
+
 -- PROCEDIMIENTO: obtener línea de tiempo de una postulación
 DELIMITER $$
 CREATE PROCEDURE sp_postulacion_timeline(IN p_postulacion_id INT)
@@ -140,6 +238,11 @@ BEGIN
   SELECT 'evaluacion', actualizado_en, NULL FROM evaluacion_ia WHERE postulacion_id = p_postulacion_id
   UNION ALL
   SELECT accion AS estado, fecha, usuario_mysql FROM logs_auditoria WHERE tabla_afectada='postulaciones' AND fila_id = CAST(p_postulacion_id AS CHAR)
+  UNION ALL
+  SELECT accion, fecha, usuario_mysql FROM logs_auditoria_historico WHERE tabla_afectada='postulaciones' AND fila_id = CAST(p_postulacion_id AS CHAR)
+  UNION ALL
+  SELECT 'cerrada', v.actualizado_en, NULL FROM postulaciones po JOIN vacantes v ON v.id = po.vacante_id
+  WHERE po.id = p_postulacion_id AND v.estado = 'cerrada'
   ORDER BY fecha;
 END$$
 DELIMITER ;
@@ -152,19 +255,40 @@ BEGIN
   DECLARE v_anos INT DEFAULT 0;
   DECLARE v_coincidencias INT DEFAULT 0;
   DECLARE v_score DECIMAL(6,2) DEFAULT 0;
+  DECLARE v_hab_json JSON;
+  DECLARE v_req_json JSON;
+  DECLARE v_idx INT DEFAULT 0;
+  DECLARE v_skill VARCHAR(200);
   SELECT postulante_id INTO v_postulante FROM postulaciones WHERE id = p_postulacion_id;
   IF v_postulante IS NULL THEN
     SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Postulación no encontrada';
   END IF;
-  SELECT anos_experiencia INTO v_anos FROM postulantes WHERE id = v_postulante;
-  -- aproximación simple: no contar coincidencias avanzadas
+  -- mismas coincidencias que sp_crear_postulacion (habilidades presentes en requerimientos)
+  SELECT pt.anos_experiencia, fn_habilidades_efectivas(pt.habilidades, pt.habilidades_cv), v.requerimientos
+    INTO v_anos, v_hab_json, v_req_json
+    FROM postulaciones po
+    JOIN postulantes pt ON pt.id = po.postulante_id
+    JOIN vacantes v ON v.id = po.vacante_id
+    WHERE po.id = p_postulacion_id;
   SET v_coincidencias = 0;
+  loop_coinc: LOOP
+    SET v_skill = JSON_UNQUOTE(JSON_EXTRACT(v_hab_json, CONCAT('$[', v_idx, ']')));
+    IF v_skill IS NULL THEN
+      LEAVE loop_coinc;
+    END IF;
+    IF JSON_SEARCH(v_req_json, 'one', v_skill) IS NOT NULL THEN
+      SET v_coincidencias = v_coincidencias + 1;
+    END IF;
+    SET v_idx = v_idx + 1;
+  END LOOP loop_coinc;
   SET v_score = fn_calcular_score(IFNULL(v_anos,0), v_coincidencias);
   -- actualizar o insertar en evaluacion_ia
   INSERT INTO evaluacion_ia (postulacion_id, score, criterios) VALUES (p_postulacion_id, v_score, JSON_OBJECT('metodo','recalculo'))
     ON DUPLICATE KEY UPDATE score = v_score, criterios = JSON_OBJECT('metodo','recalculo'), actualizado_en = CURRENT_TIMESTAMP;
   INSERT INTO logs_auditoria (usuario_mysql, accion, tabla_afectada, fila_id, descripcion)
     VALUES (CURRENT_USER(), 'UPDATE', 'evaluacion_ia', CAST(p_postulacion_id AS CHAR), CONCAT('sp_recalcular_score: ', v_score));
+  -- devolver la fila de ranking actualizada
+  CALL sp_ranking_fila(p_postulacion_id);
 END$$
 DELIMITER ;
 
@@ -172,24 +296,167 @@ DELIMITER ;
 DELIMITER $$
 CREATE PROCEDURE sp_report_vacantes_por_mes()
 BEGIN
-  SELECT DATE_FORMAT(creado_en, '%Y-%m') AS mes, COUNT(*) AS total FROM vacantes GROUP BY mes ORDER BY mes;
+  SELECT mes, total FROM rep_vacantes_mes WHERE total > 0 ORDER BY mes;
 END$$
 
 CREATE PROCEDURE sp_report_postulantes_por_vacante()
 BEGIN
-  SELECT v.id AS vacante_id, v.titulo, COUNT(po.id) AS total_postulantes
-  FROM vacantes v LEFT JOIN postulaciones po ON po.vacante_id = v.id
-  GROUP BY v.id ORDER BY total_postulantes DESC;
+  SELECT v.id AS vacante_id, v.titulo, r.total_postulaciones AS total_postulantes
+  FROM rep_vacante r JOIN vacantes v ON v.id = r.vacante_id
+  ORDER BY r.total_postulaciones DESC;
 END$$
 
 CREATE PROCEDURE sp_report_promedio_score_por_departamento()
 BEGIN
-  SELECT d.id AS departamento_id, d.nombre, ROUND(AVG(e.score),2) AS promedio_score
-  FROM departamentos d
-  JOIN vacantes v ON v.departamento_id = d.id
-  JOIN postulaciones po ON po.vacante_id = v.id
-  JOIN evaluacion_ia e ON e.postulacion_id = po.id
-  GROUP BY d.id ORDER BY promedio_score DESC;
+  SELECT d.id AS departamento_id, d.nombre, ROUND(r.suma_score / r.evaluadas, 2) AS promedio_score
+  FROM rep_departamento r JOIN departamentos d ON d.id = r.departamento_id
+  WHERE r.evaluadas > 0
+  ORDER BY promedio_score DESC;
+END$$
+
+-- Recalcula todos los acumulados rep_* desde las tablas base (tras cargas
+-- masivas o si se desalinean). Los triggers trg_rep_* los mantienen luego.
+CREATE PROCEDURE sp_reconstruir_reportes()
+BEGIN
+  START TRANSACTION;
+  DELETE FROM rep_vacantes_mes;
+  INSERT INTO rep_vacantes_mes (mes, total)
+    SELECT DATE_FORMAT(creado_en, '%Y-%m'), COUNT(*) FROM vacantes GROUP BY DATE_FORMAT(creado_en, '%Y-%m');
+  DELETE FROM rep_vacante;
+  INSERT INTO rep_vacante (vacante_id, departamento_id, total_postulaciones, evaluadas, suma_score)
+    SELECT v.id, v.departamento_id, COUNT(po.id), COUNT(e.id), IFNULL(SUM(e.score), 0)
+    FROM vacantes v
+    LEFT JOIN postulaciones po ON po.vacante_id = v.id
+    LEFT JOIN evaluacion_ia e ON e.postulacion_id = po.id
+    GROUP BY v.id, v.departamento_id;
+  DELETE FROM rep_departamento;
+  INSERT INTO rep_departamento (departamento_id, total_postulaciones, evaluadas, suma_score)
+    SELECT departamento_id, SUM(total_postulaciones), SUM(evaluadas), SUM(suma_score)
+    FROM rep_vacante GROUP BY departamento_id;
+  UPDATE rep_general SET total_vacantes = (SELECT COUNT(*) FROM vacantes),
+                         total_postulantes = (SELECT COUNT(*) FROM postulantes)
+    WHERE id = 1;
+  COMMIT;
+  SELECT (SELECT COUNT(*) FROM rep_vacante) AS vacantes, (SELECT COUNT(*) FROM rep_departamento) AS departamentos;
+END$$
+DELIMITER ;
+
+-- Triggers que mantienen los acumulados rep_*. Solo tocan la fila de la
+-- vacante y la de su departamento; las borradas en cascada de evaluacion_ia
+-- no disparan triggers, por eso se descuentan en trg_rep_postulaciones_bd.
+DELIMITER $$
+CREATE TRIGGER trg_rep_vacantes_ai AFTER INSERT ON vacantes
+FOR EACH ROW
+BEGIN
+  INSERT INTO rep_vacantes_mes (mes, total) VALUES (DATE_FORMAT(NEW.creado_en, '%Y-%m'), 1)
+    ON DUPLICATE KEY UPDATE total = total + 1;
+  INSERT INTO rep_vacante (vacante_id, departamento_id) VALUES (NEW.id, NEW.departamento_id);
+  UPDATE rep_general SET total_vacantes = total_vacantes + 1 WHERE id = 1;
+END$$
+
+CREATE TRIGGER trg_rep_vacantes_au AFTER UPDATE ON vacantes
+FOR EACH ROW
+BEGIN
+  DECLARE v_total INT;
+  DECLARE v_evaluadas INT;
+  DECLARE v_suma DECIMAL(14,2);
+  IF NEW.departamento_id <> OLD.departamento_id THEN
+    SELECT total_postulaciones, evaluadas, suma_score INTO v_total, v_evaluadas, v_suma
+      FROM rep_vacante WHERE vacante_id = NEW.id;
+    UPDATE rep_vacante SET departamento_id = NEW.departamento_id WHERE vacante_id = NEW.id;
+    UPDATE rep_departamento SET total_postulaciones = total_postulaciones - v_total,
+      evaluadas = evaluadas - v_evaluadas, suma_score = suma_score - v_suma
+      WHERE departamento_id = OLD.departamento_id;
+    INSERT INTO rep_departamento (departamento_id, total_postulaciones, evaluadas, suma_score)
+      VALUES (NEW.departamento_id, v_total, v_evaluadas, v_suma)
+      ON DUPLICATE KEY UPDATE total_postulaciones = total_postulaciones + v_total,
+        evaluadas = evaluadas + v_evaluadas, suma_score = suma_score + v_suma;
+  END IF;
+END$$
+
+CREATE TRIGGER trg_rep_vacantes_ad AFTER DELETE ON vacantes
+FOR EACH ROW
+BEGIN
+  UPDATE rep_vacantes_mes SET total = total - 1 WHERE mes = DATE_FORMAT(OLD.creado_en, '%Y-%m');
+  DELETE FROM rep_vacante WHERE vacante_id = OLD.id;
+  UPDATE rep_general SET total_vacantes = total_vacantes - 1 WHERE id = 1;
+END$$
+
+CREATE TRIGGER trg_rep_postulantes_ai AFTER INSERT ON postulantes
+FOR EACH ROW
+BEGIN
+  UPDATE rep_general SET total_postulantes = total_postulantes + 1 WHERE id = 1;
+END$$
+
+CREATE TRIGGER trg_rep_postulantes_ad AFTER DELETE ON postulantes
+FOR EACH ROW
+BEGIN
+  UPDATE rep_general SET total_postulantes = total_postulantes - 1 WHERE id = 1;
+END$$
+
+CREATE TRIGGER trg_rep_postulaciones_ai AFTER INSERT ON postulaciones
+FOR EACH ROW
+BEGIN
+  DECLARE v_dep INT;
+  SELECT departamento_id INTO v_dep FROM vacantes WHERE id = NEW.vacante_id;
+  UPDATE rep_vacante SET total_postulaciones = total_postulaciones + 1 WHERE vacante_id = NEW.vacante_id;
+  INSERT INTO rep_departamento (departamento_id, total_postulaciones) VALUES (v_dep, 1)
+    ON DUPLICATE KEY UPDATE total_postulaciones = total_postulaciones + 1;
+END$$
+
+CREATE TRIGGER trg_rep_postulaciones_bd BEFORE DELETE ON postulaciones
+FOR EACH ROW
+BEGIN
+  DECLARE v_dep INT;
+  DECLARE v_score DECIMAL(6,2) DEFAULT NULL;
+  DECLARE v_evaluada INT DEFAULT 0;
+  SELECT departamento_id INTO v_dep FROM vacantes WHERE id = OLD.vacante_id;
+  SELECT score, 1 INTO v_score, v_evaluada FROM evaluacion_ia WHERE postulacion_id = OLD.id;
+  UPDATE rep_vacante SET total_postulaciones = total_postulaciones - 1, evaluadas = evaluadas - v_evaluada,
+    suma_score = suma_score - IFNULL(v_score, 0) WHERE vacante_id = OLD.vacante_id;
+  UPDATE rep_departamento SET total_postulaciones = total_postulaciones - 1, evaluadas = evaluadas - v_evaluada,
+    suma_score = suma_score - IFNULL(v_score, 0) WHERE departamento_id = v_dep;
+END$$
+
+CREATE TRIGGER trg_rep_evaluacion_ai AFTER INSERT ON evaluacion_ia
+FOR EACH ROW
+BEGIN
+  DECLARE v_vacante INT;
+  DECLARE v_dep INT;
+  SELECT po.vacante_id, v.departamento_id INTO v_vacante, v_dep
+    FROM postulaciones po JOIN vacantes v ON v.id = po.vacante_id WHERE po.id = NEW.postulacion_id;
+  UPDATE rep_vacante SET evaluadas = evaluadas + 1, suma_score = suma_score + IFNULL(NEW.score, 0)
+    WHERE vacante_id = v_vacante;
+  UPDATE rep_departamento SET evaluadas = evaluadas + 1, suma_score = suma_score + IFNULL(NEW.score, 0)
+    WHERE departamento_id = v_dep;
+END$$
+
+CREATE TRIGGER trg_rep_evaluacion_au AFTER UPDATE ON evaluacion_ia
+FOR EACH ROW
+BEGIN
+  DECLARE v_vacante INT;
+  DECLARE v_dep INT;
+  IF NOT (NEW.score <=> OLD.score) THEN
+    SELECT po.vacante_id, v.departamento_id INTO v_vacante, v_dep
+      FROM postulaciones po JOIN vacantes v ON v.id = po.vacante_id WHERE po.id = NEW.postulacion_id;
+    UPDATE rep_vacante SET suma_score = suma_score + IFNULL(NEW.score, 0) - IFNULL(OLD.score, 0)
+      WHERE vacante_id = v_vacante;
+    UPDATE rep_departamento SET suma_score = suma_score + IFNULL(NEW.score, 0) - IFNULL(OLD.score, 0)
+      WHERE departamento_id = v_dep;
+  END IF;
+END$$
+
+CREATE TRIGGER trg_rep_evaluacion_ad AFTER DELETE ON evaluacion_ia
+FOR EACH ROW
+BEGIN
+  DECLARE v_vacante INT;
+  DECLARE v_dep INT;
+  SELECT po.vacante_id, v.departamento_id INTO v_vacante, v_dep
+    FROM postulaciones po JOIN vacantes v ON v.id = po.vacante_id WHERE po.id = OLD.postulacion_id;
+  UPDATE rep_vacante SET evaluadas = evaluadas - 1, suma_score = suma_score - IFNULL(OLD.score, 0)
+    WHERE vacante_id = v_vacante;
+  UPDATE rep_departamento SET evaluadas = evaluadas - 1, suma_score = suma_score - IFNULL(OLD.score, 0)
+    WHERE departamento_id = v_dep;
 END$$
 DELIMITER ;
 
@@ -271,7 +538,7 @@ BEGIN
   -- calcular score inicial: extraer anos y comparar habilidades
   SELECT anos_experiencia INTO v_anos FROM postulantes WHERE id = p_postulante_id;
   -- Contar coincidencias entre habilidades y requerimientos usando JSON_SEARCH (compatible en MySQL 8+)
-  SELECT pt.habilidades, v.requerimientos INTO v_hab_json, v_req_json
+  SELECT fn_habilidades_efectivas(pt.habilidades, pt.habilidades_cv), v.requerimientos INTO v_hab_json, v_req_json
     FROM postulantes pt JOIN vacantes v ON v.id = p_vacante_id WHERE pt.id = p_postulante_id;
   SET v_coincidencias = 0;
   SET v_idx = 0;
@@ -291,6 +558,36 @@ BEGIN
   -- auditoría
   INSERT INTO logs_auditoria (usuario_mysql, accion, tabla_afectada, fila_id, descripcion)
     VALUES (p_usuario, 'SP', 'postulaciones', @last_postulacion_id, CONCAT('sp_crear_postulacion: puntaje inicial=', v_score));
+  -- devolver la fila de ranking de la nueva postulación
+  CALL sp_ranking_fila(@last_postulacion_id);
+END$$
+DELIMITER ;
+
+-- PROCEDURE: registrar postulación sin evaluarla (modo asíncrono: la app
+-- calcula el score en segundo plano y lo escribe en evaluacion_ia)
+DELIMITER $$
+CREATE PROCEDURE sp_registrar_postulacion(
+  IN p_postulante_id INT,
+  IN p_vacante_id INT,
+  IN p_usuario VARCHAR(150)
+)
+BEGIN
+  DECLARE v_activo INT DEFAULT 0;
+  DECLARE v_usuario_id INT DEFAULT NULL;
+  DECLARE v_id INT;
+  SELECT activo INTO v_activo FROM vacantes WHERE id = p_vacante_id;
+  IF v_activo IS NULL OR v_activo = 0 THEN
+    SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Vacante no existe o no está activa';
+  END IF;
+  IF fn_validar_postulante(p_postulante_id, p_vacante_id) = FALSE THEN
+    SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Postulante inválido o ya postuló';
+  END IF;
+  SELECT id INTO v_usuario_id FROM usuarios WHERE username = p_usuario LIMIT 1;
+  INSERT INTO postulaciones (postulante_id, vacante_id, usuario_creo, usuario_id)
+    VALUES (p_postulante_id, p_vacante_id, p_usuario, v_usuario_id);
+  SET v_id = LAST_INSERT_ID();
+  -- fila de ranking sin score (evaluación pendiente)
+  CALL sp_ranking_fila(v_id);
 END$$
 DELIMITER ;
 
@@ -308,6 +605,20 @@ BEGIN
 END$$
 DELIMITER ;
 
+-- PROCEDURE: una fila del ranking (misma forma que sp_generar_ranking + vacante_id),
+-- usada por la app para mantener el ranking en memoria sin recalcularlo entero
+DELIMITER $$
+CREATE PROCEDURE sp_ranking_fila(IN p_postulacion_id INT)
+BEGIN
+  SELECT po.id AS postulacion_id, po.vacante_id, pt.id AS postulante_id, pt.nombre AS postulante_nombre,
+         e.score, e.criterios, po.fecha_postulacion
+  FROM postulaciones po
+  JOIN postulantes pt ON pt.id = po.postulante_id
+  LEFT JOIN evaluacion_ia e ON e.postulacion_id = po.id
+  WHERE po.id = p_postulacion_id;
+END$$
+DELIMITER ;
+
 -- PROCEDURE: cerrar vacante (cambia estado y registra auditoría)
 DELIMITER $$
 CREATE PROCEDURE sp_cerrar_vacante(IN p_vacante_id INT, IN p_usuario VARCHAR(150))
@@ -334,11 +645,13 @@ LEFT JOIN evaluacion_ia e ON e.postulacion_id = po.id
 WHERE v.activo = 1 AND v.estado = 'abierta'
 ORDER BY v.id, score DESC;
 
+-- Lee los acumulados rep_* (una fila y una suma sobre los departamentos)
 CREATE VIEW vista_reporte_general AS
 SELECT
-  (SELECT COUNT(*) FROM vacantes) AS total_vacantes,
-  (SELECT COUNT(*) FROM postulantes) AS total_postulantes,
-  (SELECT ROUND(AVG(score),2) FROM evaluacion_ia) AS promedio_score
+  g.total_vacantes,
+  g.total_postulantes,
+  (SELECT ROUND(SUM(suma_score) / NULLIF(SUM(evaluadas), 0), 2) FROM rep_departamento) AS promedio_score
+FROM rep_general g WHERE g.id = 1
 ;
 
 CREATE VIEW vista_auditoria AS
@@ -352,6 +665,80 @@ CREATE PROCEDURE sp_listar_logs()
 BEGIN
   SELECT id, usuario_mysql, accion, tabla_afectada, fila_id, fecha, descripcion FROM logs_auditoria ORDER BY fecha DESC LIMIT 500;
 END$$
+
+-- Búsqueda de logs con filtros en la BD y cursor (fecha, id) en lugar de OFFSET.
+-- Solo se agregan al WHERE los filtros presentes, así el optimizador elige el
+-- índice que corresponde (ix_logs_*) y el costo depende de la página, no del
+-- tamaño de la tabla. Usuario: prefijo (p. ej. 'admin' encuentra 'admin@%').
+-- p_hasta es exclusivo; p_limite NULL devuelve todo (exportaciones).
+CREATE PROCEDURE sp_buscar_logs(
+  IN p_usuario VARCHAR(200),
+  IN p_accion VARCHAR(10),
+  IN p_tabla VARCHAR(200),
+  IN p_fila_id VARCHAR(200),
+  IN p_desde DATETIME,
+  IN p_hasta DATETIME,
+  IN p_cursor_fecha DATETIME,
+  IN p_cursor_id BIGINT,
+  IN p_limite INT
+)
+BEGIN
+  SET @bl_usuario = CONCAT(REPLACE(REPLACE(REPLACE(p_usuario, '\\', '\\\\'), '%', '\\%'), '_', '\\_'), '%');
+  SET @bl_accion = UPPER(p_accion), @bl_tabla = p_tabla, @bl_fila = p_fila_id;
+  SET @bl_desde = p_desde, @bl_hasta = p_hasta;
+  SET @bl_cursor_fecha = p_cursor_fecha, @bl_cursor_id = p_cursor_id;
+  SET @bl_sql = CONCAT(
+    'SELECT id, usuario_mysql, accion, tabla_afectada, fila_id, fecha, descripcion FROM logs_auditoria WHERE 1 = 1',
+    IF(p_usuario IS NULL, '', ' AND usuario_mysql LIKE @bl_usuario'),
+    IF(p_accion IS NULL, '', ' AND accion = @bl_accion'),
+    IF(p_tabla IS NULL, '', ' AND tabla_afectada = @bl_tabla'),
+    IF(p_fila_id IS NULL, '', ' AND fila_id = @bl_fila'),
+    IF(p_desde IS NULL, '', ' AND fecha >= @bl_desde'),
+    IF(p_hasta IS NULL, '', ' AND fecha < @bl_hasta'),
+    IF(p_cursor_fecha IS NULL, '',
+       ' AND (fecha < @bl_cursor_fecha OR (fecha = @bl_cursor_fecha AND id < @bl_cursor_id))'),
+    ' ORDER BY fecha DESC, id DESC',
+    IF(p_limite IS NULL, '', CONCAT(' LIMIT ', GREATEST(1, LEAST(p_limite, 1001))))
+  );
+  PREPARE st_buscar_logs FROM @bl_sql;
+  EXECUTE st_buscar_logs;
+  DEALLOCATE PREPARE st_buscar_logs;
+END$$
+DELIMITER ;
+
+-- Mueve a logs_auditoria_historico los logs anteriores a p_antes, en bloques de
+-- p_lote filas (una transacción por bloque para no bloquear las escrituras),
+-- y suma cada bloque en logs_auditoria_mensual. Devuelve cuántos movió.
+DELIMITER $$
+CREATE PROCEDURE sp_archivar_logs(IN p_antes DATETIME, IN p_lote INT)
+BEGIN
+  DECLARE v_bloque INT DEFAULT 1;
+  DECLARE v_total INT DEFAULT 0;
+  DROP TEMPORARY TABLE IF EXISTS tmp_logs_archivar;
+  CREATE TEMPORARY TABLE tmp_logs_archivar (id BIGINT PRIMARY KEY);
+  WHILE v_bloque > 0 DO
+    DELETE FROM tmp_logs_archivar;
+    INSERT INTO tmp_logs_archivar
+      SELECT id FROM logs_auditoria WHERE fecha < p_antes ORDER BY fecha, id LIMIT p_lote;
+    SET v_bloque = ROW_COUNT();
+    IF v_bloque > 0 THEN
+      START TRANSACTION;
+      INSERT INTO logs_auditoria_historico (id, usuario_mysql, accion, tabla_afectada, fila_id, fecha, descripcion)
+        SELECT l.id, l.usuario_mysql, l.accion, l.tabla_afectada, l.fila_id, l.fecha, l.descripcion
+        FROM logs_auditoria l JOIN tmp_logs_archivar t ON t.id = l.id;
+      INSERT INTO logs_auditoria_mensual (mes, tabla_afectada, accion, total)
+        SELECT DATE_FORMAT(l.fecha, '%Y-%m'), IFNULL(l.tabla_afectada, ''), l.accion, COUNT(*)
+        FROM logs_auditoria l JOIN tmp_logs_archivar t ON t.id = l.id
+        GROUP BY DATE_FORMAT(l.fecha, '%Y-%m'), IFNULL(l.tabla_afectada, ''), l.accion
+        ON DUPLICATE KEY UPDATE total = total + VALUES(total);
+      DELETE l FROM logs_auditoria l JOIN tmp_logs_archivar t ON t.id = l.id;
+      COMMIT;
+      SET v_total = v_total + v_bloque;
+    END IF;
+  END WHILE;
+  DROP TEMPORARY TABLE tmp_logs_archivar;
+  SELECT v_total AS archivados;
+END$$
 DELIMITER ;
 
 -- AUDITORÍA: TRIGGERS GENERALES (INSERT/UPDATE/DELETE) para tablas clave
@@ -467,6 +854,24 @@ BEGIN
   ORDER BY creado_en DESC;
 END$$
 
+-- Listado paginado: filtros en la BD y cursor (creado_en, id) en lugar de OFFSET.
+-- La descripción se trunca para no mover el TEXT completo en el listado.
+CREATE PROCEDURE sp_listar_vacantes_pagina(
+  IN p_departamento_id INT,
+  IN p_cursor_fecha DATETIME,
+  IN p_cursor_id INT,
+  IN p_limite INT
+)
+BEGIN
+  SELECT id, titulo, LEFT(descripcion, 300) AS descripcion, departamento_id, estado, activo, creado_en
+  FROM vacantes
+  WHERE activo = 1
+    AND (p_departamento_id IS NULL OR departamento_id = p_departamento_id)
+    AND (p_cursor_fecha IS NULL OR creado_en < p_cursor_fecha OR (creado_en = p_cursor_fecha AND id < p_cursor_id))
+  ORDER BY creado_en DESC, id DESC
+  LIMIT p_limite;
+END$$
+
 CREATE PROCEDURE sp_vacante_detalle(IN p_vacante_id INT)
 BEGIN
   SELECT v.id, v.titulo, v.descripcion, v.requerimientos, v.estado, v.activo, v.creado_en, v.actualizado_en,
@@ -577,10 +982,14 @@ CREATE PROCEDURE sp_create_vacante(
   IN p_usuario VARCHAR(150)
 )
 BEGIN
+  DECLARE v_id INT;
   INSERT INTO vacantes (titulo, descripcion, departamento_id, requerimientos, estado, activo)
     VALUES (p_titulo, p_descripcion, p_departamento_id, p_requerimientos, 'abierta', 1);
+  SET v_id = LAST_INSERT_ID();
   INSERT INTO logs_auditoria (usuario_mysql, accion, tabla_afectada, fila_id, descripcion)
-    VALUES (p_usuario, 'INSERT', 'vacantes', CAST(LAST_INSERT_ID() AS CHAR), CONCAT('Vacante creada: ', p_titulo));
+    VALUES (p_usuario, 'INSERT', 'vacantes', CAST(v_id AS CHAR), CONCAT('Vacante creada: ', p_titulo));
+  -- devolver el id para que la app actualice el índice de búsqueda
+  SELECT v_id AS id;
 END$$
 
 CREATE PROCEDURE sp_update_vacante(
@@ -612,14 +1021,17 @@ CREATE PROCEDURE sp_update_postulante(
   IN p_cv_path VARCHAR(500)
 )
 BEGIN
-  UPDATE postulantes SET nombre = p_nombre, email = p_email, anos_experiencia = p_anos_experiencia, habilidades = p_habilidades, cv_path = p_cv_path WHERE id = p_postulante_id;
+  -- habilidades_cv se asigna antes que cv_path: si cambia el CV se descartan (la app lo vuelve a extraer)
+  UPDATE postulantes SET nombre = p_nombre, email = p_email, anos_experiencia = p_anos_experiencia, habilidades = p_habilidades,
+    habilidades_cv = IF(cv_path <=> p_cv_path, habilidades_cv, NULL), cv_path = p_cv_path WHERE id = p_postulante_id;
   INSERT INTO logs_auditoria (usuario_mysql, accion, tabla_afectada, fila_id, descripcion)
     VALUES (CURRENT_USER(), 'UPDATE', 'postulantes', CAST(p_postulante_id AS CHAR), CONCAT('sp_update_postulante ejecutado'));
 END$$
 
 CREATE PROCEDURE sp_get_postulante(IN p_postulante_id INT)
 BEGIN
-  SELECT id, nombre, email, anos_experiencia, habilidades, cv_path, creado_en FROM postulantes WHERE id = p_postulante_id;
+  SELECT id, nombre, email, anos_experiencia, habilidades, habilidades_cv, cv_path, creado_en, actualizado_en
+  FROM postulantes WHERE id = p_postulante_id;
 END$$
 
 DELIMITER ;